@@ -0,0 +1,23 @@
+#!/bin/sh
+# Compare sync (WSGI) and ASGI servers on trip reads under concurrency,
+# run from the project directory: sh /usr/src/commands/bench_servers.sh
+# Arguments are passed to bench_reads (--workers 50 --slow-clients 8 ...)
+
+CONFIG="$(dirname "$0")/gunicorn.conf.py"
+export DEBUG_TOOLBAR=0 GUNICORN_ACCESS_LOG= WEB_CONCURRENCY="${WEB_CONCURRENCY:-4}"
+
+GUNICORN_BIND=127.0.0.1:8101 GUNICORN_WORKER_CLASS=sync \
+    gunicorn train_ticket_service.wsgi:application -c "$CONFIG" &
+WSGI_PID=$!
+GUNICORN_BIND=127.0.0.1:8102 \
+    gunicorn train_ticket_service.asgi:application -c "$CONFIG" &
+ASGI_PID=$!
+trap 'kill $WSGI_PID $ASGI_PID' EXIT
+sleep 5
+
+echo "== WSGI (gunicorn sync workers)"
+python manage.py bench_reads --url http://127.0.0.1:8101 "$@"
+echo "== ASGI (gunicorn uvicorn workers)"
+python manage.py bench_reads --url http://127.0.0.1:8102 "$@"
+echo "== ASGI async views"
+python manage.py bench_reads --url http://127.0.0.1:8102 --async "$@"
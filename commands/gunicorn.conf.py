@@ -0,0 +1,25 @@
+"""
+Gunicorn config of the ASGI server: uvicorn workers run the async views
+in an event loop, sync views in threads of the worker
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+# workers share cache and its invalidations only through Redis (REDIS_URL)
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# used by sync workers only (WSGI comparison runs)
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+
+# restart workers from time to time against slow memory growth
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+errorlog = "-"
@@ -0,0 +1,5 @@
+#!/bin/sh
+
+python manage.py migrate
+export DEBUG_TOOLBAR=0
+exec gunicorn train_ticket_service.asgi:application -c /usr/src/commands/gunicorn.conf.py
@@ -9,6 +9,8 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault(
@@ -16,3 +18,7 @@ os.environ.setdefault(
 )
 
 application = get_asgi_application()
+
+if settings.DEBUG:
+    # static files of admin and browsable API, as runserver serves them
+    application = ASGIStaticFilesHandler(application)
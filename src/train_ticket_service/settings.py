@@ -66,6 +66,13 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# debug toolbar middleware is sync only, under ASGI server it makes every
+# request run in a thread, so the server is started with DEBUG_TOOLBAR=0
+DEBUG_TOOLBAR = os.getenv("DEBUG_TOOLBAR", "1") == "1"
+if not DEBUG_TOOLBAR:
+    INSTALLED_APPS.remove("debug_toolbar")
+    MIDDLEWARE.remove("debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "train_ticket_service.urls"
 
 TEMPLATES = [
@@ -102,6 +109,39 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+# Cached responses, their versions and throttling counters have to be shared
+# by all workers and commands: Redis when REDIS_URL is set, otherwise they
+# are kept per process
+REDIS_URL = os.getenv("REDIS_URL")
+
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+        if REDIS_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    ),
+    "throttle": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+        if REDIS_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "throttle",
+        }
+    ),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -156,13 +196,14 @@ REST_FRAMEWORK = {
         "trip.permissions.IsAdminAllOrAuthenticatedReadOnly"
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "trip.throttling.AnonRateThrottle",
+        "trip.throttling.UserRateThrottle",
     ],
+    # rates count request costs (`throttle_costs` of views), not requests
     "DEFAULT_THROTTLE_RATES": {"anon": "10/day", "user": "1000/day"},
 }
 
@@ -179,8 +220,38 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Seconds to keep trips seat maps in cache, booking drops them immediately
+SEAT_MAP_CACHE_TIMEOUT = 60 * 60
+
+# Seconds to serve trips list and details from cache: writes invalidate them
+# at once, the timeout bounds staleness after bulk changes bypassing signals
+TRIP_CACHE_TIMEOUT = 30
+
+# Seconds to keep user claims for JWT authentication and token refresh:
+# changes through the API drop them at once, other changes (admin, shell)
+# reach tokens after this timeout
+JWT_USER_CACHE_TIMEOUT = 60
+
+# Seconds a process reuses its station grid for nearby search: station
+# changes rebuild it at once through the cache version, the timeout bounds
+# staleness when the version is not shared (no REDIS_URL)
+STATION_INDEX_TIMEOUT = 60 * 5
+
+# How long seats stay held for the user before the sweep releases them
+SEAT_HOLD_TTL = timedelta(minutes=10)
+
+# Journey planner: seconds to keep per-day timetables in cache (trip changes
+# update them in place) and the default minimum time to change trains
+JOURNEY_TIMETABLE_TIMEOUT = 60 * 60 * 24
+JOURNEY_MIN_CONNECTION = timedelta(minutes=10)
+
+# Days ahead trips of schedule templates are created for (materialize_schedules)
+SCHEDULE_HORIZON_DAYS = 30
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "user.serializers.TokenRefreshSerializer",
 }
@@ -7,6 +7,13 @@ admin.site.register(models.CarriageType)
 admin.site.register(models.Ticket)
 admin.site.register(models.Order)
 admin.site.register(models.Trip)
+admin.site.register(models.ScheduleTemplate)
+admin.site.register(models.ScheduleSkip)
+admin.site.register(models.TripInventory)
+admin.site.register(models.BoardEntry)
 admin.site.register(models.Route)
 admin.site.register(models.Crew)
 admin.site.register(models.Station)
+admin.site.register(models.SeatHold)
+admin.site.register(models.HeldSeat)
+admin.site.register(models.TableVersion)
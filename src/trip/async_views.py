@@ -0,0 +1,56 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework.exceptions import MethodNotAllowed
+
+from trip.response_cache import get_cached_response
+from trip.views import TripViewSet
+
+
+def async_action(viewset, action, cached=False):
+    """
+    Async view of a read action of the viewset for ASGI servers. The ORM and
+    the cache of Django 4.0 are sync only, so authentication, the lookup of
+    a response cached by the action (`cached_response`, a Redis round-trip
+    with REDIS_URL) and the action itself run in a worker thread of the
+    request, the event loop only waits for them. The response is rendered
+    here, so Django does not hand it to a thread for rendering
+    """
+
+    async def view(request, *args, **kwargs):
+        self = viewset(action=action, action_map={"get": action, "head": action})
+        self.args, self.kwargs = args, kwargs
+        self.request = request = self.initialize_request(request, *args, **kwargs)
+        self.headers = self.default_response_headers
+        try:
+            if request.method not in ("GET", "HEAD"):
+                raise MethodNotAllowed(request.method)
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = None
+            if cached:
+                _, response = await sync_to_async(get_cached_response)(self, request)
+            if response is None:
+                # the action counts a miss and fills the cache
+                response = await sync_to_async(getattr(self, action))(
+                    request, *args, **kwargs
+                )
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        response = self.finalize_response(request, response, *args, **kwargs)
+        response.render()
+        rendered = HttpResponse(
+            response.content,
+            status=response.status_code,
+            content_type=response["Content-Type"],
+        )
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
+
+    view.csrf_exempt = True
+    return view
+
+
+trip_list = async_action(TripViewSet, "list", cached=True)
+trip_detail = async_action(TripViewSet, "retrieve", cached=True)
+trip_seats = async_action(TripViewSet, "seats")
@@ -0,0 +1,47 @@
+import math
+import time
+from threading import Barrier, Thread
+
+from django.db import connections
+
+
+def percentile(values, percent):
+    """Return nearest-rank percentile of the values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(latencies):
+    """Percentiles of latencies given in seconds, values in milliseconds"""
+    summary = {}
+    for name, percent in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100)):
+        value = percentile(latencies, percent)
+        summary[f"{name}_ms"] = None if value is None else round(value * 1000, 2)
+    return summary
+
+
+def run_workers(worker, workers):
+    """
+    Run worker(index) in the given number of threads started at the same
+    moment, return wall clock duration of the run in seconds
+    """
+    barrier = Barrier(workers + 1)
+
+    def run(index):
+        barrier.wait()
+        try:
+            worker(index)
+        finally:
+            connections.close_all()
+
+    threads = [Thread(target=run, args=(index,)) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
@@ -0,0 +1,102 @@
+from collections import Counter
+
+from django.db import transaction, IntegrityError
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+
+from trip.models import TripInventory, Ticket, Order, SeatHold, HeldSeat
+from trip.response_cache import invalidate_seats
+from trip.seat_map import find_taken_seats, invalidate_seat_maps
+
+SEAT_TAKEN_MESSAGE = "Booking prohibited! This place already taken!"
+
+
+def lock_seats(requested):
+    """
+    Lock inventory of the trips of requested (trip_id, car_num, seat_num)
+    and return which of the seats are booked or held by now
+    """
+    TripInventory.lock({trip_id for trip_id, _, _ in requested})
+    return find_taken_seats(set(requested))
+
+
+def book_tickets(order, tickets_data):
+    """Insert tickets of the order and count them in the trips inventory"""
+    Ticket.objects.bulk_create(Ticket(order=order, **ticket) for ticket in tickets_data)
+    seats = Counter(ticket["trip"].id for ticket in tickets_data)
+    TripInventory.book(seats)
+    invalidate_seat_maps(seats)
+    invalidate_seats(seats)
+
+
+def cancel_order(order):
+    """
+    Delete order, its tickets return their seats to the trips inventory
+    on deletion (see trip.signals)
+    """
+    with transaction.atomic():
+        # inventory rows are locked in the order bookings lock them
+        trip_ids = order.tickets.values_list("trip_id", flat=True)
+        TripInventory.lock(sorted(set(trip_ids)))
+        order.delete()
+
+
+def hold_seats(hold, seats_data):
+    """Insert seats of the hold and count them in the trip inventory"""
+    HeldSeat.objects.bulk_create(
+        HeldSeat(hold=hold, trip_id=hold.trip_id, **seat) for seat in seats_data
+    )
+    TripInventory.hold({hold.trip_id: len(seats_data)})
+    invalidate_seat_maps([hold.trip_id])
+    invalidate_seats([hold.trip_id])
+
+
+def release_holds(holds):
+    """
+    Delete holds in bulk, their seats return to the trips inventory on
+    deletion (see trip.signals), holds locked by a concurrent confirmation
+    are skipped
+    """
+    with transaction.atomic():
+        locked = dict(
+            holds.select_for_update(skip_locked=True).values_list("id", "trip_id")
+        )
+        # inventory rows are locked in the order bookings lock them
+        TripInventory.lock(sorted(set(locked.values())))
+        SeatHold.objects.filter(id__in=locked).delete()
+    return len(locked)
+
+
+def confirm_hold(hold):
+    """Turn not expired hold into the order of its seats"""
+    with transaction.atomic():
+        hold = (
+            SeatHold.objects.select_for_update(of=("self",))
+            .select_related("trip")
+            .filter(pk=hold.pk)
+            .first()
+        )
+        if hold is None:
+            raise NotFound("Hold is already released")
+        if hold.expires_at <= timezone.now():
+            raise ValidationError({"expires_at": "Hold is expired"})
+
+        TripInventory.lock([hold.trip_id])
+        seats = list(hold.seats.values_list("car_num", "seat_num"))
+        hold.delete()
+
+        try:
+            with transaction.atomic():
+                order = Order.objects.create(user_id=hold.user_id)
+                book_tickets(
+                    order,
+                    [
+                        {"trip": hold.trip, "car_num": car_num, "seat_num": seat_num}
+                        for car_num, seat_num in seats
+                    ],
+                )
+                return order
+        except IntegrityError:
+            # the seats were booked bypassing the hold, it is released anyway
+            pass
+    raise ValidationError({"seats": SEAT_TAKEN_MESSAGE})
@@ -0,0 +1,48 @@
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from trip.models import TableVersion
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified of list and retrieve responses from versions of
+    the tables they show (`version_models`). A request with matching
+    If-None-Match (or not older If-Modified-Since) gets 304 after a single
+    query of the versions, without reading or serializing the data
+    """
+
+    version_models = ()
+
+    def get_validators(self, request):
+        """Return (etag, last modified timestamp or None) of the response"""
+        versions = TableVersion.get_versions(*self.version_models)
+        tags = []
+        updated = []
+        for model in self.version_models:
+            version, updated_at = versions.get(model._meta.label_lower, (0, None))
+            tags.append(str(version))
+            if updated_at is not None:
+                updated.append(int(updated_at.timestamp()))
+        # representations of other renderers (browsable API) differ
+        tags.append(request.accepted_renderer.format)
+        return quote_etag("-".join(tags)), max(updated, default=None)
+
+    def conditional(self, method, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = method(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
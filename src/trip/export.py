@@ -0,0 +1,180 @@
+import asyncio
+import csv
+import json
+from itertools import groupby
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+
+from django.db import connections
+from rest_framework import serializers
+
+from trip.models import Ticket
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_CHUNK_SIZE = 2000
+# bytes of rendered rows sent at once
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+# csv column: ticket lookup, one row per ticket
+TICKET_COLUMNS = {
+    "order_id": "order_id",
+    "order_created_at": "order__created_at",
+    "created_by": "order__user__email",
+    "trip_id": "trip_id",
+    "from_station": "trip__route__source__name",
+    "to_station": "trip__route__destination__name",
+    "departure_time": "trip__departure_time",
+    "arrival_time": "trip__arrival_time",
+    "train": "trip__train__name_number",
+    "car_num": "car_num",
+    "seat_num": "seat_num",
+}
+DATETIME_COLUMNS = ("order_created_at", "departure_time", "arrival_time")
+
+
+def get_ticket_rows(
+    created_after=None, created_before=None, user=None, chunk_size=EXPORT_CHUNK_SIZE
+):
+    """
+    Yield tickets of orders as dicts of TICKET_COLUMNS, orders in creation
+    order. Rows are read from a server side cursor chunk by chunk, so
+    memory use does not depend on the number of orders
+    """
+    tickets = Ticket.objects.all()
+    if created_after is not None:
+        tickets = tickets.filter(order__created_at__gte=created_after)
+    if created_before is not None:
+        tickets = tickets.filter(order__created_at__lt=created_before)
+    if user:
+        tickets = tickets.filter(order__user__email__icontains=user)
+
+    datetime_field = serializers.DateTimeField()
+    rows = (
+        tickets.order_by("order__created_at", "order_id", "id")
+        .values_list(*TICKET_COLUMNS.values())
+        .iterator(chunk_size=chunk_size)
+    )
+    for values in rows:
+        row = dict(zip(TICKET_COLUMNS, values))
+        for name in DATETIME_COLUMNS:
+            row[name] = datetime_field.to_representation(row[name])
+        yield row
+
+
+def render_ndjson(rows):
+    """Yield one JSON line per order with its tickets"""
+    for order_id, tickets in groupby(rows, key=lambda row: row["order_id"]):
+        tickets = list(tickets)
+        order = {
+            "id": order_id,
+            "created_at": tickets[0]["order_created_at"],
+            "created_by": tickets[0]["created_by"],
+            "tickets": [
+                {
+                    "trip": ticket["trip_id"],
+                    "from_station": ticket["from_station"],
+                    "to_station": ticket["to_station"],
+                    "departure_time": ticket["departure_time"],
+                    "arrival_time": ticket["arrival_time"],
+                    "train": ticket["train"],
+                    "car_num": ticket["car_num"],
+                    "seat_num": ticket["seat_num"],
+                }
+                for ticket in tickets
+            ],
+        }
+        yield json.dumps(order, ensure_ascii=False) + "\n"
+
+
+class Line:
+    """File-like object returning the written line to the csv writer"""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(rows):
+    """Yield the header and one line per ticket"""
+    writer = csv.DictWriter(Line(), fieldnames=list(TICKET_COLUMNS))
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def buffered(lines, size=EXPORT_BUFFER_SIZE):
+    """Join lines into chunks of about the size to send fewer pieces"""
+    chunk = []
+    length = 0
+    for line in lines:
+        chunk.append(line)
+        length += len(line)
+        if length >= size:
+            yield "".join(chunk)
+            chunk = []
+            length = 0
+    if chunk:
+        yield "".join(chunk)
+
+
+def in_thread(items, prefetch=4):
+    """
+    Yield the items produced in another thread, at most `prefetch` ahead of
+    the consumer. Closing the generator stops the producer
+    """
+    queue = Queue(maxsize=prefetch)
+    stopped = Event()
+
+    def put(entry):
+        while not stopped.is_set():
+            try:
+                queue.put(entry, timeout=0.5)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(("item", item)):
+                    return
+            put(("done", None))
+        except Exception as error:
+            put(("error", error))
+        finally:
+            connections.close_all()
+
+    Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            try:
+                kind, value = queue.get(timeout=0.5)
+            except Empty:
+                continue
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        stopped.set()
+
+
+def outside_event_loop(items):
+    """
+    Yield the items, reading them in a thread when iterated in an event loop:
+    ASGI handler of Django 4.0 iterates streaming responses there, where
+    the ORM can not be used
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        yield from items
+    else:
+        yield from in_thread(items)
+
+
+def export_orders(output="ndjson", **filters):
+    """Yield text chunks of the orders export in the output format"""
+    render = render_csv if output == "csv" else render_ndjson
+    return outside_event_loop(buffered(render(get_ticket_rows(**filters))))
@@ -1,74 +1,80 @@
 import django_filters
 from django.db.models import Q
 
+from trip.models import Crew, Station, Trip
+
+
+def get_lookup_query(value, field_params):
+    """
+    ORs lookups of the fields for every comma-separated value.
+    """
+    query = Q()
+    for item in value.split(","):
+        for field, lookup in field_params:
+            query |= Q(**{f"{field}__{lookup}": item})
+    return query
+
 
 def get_filtered_queryset(queryset, value, field_params):
     """
     Filters queryset based on multiple fields and lookup expressions.
+    Fields must not span many-to-many relations: no DISTINCT is applied.
+    """
+    if not value:
+        return queryset
+
+    return queryset.filter(get_lookup_query(value, field_params))
+
+
+def get_station_ids(value):
+    """
+    Subquery of ids of stations matching any of comma-separated names,
+    served by trigram index on the station name.
     """
+    return Station.objects.filter(
+        get_lookup_query(value, [("name", "icontains")])
+    ).values("id")
+
+
+def filter_by_stations(queryset, value, fields):
+    """Filters queryset by station foreign keys matching the names"""
     if not value:
         return queryset
 
-    values_list = value.split(",")
+    station_ids = get_station_ids(value)
     query = Q()
-    for item in values_list:
-        for field, lookup in field_params:
-            query |= Q(**{f"{field}__{lookup}": item})
-    return queryset.filter(query).distinct()
+    for field in fields:
+        query |= Q(**{f"{field}__in": station_ids})
+    return queryset.filter(query)
 
 
 class CitiesRouteFilter(django_filters.CharFilter):
     """Filters by cities (source or destination)"""
 
     def filter(self, queryset, value):
-        return get_filtered_queryset(
-            queryset,
-            value,
-            [
-                ("source__name", "icontains"),
-                ("destination__name", "icontains"),
-            ],
-        )
+        return filter_by_stations(queryset, value, ["source_id", "destination_id"])
 
 
 class SourcesRouteFilter(django_filters.CharFilter):
     """Filters by source city"""
 
     def filter(self, queryset, value):
-        return get_filtered_queryset(
-            queryset,
-            value,
-            [
-                ("source__name", "icontains"),
-            ],
-        )
+        return filter_by_stations(queryset, value, ["source_id"])
 
 
 class DestinationsRouteFilter(django_filters.CharFilter):
     """Filters by destination city"""
 
     def filter(self, queryset, value):
-        query = get_filtered_queryset(
-            queryset,
-            value,
-            [
-                ("destination__name", "icontains"),
-            ],
-        )
-        return queryset.filter(query).distinct() if query else queryset
+        return filter_by_stations(queryset, value, ["destination_id"])
 
 
 class CitiesTripFilter(django_filters.CharFilter):
     """Filters by cities (source or destination)"""
 
     def filter(self, queryset, value):
-        return get_filtered_queryset(
-            queryset,
-            value,
-            [
-                ("route__source__name", "icontains"),
-                ("route__destination__name", "icontains"),
-            ],
+        return filter_by_stations(
+            queryset, value, ["route__source_id", "route__destination_id"]
         )
 
 
@@ -76,39 +82,34 @@ class SourcesTripFilter(django_filters.CharFilter):
     """Filters by source city"""
 
     def filter(self, queryset, value):
-        return get_filtered_queryset(
-            queryset,
-            value,
-            [
-                ("route__source__name", "icontains"),
-            ],
-        )
+        return filter_by_stations(queryset, value, ["route__source_id"])
 
 
 class DestinationsTripFilter(django_filters.CharFilter):
     """Filters by destination city"""
 
     def filter(self, queryset, value):
-        return get_filtered_queryset(
-            queryset,
-            value,
-            [
-                ("route__destination__name", "icontains"),
-            ],
-        )
+        return filter_by_stations(queryset, value, ["route__destination_id"])
 
 
 class CrewTripFilter(django_filters.CharFilter):
     """Filters by crew member's first or last name"""
 
     def filter(self, queryset, value):
-        return get_filtered_queryset(
-            queryset,
-            value,
-            [
-                ("crew__first_name", "icontains"),
-                ("crew__last_name__name", "icontains"),
-            ],
+        if not value:
+            return queryset
+
+        crew = Crew.objects.filter(
+            get_lookup_query(
+                value,
+                [
+                    ("first_name", "icontains"),
+                    ("last_name", "icontains"),
+                ],
+            )
+        )
+        return queryset.filter(
+            id__in=Trip.crew.through.objects.filter(crew__in=crew).values("trip_id")
         )
 
 
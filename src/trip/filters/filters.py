@@ -1,12 +1,56 @@
-from datetime import datetime
+from datetime import datetime, time, timedelta
 
 import django_filters
 from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
 
 from trip.filters import custom_filters
 from trip.models import Route, Trip
 
 
+def parse_dates(value, name):
+    """Parses comma-separated YYYY-MM-DD dates"""
+    try:
+        return {
+            datetime.strptime(date.strip(), "%Y-%m-%d").date()
+            for date in value.split(",")
+        }
+    except ValueError:
+        raise ValidationError({name: "Dates must be comma-separated YYYY-MM-DD"})
+
+
+def day_start(date):
+    """Midnight of the date in the current timezone"""
+    return timezone.make_aware(datetime.combine(date, time()))
+
+
+def get_day_ranges(dates):
+    """
+    Merges the dates into half-open [start, end) timestamp ranges,
+    consecutive days go into one range
+    """
+    ranges = []
+    for date in sorted(dates):
+        if ranges and ranges[-1][1] == date:
+            ranges[-1][1] = date + timedelta(days=1)
+        else:
+            ranges.append([date, date + timedelta(days=1)])
+    return [(day_start(start), day_start(end)) for start, end in ranges]
+
+
+def get_dates_query(dates, fields):
+    """
+    Query matching timestamps of the fields within the dates, compared with
+    the column as is so the index can be used
+    """
+    query = Q()
+    for start, end in get_day_ranges(dates):
+        for field in fields:
+            query |= Q(**{f"{field}__gte": start, f"{field}__lt": end})
+    return query
+
+
 class RouteFilter(django_filters.FilterSet):
     city = custom_filters.CitiesRouteFilter()
     source = custom_filters.SourcesRouteFilter()
@@ -26,45 +70,46 @@ class TripFilter(django_filters.FilterSet):
     date = django_filters.CharFilter(method="filter_by_dates")
     arr = django_filters.CharFilter(method="filter_by_dates_arrival")
     dep = django_filters.CharFilter(method="filter_by_dates_departure")
+    date_from = django_filters.DateFilter(
+        method="filter_by_departure_from",
+        help_text="Trips departing on this date or later (YYYY-MM-DD)",
+    )
+    date_to = django_filters.DateFilter(
+        method="filter_by_departure_to",
+        help_text="Trips departing on this date or earlier (YYYY-MM-DD)",
+    )
 
     def filter_by_dates(self, queryset, name, value):
         if not value:
             return queryset
 
-        date_list = value.split(",")
-
-        query = Q()
-        for date in date_list:
-            date_obj = datetime.strptime(date.strip(), "%Y-%m-%d").date()
-            query |= Q(departure_time__date=date_obj) | Q(arrival_time__date=date_obj)
-
-        return queryset.filter(query).distinct()
+        return queryset.filter(
+            get_dates_query(
+                parse_dates(value, name), ["departure_time", "arrival_time"]
+            )
+        )
 
     def filter_by_dates_arrival(self, queryset, name, value):
         if not value:
             return queryset
 
-        date_list = value.split(",")
-
-        query = Q()
-        for date in date_list:
-            date_obj = datetime.strptime(date.strip(), "%Y-%m-%d").date()
-            query |= Q(arrival_time__date=date_obj)
-
-        return queryset.filter(query).distinct()
+        return queryset.filter(
+            get_dates_query(parse_dates(value, name), ["arrival_time"])
+        )
 
     def filter_by_dates_departure(self, queryset, name, value):
         if not value:
             return queryset
 
-        date_list = value.split(",")
+        return queryset.filter(
+            get_dates_query(parse_dates(value, name), ["departure_time"])
+        )
 
-        query = Q()
-        for date in date_list:
-            date_obj = datetime.strptime(date.strip(), "%Y-%m-%d").date()
-            query |= Q(departure_time__date=date_obj)
+    def filter_by_departure_from(self, queryset, name, value):
+        return queryset.filter(departure_time__gte=day_start(value))
 
-        return queryset.filter(query).distinct()
+    def filter_by_departure_to(self, queryset, name, value):
+        return queryset.filter(departure_time__lt=day_start(value + timedelta(days=1)))
 
     class Meta:
         model = Trip
@@ -79,6 +124,8 @@ class TripFilter(django_filters.FilterSet):
             "dep",
             "arr",
             "date",
+            "date_from",
+            "date_to",
         ]
 
 
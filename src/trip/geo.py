@@ -0,0 +1,171 @@
+import heapq
+import math
+import time
+
+from django.conf import settings
+
+from trip.models import Station
+from trip.response_cache import bump_versions, get_versions
+
+EARTH_RADIUS_KM = 6371
+GRID_CELL_DEGREES = 0.2
+STATION_INDEX_VERSION_KEY = "station-index-version"
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points given in degrees"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    hav = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return EARTH_RADIUS_KM * 2 * math.asin(min(1.0, math.sqrt(hav)))
+
+
+class StationGrid:
+    """
+    Stations bucketed into cells of GRID_CELL_DEGREES. A search reads rings
+    of cells around the point, the closest first, and stops once the next
+    ring is farther than the radius or than the found stations
+    """
+
+    rows = round(180 / GRID_CELL_DEGREES)
+    columns = round(360 / GRID_CELL_DEGREES)
+
+    def __init__(self, stations, version=None):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.cells = {}
+        for station_id, name, latitude, longitude in stations:
+            lat, lon = math.radians(latitude), math.radians(longitude)
+            self.cells.setdefault(self.cell(latitude, longitude), []).append(
+                (lat, lon, math.cos(lat), station_id, name, latitude, longitude)
+            )
+
+    @classmethod
+    def cell(cls, latitude, longitude):
+        row = min(math.floor((latitude + 90) / GRID_CELL_DEGREES), cls.rows - 1)
+        column = math.floor((longitude + 180) / GRID_CELL_DEGREES) % cls.columns
+        return row, column
+
+    def ring_cells(self, row, column, ring):
+        """Cells `ring` rows or columns away from the cell (wrapping longitude)"""
+        if ring == 0:
+            return [(row, column)]
+        keys = set()
+        columns = range(column - ring, column + ring + 1)
+        for ring_row in (row - ring, row + ring):
+            if 0 <= ring_row < self.rows:
+                keys.update((ring_row, other % self.columns) for other in columns)
+        for ring_row in range(max(row - ring + 1, 0), min(row + ring, self.rows)):
+            keys.add((ring_row, (column - ring) % self.columns))
+            keys.add((ring_row, (column + ring) % self.columns))
+        return keys
+
+    def ring_bound(self, lat, row, ring):
+        """
+        Haversine of the smallest angle from the point in the cell to the
+        cells of the ring: at least `ring - 1` cells apart in latitude or in
+        longitude (shorter at the latitudes the ring reaches)
+        """
+        if ring <= 1:
+            return 0.0
+        gap = math.radians((ring - 1) * GRID_CELL_DEGREES)
+        by_latitude = math.sin(min(gap, math.pi) / 2) ** 2
+        # columns of a wide ring come closer from the other side of the globe
+        gap = math.radians((min(ring, self.columns - ring) - 1) * GRID_CELL_DEGREES)
+        south = (row - ring) * GRID_CELL_DEGREES - 90
+        north = (row + ring + 1) * GRID_CELL_DEGREES - 90
+        widest = math.radians(min(max(abs(south), abs(north)), 90))
+        by_longitude = math.cos(lat) * math.cos(widest) * math.sin(max(gap, 0) / 2) ** 2
+        return min(by_latitude, by_longitude)
+
+    def nearby(self, latitude, longitude, radius, limit):
+        """
+        Return up to `limit` stations within `radius` km from the point as
+        (distance, id, name, latitude, longitude), the closest first
+        """
+        lat, lon = math.radians(latitude), math.radians(longitude)
+        cos_lat = math.cos(lat)
+        # compare haversine of the angle, asin only for the found stations
+        max_hav = math.sin(min(radius / EARTH_RADIUS_KM, math.pi) / 2) ** 2
+        row, column = self.cell(latitude, longitude)
+        # max-heap of the closest stations: (-haversine, station)
+        found = []
+        seen = set()
+        for ring in range(max(self.rows, self.columns)):
+            bound = self.ring_bound(lat, row, ring)
+            if bound > max_hav or (len(found) == limit and bound > -found[0][0]):
+                break
+            keys = self.ring_cells(row, column, ring)
+            if len(keys) > len(self.cells) - len(seen):
+                # sparse grid: cheaper to read the rest of stations
+                keys = self.cells.keys() - seen
+                bound = math.inf
+            seen.update(keys)
+            for key in keys:
+                for other_lat, other_lon, other_cos, *station in self.cells.get(
+                    key, ()
+                ):
+                    hav = (
+                        math.sin((other_lat - lat) / 2) ** 2
+                        + cos_lat * other_cos * math.sin((other_lon - lon) / 2) ** 2
+                    )
+                    if hav > max_hav:
+                        continue
+                    if len(found) < limit:
+                        heapq.heappush(found, (-hav, *station))
+                    elif hav < -found[0][0]:
+                        heapq.heapreplace(found, (-hav, *station))
+            if bound == math.inf:
+                break
+        return [
+            (EARTH_RADIUS_KM * 2 * math.asin(min(1.0, math.sqrt(hav))), *station)
+            for hav, *station in sorted((-hav, *station) for hav, *station in found)
+        ]
+
+
+_station_index = None
+
+
+def get_station_index_version():
+    return get_versions([STATION_INDEX_VERSION_KEY])[0]
+
+
+def get_station_index():
+    """
+    Return the station grid of this process, rebuilt after station changes
+    or STATION_INDEX_TIMEOUT
+    """
+    global _station_index
+    version = get_station_index_version()
+    index = _station_index
+    if (
+        index is None
+        or index.version != version
+        or time.monotonic() - index.built_at > settings.STATION_INDEX_TIMEOUT
+    ):
+        stations = Station.objects.values_list("id", "name", "latitude", "longitude")
+        index = _station_index = StationGrid(stations.iterator(), version)
+    return index
+
+
+def invalidate_station_index():
+    """Rebuild station grids of all processes once the change is committed"""
+    bump_versions([STATION_INDEX_VERSION_KEY], now=False)
+
+
+def find_nearby_stations(latitude, longitude, radius, limit):
+    """Stations within `radius` km from the point sorted by distance"""
+    return [
+        {
+            "id": station_id,
+            "name": name,
+            "latitude": station_latitude,
+            "longitude": station_longitude,
+            "distance": round(distance, 3),
+        }
+        for distance, station_id, name, station_latitude, station_longitude in (
+            get_station_index().nearby(latitude, longitude, radius, limit)
+        )
+    ]
@@ -0,0 +1,231 @@
+import bisect
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from trip.models import Trip
+from trip.response_cache import bump_versions, get_versions
+
+TIMETABLE_VERSION_KEY = "timetable-version"
+
+# connection: one trip run between two stations
+# (departure_time, arrival_time, source_id, destination_id, trip_id)
+CONNECTION_FIELDS = (
+    "departure_time",
+    "arrival_time",
+    "route__source_id",
+    "route__destination_id",
+    "id",
+)
+STATION_FIELDS = (
+    "route__source_id",
+    "route__source__name",
+    "route__destination_id",
+    "route__destination__name",
+)
+
+
+def day_bounds(day):
+    """Start and end of the day in the current timezone"""
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    end = timezone.make_aware(
+        datetime.combine(day + timedelta(days=1), datetime.min.time())
+    )
+    return start, end
+
+
+def get_timetable_version():
+    return get_versions([TIMETABLE_VERSION_KEY])[0]
+
+
+def timetable_cache_key(day, version=None):
+    version = version or get_timetable_version()
+    return f"timetable:{version}:{day.isoformat()}"
+
+
+def build_timetable(day):
+    """
+    Timetable of trips departing on the day: connections sorted by departure
+    and names of their stations
+    """
+    start, end = day_bounds(day)
+    trips = Trip.objects.filter(departure_time__gte=start, departure_time__lt=end)
+    rows = list(
+        trips.order_by("departure_time", "id").values_list(
+            *CONNECTION_FIELDS, *STATION_FIELDS
+        )
+    )
+    stations = {}
+    for *_, source_id, source, destination_id, destination in rows:
+        stations[source_id] = source
+        stations[destination_id] = destination
+    return {
+        "connections": [tuple(row[: len(CONNECTION_FIELDS)]) for row in rows],
+        "stations": stations,
+    }
+
+
+def get_timetable(day):
+    """Return timetable of the day from cache or build it"""
+    key = timetable_cache_key(day)
+    timetable = cache.get(key)
+    if timetable is None:
+        timetable = build_timetable(day)
+        cache.set(key, timetable, settings.JOURNEY_TIMETABLE_TIMEOUT)
+    return timetable
+
+
+def update_timetables(trip_id, days):
+    """
+    Replace connection of the trip in cached timetables of the days
+    (days it departed and departs on), not cached days are built on demand
+    """
+    version = get_timetable_version()
+    row = (
+        Trip.objects.filter(id=trip_id)
+        .values_list(*CONNECTION_FIELDS, *STATION_FIELDS)
+        .first()
+    )
+    for day in set(days):
+        key = timetable_cache_key(day, version)
+        timetable = cache.get(key)
+        if timetable is None:
+            continue
+        connections = [
+            connection
+            for connection in timetable["connections"]
+            if connection[-1] != trip_id
+        ]
+        if row and timezone.localdate(row[0]) == day:
+            bisect.insort(connections, tuple(row[: len(CONNECTION_FIELDS)]))
+            source_id, source, destination_id, destination = row[
+                len(CONNECTION_FIELDS) :
+            ]
+            timetable["stations"].update(
+                {source_id: source, destination_id: destination}
+            )
+        timetable["connections"] = connections
+        cache.set(key, timetable, settings.JOURNEY_TIMETABLE_TIMEOUT)
+
+
+def on_trip_change(trip_id, days):
+    """Update cached timetables once the trip change is committed"""
+    transaction.on_commit(lambda: update_timetables(trip_id, days))
+
+
+def invalidate_timetables():
+    """Drop all cached timetables (routes or stations changed) after commit"""
+    bump_versions([TIMETABLE_VERSION_KEY], now=False)
+
+
+def scan_connections(connections, origin, target, start, end, rounds, transfer):
+    """
+    Connection scan in rounds: round k finds the earliest arrival at every
+    station with k + 1 trips, boarding only from arrivals of the previous
+    rounds at least `transfer` time before departure. The first trip leaves
+    the origin within [start, end). Return the connection which improved
+    every station in every round
+    """
+    labels = {}
+    parents = []
+    for round_number in range(rounds):
+        improved = {}
+        best = labels.get(target)
+        for connection in connections:
+            departure, arrival, source, destination, _ = connection
+            # later connections can not arrive before the best arrival
+            if best is not None and departure >= best:
+                break
+            if destination == origin:
+                continue
+            if round_number == 0:
+                if source != origin or not start <= departure < end:
+                    continue
+            elif (
+                source == origin
+                or source not in labels
+                or (departure < labels[source] + transfer)
+            ):
+                continue
+            known = improved[destination][1] if destination in improved else None
+            known = labels.get(destination) if known is None else known
+            if known is None or arrival < known:
+                improved[destination] = connection
+                if destination == target:
+                    best = arrival
+        parents.append(improved)
+        # boarding in the next round uses arrivals of this round too
+        for station, connection in improved.items():
+            labels[station] = connection[1]
+        if not improved:
+            break
+    return parents
+
+
+def collect_legs(parents, round_number, station):
+    """Follow the connections back from the station reached in the round"""
+    legs = []
+    while round_number >= 0:
+        connection = parents[round_number].get(station)
+        if connection is not None:
+            legs.append(connection)
+            station = connection[2]
+        round_number -= 1
+    return legs[::-1]
+
+
+def find_journeys(origin, target, day, max_transfers, min_connection):
+    """
+    Journeys from origin to target station departing on the day: the
+    earliest arrival for every number of transfers (up to max_transfers)
+    which arrives earlier than the journeys with fewer transfers
+    """
+    next_day = day + timedelta(days=1)
+    today, tomorrow = get_timetable(day), get_timetable(next_day)
+    stations = {**tomorrow["stations"], **today["stations"]}
+    start, end = day_bounds(day)
+
+    parents = scan_connections(
+        today["connections"] + tomorrow["connections"],
+        origin,
+        target,
+        start,
+        end,
+        max_transfers + 1,
+        min_connection,
+    )
+
+    journeys = []
+    best = None
+    for round_number, improved in enumerate(parents):
+        if target not in improved:
+            continue
+        arrival = improved[target][1]
+        if best is not None and arrival >= best:
+            continue
+        best = arrival
+        legs = collect_legs(parents, round_number, target)
+        journeys.append(
+            {
+                "departure_time": legs[0][0],
+                "arrival_time": legs[-1][1],
+                "duration": legs[-1][1] - legs[0][0],
+                "transfers": len(legs) - 1,
+                "legs": [
+                    {
+                        "trip": trip_id,
+                        "from_station": source,
+                        "from_station_name": stations.get(source),
+                        "to_station": destination,
+                        "to_station_name": stations.get(destination),
+                        "departure_time": departure,
+                        "arrival_time": arrival,
+                    }
+                    for departure, arrival, source, destination, trip_id in legs
+                ],
+            }
+        )
+    return journeys
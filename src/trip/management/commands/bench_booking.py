@@ -0,0 +1,314 @@
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Exists, OuterRef
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from trip.benchmark import latency_summary, run_workers
+from trip.models import (
+    CarriageType,
+    Train,
+    Station,
+    Route,
+    Trip,
+    TripInventory,
+    Ticket,
+    HeldSeat,
+)
+from trip.serializers import SEAT_TAKEN_MESSAGE
+
+BENCH_PASSWORD = "bench_password"
+
+
+class Command(BaseCommand):
+    help = (
+        "Book seats of one trip from many concurrent clients and report "
+        "throughput, latency, conflict rate and double booking"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=50)
+        parser.add_argument(
+            "--requests", type=int, default=10, help="Orders sent by every worker"
+        )
+        parser.add_argument("--seats", type=int, default=2, help="Seats in every order")
+        parser.add_argument(
+            "--mode",
+            choices=["manual", "auto"],
+            default="manual",
+            help="Order chosen seats or let the server pick them",
+        )
+        parser.add_argument(
+            "--hot-seats",
+            type=int,
+            default=100,
+            help="Manual orders choose seats from this many first seats of the train",
+        )
+        parser.add_argument("--carriages", type=int, default=10)
+        parser.add_argument("--seats-in-car", type=int, default=50)
+        parser.add_argument(
+            "--trip", type=int, help="Book existing trip instead of a new one"
+        )
+        parser.add_argument(
+            "--url",
+            help="Base url of running server (http://127.0.0.1:8000), "
+            "requests are handled in this process by default",
+        )
+        parser.add_argument(
+            "--test-db",
+            action="store_true",
+            help="Run in-process against a throwaway test database",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--keep", action="store_true", help="Keep bench data")
+        parser.add_argument("--json", action="store_true", help="Print JSON report")
+
+    def handle(self, *args, **options):
+        if options["test_db"] and options["url"]:
+            raise CommandError("--test-db can not be used with --url server")
+
+        old_name = None
+        if options["test_db"]:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            report = self.bench(options)
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for key, value in report.items():
+                self.stdout.write(f"{key}: {value}")
+
+    def bench(self, options):
+        trip, created = self.get_trip(options)
+        users = self.create_users(options["workers"])
+        try:
+            clients = [self.make_client(user, options) for user in users]
+            seats = self.hot_seats(trip, options)
+            results = []
+            rng = random.Random(options["seed"])
+            payloads = [
+                [
+                    self.payload(trip, seats, rng, options)
+                    for _ in range(options["requests"])
+                ]
+                for _ in clients
+            ]
+
+            def worker(index):
+                for payload in payloads[index]:
+                    started = time.perf_counter()
+                    status_code, body = clients[index](payload)
+                    results.append(
+                        (time.perf_counter() - started, status_code, body, payload)
+                    )
+
+            duration = run_workers(worker, len(clients))
+            return self.report(trip, results, duration, options)
+        finally:
+            if not options["keep"]:
+                self.cleanup(trip, created, users)
+
+    def get_trip(self, options):
+        if options["trip"]:
+            trip = (
+                Trip.objects.select_related("train__carriage_type")
+                .filter(pk=options["trip"])
+                .first()
+            )
+            if trip is None:
+                raise CommandError(f"Trip {options['trip']} does not exist")
+            return trip, False
+
+        carriage = CarriageType.objects.create(
+            category="bench", seats_in_car=options["seats_in_car"]
+        )
+        train = Train.objects.create(
+            name_number="BENCH",
+            carriages_quantity=options["carriages"],
+            carriage_type=carriage,
+        )
+        source = Station.objects.create(name="Bench A", latitude=0, longitude=0)
+        destination = Station.objects.create(name="Bench B", latitude=1, longitude=1)
+        route = Route.objects.create(
+            source=source, destination=destination, distance=100
+        )
+        departure = timezone.now() + timedelta(days=1)
+        trip = Trip.objects.create(
+            route=route,
+            train=train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=5),
+        )
+        return trip, True
+
+    @staticmethod
+    def create_users(count):
+        password = make_password(BENCH_PASSWORD)
+        stamp = time.time_ns()
+        return get_user_model().objects.bulk_create(
+            get_user_model()(
+                email=f"bench-{stamp}-{index}@bench.local", password=password
+            )
+            for index in range(count)
+        )
+
+    @staticmethod
+    def make_client(user, options):
+        """Return function sending order payload as the user: (status, body)"""
+        if not options["url"]:
+            host = next(
+                (
+                    host
+                    for host in settings.ALLOWED_HOSTS
+                    if host != "*" and not host.startswith(".")
+                ),
+                "localhost",
+            )
+            client = APIClient(SERVER_NAME=host)
+            client.force_authenticate(user=user)
+            url = reverse("trip:order-list")
+
+            def send(payload):
+                res = client.post(url, payload, format="json")
+                return res.status_code, res.content.decode()
+
+            return send
+
+        base_url = options["url"].rstrip("/")
+
+        def post(path, payload, token=None):
+            request = urllib.request.Request(
+                base_url + path,
+                data=json.dumps(payload).encode(),
+                headers={"Content-Type": "application/json"},
+            )
+            if token:
+                request.add_header("Authorization", f"Bearer {token}")
+            try:
+                with urllib.request.urlopen(request) as response:
+                    return response.status, response.read().decode()
+            except urllib.error.HTTPError as error:
+                return error.code, error.read().decode()
+
+        status_code, body = post(
+            reverse("user:token_obtain_pair"),
+            {"email": user.email, "password": BENCH_PASSWORD},
+        )
+        if status_code != 200:
+            raise CommandError(f"Could not get token for {user.email}: {body}")
+        token = json.loads(body)["access"]
+        url = reverse("trip:order-list")
+        return lambda payload: post(url, payload, token)
+
+    @staticmethod
+    def hot_seats(trip, options):
+        seats_in_car = trip.train.carriage_type.seats_in_car
+        total = min(options["hot_seats"], trip.train.total_seats)
+        return [
+            (index // seats_in_car + 1, index % seats_in_car + 1)
+            for index in range(total)
+        ]
+
+    @staticmethod
+    def payload(trip, seats, rng, options):
+        if options["mode"] == "auto":
+            return {"trip": trip.id, "quantity": options["seats"]}
+        return {
+            "tickets": [
+                {"trip": trip.id, "car_num": car_num, "seat_num": seat_num}
+                for car_num, seat_num in rng.sample(
+                    seats, min(options["seats"], len(seats))
+                )
+            ]
+        }
+
+    @staticmethod
+    def classify(status_code, body):
+        if status_code == 201:
+            return "created"
+        if status_code == 400 and SEAT_TAKEN_MESSAGE in body:
+            return "conflict"
+        if status_code == 400:
+            return "rejected"
+        if status_code == 429:
+            return "throttled"
+        return "error"
+
+    def report(self, trip, results, duration, options):
+        outcomes = Counter(
+            self.classify(status_code, body) for _, status_code, body, _ in results
+        )
+        seats_ordered = sum(
+            len(payload["tickets"]) if "tickets" in payload else payload["quantity"]
+            for _, status_code, _, payload in results
+            if status_code == 201
+        )
+        tickets = Ticket.objects.filter(trip=trip)
+        expected = TripInventory.expected(Trip.objects.filter(pk=trip.pk))[trip.id]
+        inventory = TripInventory.objects.get(trip=trip)
+
+        return {
+            "mode": options["mode"],
+            "workers": options["workers"],
+            "requests": len(results),
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(len(results) / duration, 1) if duration else None,
+            **latency_summary([latency for latency, *_ in results]),
+            **{
+                outcome: outcomes.get(outcome, 0)
+                for outcome in ("created", "conflict", "rejected", "throttled", "error")
+            },
+            "conflict_rate": (
+                round(outcomes["conflict"] / len(results), 3) if results else None
+            ),
+            "seats_ordered": seats_ordered,
+            "tickets_in_db": tickets.filter(
+                order__user__email__startswith="bench-"
+            ).count(),
+            "double_booked_seats": tickets.values("car_num", "seat_num")
+            .annotate(copies=Count("id"))
+            .filter(copies__gt=1)
+            .count(),
+            "booked_and_held_seats": tickets.filter(
+                Exists(
+                    HeldSeat.objects.filter(
+                        trip=trip,
+                        car_num=OuterRef("car_num"),
+                        seat_num=OuterRef("seat_num"),
+                    )
+                )
+            ).count(),
+            "inventory_in_sync": (
+                inventory.seats_booked,
+                inventory.seats_held,
+                inventory.seats_available,
+            )
+            == expected,
+        }
+
+    @staticmethod
+    def cleanup(trip, created, users):
+        get_user_model().objects.filter(pk__in=[user.pk for user in users]).delete()
+        if not created:
+            TripInventory.recount(Trip.objects.filter(pk=trip.pk))
+            return
+        route, train = trip.route, trip.train
+        trip.delete()
+        Station.objects.filter(pk__in=[route.source_id, route.destination_id]).delete()
+        CarriageType.objects.filter(pk=train.carriage_type_id).delete()
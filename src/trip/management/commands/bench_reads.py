@@ -0,0 +1,160 @@
+import json
+import socket
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from trip.benchmark import latency_summary, run_workers
+from trip.models import Trip
+from user.authentication import UserRefreshToken
+
+DEFAULT_PATHS = [
+    "/api/trips/trips/?page_size=20",
+    "/api/trips/trips/{trip}/",
+    "/api/trips/trips/{trip}/seats/",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Send concurrent trip search, detail and seat map requests to a "
+        "running server and report throughput and latency of every path"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", required=True, help="Base url of the server under test"
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path to request, {trip} is replaced with a trip id "
+            "(trips search, detail and seats by default)",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="use_async",
+            help="Request the async views (/api/trips/async/...) of the paths",
+        )
+        parser.add_argument("--workers", type=int, default=50)
+        parser.add_argument(
+            "--requests", type=int, default=20, help="Requests sent by every worker"
+        )
+        parser.add_argument(
+            "--slow-clients",
+            type=int,
+            default=0,
+            help="Connections sending an unfinished request during the run",
+        )
+        parser.add_argument("--json", action="store_true", help="Print JSON report")
+
+    def handle(self, *args, **options):
+        trip_id = Trip.objects.values_list("id", flat=True).order_by("id").first()
+        paths = [
+            path.format(trip=trip_id) for path in options["paths"] or DEFAULT_PATHS
+        ]
+        if options["use_async"]:
+            paths = [
+                path.replace("/api/trips/", "/api/trips/async/", 1) for path in paths
+            ]
+        users = self.create_users(options["workers"])
+        slow_clients = self.open_slow_clients(options)
+        try:
+            tokens = [
+                str(UserRefreshToken.for_user(user).access_token) for user in users
+            ]
+            report = {
+                "url": options["url"],
+                "workers": options["workers"],
+                "slow_clients": len(slow_clients),
+                "paths": {path: self.bench(path, tokens, options) for path in paths},
+            }
+        finally:
+            for client in slow_clients:
+                client.close()
+            get_user_model().objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for key in ("url", "workers", "slow_clients"):
+            self.stdout.write(f"{key}: {report[key]}")
+        for path, result in report["paths"].items():
+            self.stdout.write(path)
+            for key, value in result.items():
+                self.stdout.write(f"  {key}: {value}")
+
+    def bench(self, path, tokens, options):
+        url = options["url"].rstrip("/") + path
+        results = []
+
+        def worker(index):
+            request = urllib.request.Request(
+                url, headers={"Authorization": f"Bearer {tokens[index]}"}
+            )
+            for _ in range(options["requests"]):
+                started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request) as response:
+                        response.read()
+                        status_code = response.status
+                except urllib.error.HTTPError as error:
+                    status_code = error.code
+                except OSError:
+                    status_code = None
+                results.append((time.perf_counter() - started, status_code))
+
+        duration = run_workers(worker, len(tokens))
+        outcomes = Counter(self.classify(status_code) for _, status_code in results)
+        return {
+            "requests": len(results),
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(len(results) / duration, 1) if duration else None,
+            **latency_summary(
+                [latency for latency, status_code in results if status_code == 200]
+            ),
+            **{
+                outcome: outcomes.get(outcome, 0)
+                for outcome in ("ok", "throttled", "error")
+            },
+        }
+
+    @staticmethod
+    def classify(status_code):
+        if status_code == 200:
+            return "ok"
+        if status_code == 429:
+            return "throttled"
+        return "error"
+
+    @staticmethod
+    def create_users(count):
+        stamp = time.time_ns()
+        return get_user_model().objects.bulk_create(
+            get_user_model()(email=f"bench-{stamp}-{index}@bench.local")
+            for index in range(count)
+        )
+
+    @staticmethod
+    def open_slow_clients(options):
+        """
+        Open connections sending headers of a request without its end, as
+        slow mobile clients do: every one of them holds a worker of a sync
+        server, while an async server keeps them waiting in its event loop
+        """
+        address = urllib.parse.urlsplit(options["url"])
+        clients = []
+        for _ in range(options["slow_clients"]):
+            client = socket.create_connection((address.hostname, address.port or 80))
+            client.sendall(
+                f"GET /api/trips/trips/ HTTP/1.1\r\nHost: {address.netloc}\r\n".encode()
+            )
+            clients.append(client)
+        return clients
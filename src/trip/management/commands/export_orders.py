@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from trip.export import EXPORT_CHUNK_SIZE, export_orders
+from trip.serializers import OrderExportQuerySerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Write orders with their tickets as NDJSON (an order per line) or CSV "
+        "(a ticket per line), reading them from the database in chunks"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--created-after", help="Orders created at or after (date or date and time)"
+        )
+        parser.add_argument(
+            "--created-before", help="Orders created before (date or date and time)"
+        )
+        parser.add_argument(
+            "--user", help="Part of email of the user who made the order"
+        )
+        parser.add_argument("--output", default="ndjson", help="ndjson or csv")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument("--file", help="File to write, stdout by default")
+
+    def handle(self, *args, **options):
+        query = OrderExportQuerySerializer(
+            data={
+                name: options[name]
+                for name in ("created_after", "created_before", "user", "output")
+                if options[name] is not None
+            }
+        )
+        if not query.is_valid():
+            raise CommandError(query.errors)
+        params = dict(query.validated_data)
+        output = params.pop("output")
+
+        chunks = export_orders(output, chunk_size=options["chunk_size"], **params)
+        if options["file"]:
+            with open(options["file"], "w", encoding="utf-8", newline="") as file:
+                file.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
@@ -0,0 +1,43 @@
+import json
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from trip.response_cache import LOCAL_CACHE_WARNING
+from trip.serializers import TripImportSerializer
+from trip.trip_import import IMPORT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Create trips of a CSV (with a header) or NDJSON file in bulk, "
+        "report rows which could not be imported"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="CSV or NDJSON file of trips")
+        parser.add_argument(
+            "--file-format", help="ndjson or csv, by the file extension by default"
+        )
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if not settings.REDIS_URL:
+            self.stderr.write(self.style.WARNING(LOCAL_CACHE_WARNING))
+        with open(options["file"], "rb") as file:
+            data = {"file": File(file, name=options["file"])}
+            if options["file_format"]:
+                data["file_format"] = options["file_format"]
+            serializer = TripImportSerializer(data=data)
+            if not serializer.is_valid():
+                raise CommandError(serializer.errors)
+            report = serializer.save(batch_size=options["batch_size"], max_errors=None)
+
+        for error in report["errors"]:
+            self.stdout.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        message = f"Created {report['created']} trips, {report['failed']} rows failed"
+        if report["failed"]:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,52 @@
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from trip.response_cache import LOCAL_CACHE_WARNING
+from trip.schedules import MATERIALIZE_BATCH_SIZE, materialize_trips
+
+
+class Command(BaseCommand):
+    help = (
+        "Create trips of schedule templates for the next days, "
+        "only the ones which do not exist yet"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day (YYYY-MM-DD), today by default",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.SCHEDULE_HORIZON_DAYS,
+            help="Number of days to materialize",
+        )
+        parser.add_argument("--batch-size", type=int, default=MATERIALIZE_BATCH_SIZE)
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=0,
+            help="Keep running and extend the horizon every given number of seconds",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.REDIS_URL:
+            self.stderr.write(self.style.WARNING(LOCAL_CACHE_WARNING))
+        while True:
+            start = options["start"] or timezone.localdate()
+            created = materialize_trips(
+                start, options["days"], batch_size=options["batch_size"]
+            )
+            if created or not options["every"]:
+                self.stdout.write(
+                    f"Created {created} trips from {start} for {options['days']} days"
+                )
+            if not options["every"]:
+                return
+            time.sleep(options["every"])
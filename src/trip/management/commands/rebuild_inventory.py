@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from trip.models import BoardEntry, Trip, TripInventory
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate trips seat counters from tickets and holds, "
+        "fix the drifted ones"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drifted counters, exit with error if any found",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    @staticmethod
+    def inventory(trip_id, booked, held, available):
+        return TripInventory(
+            trip_id=trip_id,
+            seats_booked=booked,
+            seats_held=held,
+            seats_available=available,
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            expected = TripInventory.expected()
+            actual = {
+                trip_id: tuple(counters)
+                for trip_id, *counters in TripInventory.objects.values_list(
+                    "trip_id", "seats_booked", "seats_held", "seats_available"
+                )
+            }
+            missing = [trip_id for trip_id in expected if trip_id not in actual]
+            drifted = [
+                trip_id
+                for trip_id, counters in expected.items()
+                if trip_id in actual and actual[trip_id] != counters
+            ]
+
+            for trip_id in drifted:
+                self.stdout.write(
+                    f"trip #{trip_id}: booked/held/available "
+                    f"{actual[trip_id]}, expected {expected[trip_id]}"
+                )
+            for trip_id in missing:
+                self.stdout.write(f"trip #{trip_id}: inventory is missing")
+
+            if options["check"]:
+                if missing or drifted:
+                    raise CommandError(
+                        f"{len(drifted)} drifted, {len(missing)} missing inventories"
+                    )
+                self.stdout.write(self.style.SUCCESS("All inventories are correct"))
+                return
+
+            TripInventory.objects.bulk_update(
+                [
+                    self.inventory(trip_id, *expected[trip_id])
+                    for trip_id in drifted
+                ],
+                ["seats_booked", "seats_held", "seats_available"],
+                batch_size=options["batch_size"],
+            )
+            TripInventory.objects.bulk_create(
+                [
+                    self.inventory(trip_id, *expected[trip_id])
+                    for trip_id in missing
+                ],
+                batch_size=options["batch_size"],
+            )
+            BoardEntry.update_seats(Trip.objects.filter(id__in=drifted + missing))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Fixed {len(drifted)} drifted, created {len(missing)} missing inventories"
+            )
+        )
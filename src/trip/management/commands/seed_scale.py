@@ -0,0 +1,404 @@
+import io
+import random
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from trip.geo import haversine_km
+from trip.models import (
+    BoardEntry,
+    CarriageType,
+    Train,
+    Crew,
+    Station,
+    Route,
+    Trip,
+    TripInventory,
+    Ticket,
+    Order,
+    TableVersion,
+)
+
+STATION_PREFIXES = ["", "", "", "Nova ", "Stara ", "Velyka ", "Mala ", "Verkhnia "]
+STATION_ROOTS = (
+    "Bila Bor Chorn Dub Hor Kamian Klen Lis Lozov "
+    "Mlyn Ozer Pol Richk Sosn Stav Topol Vyshn Zelen"
+).split()
+STATION_SUFFIXES = ["a", "e", "ivka", "ianka", "ove", "ychi", "yn", "sk", "hrad"]
+CARRIAGE_TYPES = [
+    ("Platzkart", 54),
+    ("Coupe", 36),
+    ("Lux", 18),
+    ("Intercity 1 class", 56),
+    ("Intercity 2 class", 80),
+]
+FIRST_NAMES = (
+    "Andrii Bohdan Dmytro Iryna Kateryna Mykola Nataliia Oksana "
+    "Olena Oleh Petro Serhii Taras Vira Yulia"
+).split()
+LAST_NAMES = (
+    "Bondarenko Boyko Hnatiuk Kovalenko Kravchenko Lysenko "
+    "Melnyk Moroz Oliinyk Savchenko Shevchenko Tkachenko"
+).split()
+PEAK_HOURS = {7, 8, 17, 18}
+# relative popularity of departure hours: few at night, most at peaks
+HOUR_WEIGHTS = [
+    10 if hour in PEAK_HOURS else 1 if hour < 5 or hour > 22 else 4
+    for hour in range(24)
+]
+ORDER_SIZES = [1, 2, 3, 4]
+ORDER_SIZE_WEIGHTS = [50, 30, 12, 8]
+
+
+def zipf_weights(count, exponent=1.0):
+    """Popularity of ranked items: a few popular ones and a long tail"""
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+
+def distance_km(source, destination):
+    """Great-circle distance between stations"""
+    return haversine_km(
+        source.latitude, source.longitude, destination.latitude, destination.longitude
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate large realistic dataset: popular stations and routes get "
+        "most trips, peak departures are often sold out. "
+        "Same seed and start date produce the same data"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--stations", type=int, default=300)
+        parser.add_argument("--routes", type=int, default=2000)
+        parser.add_argument("--trains", type=int, default=500)
+        parser.add_argument("--crew", type=int, default=2000)
+        parser.add_argument("--users", type=int, default=5000)
+        parser.add_argument("--trips", type=int, default=50000)
+        parser.add_argument(
+            "--tickets",
+            type=int,
+            default=1000000,
+            help="Approximate number of tickets, trips capacity is the limit",
+        )
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            default=None,
+            help="First departure date (YYYY-MM-DD), today by default",
+        )
+        parser.add_argument(
+            "--days", type=int, default=90, help="Departures are spread over days"
+        )
+        parser.add_argument(
+            "--sold-out",
+            type=float,
+            default=0.3,
+            help="Share of peak hour departures which are sold out",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--copy-size",
+            type=int,
+            default=200000,
+            help="Tickets loaded by one COPY (one transaction)",
+        )
+
+    def handle(self, *args, **options):
+        if options["stations"] < 2:
+            raise CommandError("At least 2 stations are required for routes")
+        for name in ("routes", "trains", "users", "trips"):
+            if options[name] < 1:
+                raise CommandError(f"--{name} must be positive")
+
+        self.rng = random.Random(options["seed"])
+        self.options = options
+        self.batch_size = options["batch_size"]
+        start = options["start"] or timezone.localdate()
+        self.start = timezone.make_aware(datetime.combine(start, time()))
+
+        with transaction.atomic():
+            stations = self.create_stations()
+            routes = self.create_routes(stations)
+            trains = self.create_trains()
+            crew = self.create_crew()
+            user_ids = self.create_users()
+            trips = self.create_trips(routes, trains, crew)
+            # bulk inserts bypass signals
+            TableVersion.bump(CarriageType, Train, Crew, Station, Route)
+        self.stdout.write(
+            f"{len(stations)} stations, {len(routes)} routes, {len(trains)} trains, "
+            f"{len(crew)} crew, {len(user_ids)} users, {len(trips)} trips"
+        )
+
+        booked = self.plan_bookings(trips)
+        orders, tickets = self.create_tickets(trips, booked, user_ids)
+        TripInventory.objects.bulk_create(
+            [
+                TripInventory(
+                    trip_id=trip.id,
+                    seats_booked=booked[trip.id],
+                    seats_available=trip.train.total_seats - booked[trip.id],
+                )
+                for trip in trips
+            ],
+            batch_size=self.batch_size,
+        )
+        BoardEntry.create_for_trips(
+            Trip.objects.filter(id__range=(trips[0].id, trips[-1].id))
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {orders} orders with {tickets} tickets")
+        )
+
+    def create_stations(self):
+        names = set()
+        stations = []
+        for index in range(self.options["stations"]):
+            name = (
+                self.rng.choice(STATION_PREFIXES)
+                + self.rng.choice(STATION_ROOTS)
+                + self.rng.choice(STATION_SUFFIXES)
+            )
+            if name in names:
+                name = f"{name} {index}"
+            names.add(name)
+            stations.append(
+                Station(
+                    name=name,
+                    latitude=round(self.rng.uniform(44.5, 52.3), 6),
+                    longitude=round(self.rng.uniform(22.2, 40.2), 6),
+                )
+            )
+        return Station.objects.bulk_create(stations, batch_size=self.batch_size)
+
+    def create_routes(self, stations):
+        weights = zipf_weights(len(stations))
+        pairs = set()
+        routes = []
+        # popular stations are connected with each other first
+        attempts = self.options["routes"] * 10
+        while len(routes) < self.options["routes"] and attempts:
+            attempts -= 1
+            source, destination = self.rng.choices(stations, weights, k=2)
+            if source is destination or (source.id, destination.id) in pairs:
+                continue
+            pairs.add((source.id, destination.id))
+            routes.append(
+                Route(
+                    source=source,
+                    destination=destination,
+                    distance=max(10, round(distance_km(source, destination) * 1.2)),
+                )
+            )
+        return Route.objects.bulk_create(routes, batch_size=self.batch_size)
+
+    def create_trains(self):
+        carriage_types = CarriageType.objects.bulk_create(
+            CarriageType(category=category, seats_in_car=seats)
+            for category, seats in CARRIAGE_TYPES
+        )
+        trains = []
+        for index in range(self.options["trains"]):
+            carriage_type = self.rng.choice(carriage_types)
+            carriages = self.rng.randint(4, 20)
+            trains.append(
+                Train(
+                    name_number=f"{self.rng.randint(1, 999):03d}"
+                    f"{self.rng.choice('KPLIO')}-{index}",
+                    carriages_quantity=carriages,
+                    carriage_type=carriage_type,
+                    total_seats=carriages * carriage_type.seats_in_car,
+                )
+            )
+        return Train.objects.bulk_create(trains, batch_size=self.batch_size)
+
+    def create_crew(self):
+        return Crew.objects.bulk_create(
+            (
+                Crew(
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                )
+                for _ in range(self.options["crew"])
+            ),
+            batch_size=self.batch_size,
+        )
+
+    def create_users(self):
+        """Users with unusable password, reused by the next runs with the seed"""
+        emails = [
+            f"seed-{self.options['seed']}-{index}@example.com"
+            for index in range(self.options["users"])
+        ]
+        password = make_password(None)
+        get_user_model().objects.bulk_create(
+            (get_user_model()(email=email, password=password) for email in emails),
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        return list(
+            get_user_model()
+            .objects.filter(email__in=emails)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    def create_trips(self, routes, trains, crew):
+        weights = zipf_weights(len(routes), exponent=0.8)
+        trips = []
+        for _ in range(self.options["trips"]):
+            route = self.rng.choices(routes, weights)[0]
+            departure = self.start + timedelta(
+                days=self.rng.randrange(self.options["days"]),
+                hours=self.rng.choices(range(24), HOUR_WEIGHTS)[0],
+                minutes=self.rng.randrange(0, 60, 5),
+            )
+            speed = self.rng.uniform(60, 100)
+            trips.append(
+                Trip(
+                    route=route,
+                    train=self.rng.choice(trains),
+                    departure_time=departure,
+                    arrival_time=departure
+                    + timedelta(minutes=round(route.distance / speed * 60)),
+                )
+            )
+        trips = Trip.objects.bulk_create(trips, batch_size=self.batch_size)
+
+        if crew:
+            Trip.crew.through.objects.bulk_create(
+                (
+                    Trip.crew.through(trip_id=trip.id, crew_id=member.id)
+                    for trip in trips
+                    for member in self.rng.sample(crew, min(len(crew), 3))
+                ),
+                batch_size=self.batch_size,
+            )
+        return trips
+
+    def plan_bookings(self, trips):
+        """
+        Seats booked on every trip: peak departures are often sold out,
+        the rest of tickets is spread by route popularity
+        """
+        booked = Counter()
+        sold_out = set()
+        left = self.options["tickets"]
+        for trip in trips:
+            departure = timezone.localtime(trip.departure_time)
+            if (
+                departure.hour in PEAK_HOURS
+                and self.rng.random() < self.options["sold_out"]
+                and trip.train.total_seats <= left
+            ):
+                sold_out.add(trip.id)
+                booked[trip.id] = trip.train.total_seats
+                left -= trip.train.total_seats
+
+        open_trips = [trip for trip in trips if trip.id not in sold_out]
+        if left <= 0 or not open_trips:
+            return booked
+
+        # weight of the trip is its route position in the routes popularity
+        rank = {}
+        for trip in open_trips:
+            rank.setdefault(trip.route_id, len(rank))
+        weights = [1 / (rank[trip.route_id] + 1) ** 0.5 for trip in open_trips]
+        total_weight = sum(weights)
+        for trip, weight in zip(open_trips, weights):
+            share = left * weight / total_weight
+            seats = int(share) + (self.rng.random() < share % 1)
+            booked[trip.id] = min(trip.train.total_seats, seats)
+        return booked
+
+    def create_tickets(self, trips, booked, user_ids):
+        """Orders of 1-4 adjacent seats, loaded with COPY in chunks"""
+        next_order_id = (Order.objects.aggregate(Max("id"))["id__max"] or 0) + 1
+        next_ticket_id = (Ticket.objects.aggregate(Max("id"))["id__max"] or 0) + 1
+        orders = []
+        tickets = []
+        orders_count = tickets_count = 0
+
+        for trip in trips:
+            seats_in_car = trip.train.carriage_type.seats_in_car
+            taken = sorted(
+                self.rng.sample(range(trip.train.total_seats), booked[trip.id])
+            )
+            position = 0
+            while position < len(taken):
+                size = self.rng.choices(ORDER_SIZES, ORDER_SIZE_WEIGHTS)[0]
+                created_at = trip.departure_time - timedelta(
+                    minutes=self.rng.randrange(10, 60 * 24 * 45)
+                )
+                orders.append((next_order_id, created_at, self.rng.choice(user_ids)))
+                for seat in taken[position : position + size]:
+                    tickets.append(
+                        (
+                            next_ticket_id,
+                            seat // seats_in_car + 1,
+                            seat % seats_in_car + 1,
+                            trip.id,
+                            next_order_id,
+                        )
+                    )
+                    next_ticket_id += 1
+                next_order_id += 1
+                position += size
+
+            if len(tickets) >= self.options["copy_size"]:
+                self.load_tickets(orders, tickets)
+                orders_count += len(orders)
+                tickets_count += len(tickets)
+                orders, tickets = [], []
+                self.stdout.write(f"{tickets_count} tickets loaded")
+
+        self.load_tickets(orders, tickets)
+        self.reset_sequences()
+        return orders_count + len(orders), tickets_count + len(tickets)
+
+    def load_tickets(self, orders, tickets):
+        with transaction.atomic():
+            self.copy(Order, ["id", "created_at", "user_id"], orders)
+            self.copy(
+                Ticket, ["id", "car_num", "seat_num", "trip_id", "order_id"], tickets
+            )
+
+    @staticmethod
+    def copy(model, columns, rows):
+        if not rows:
+            return
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write(
+                "\t".join(
+                    field.isoformat() if isinstance(field, datetime) else str(field)
+                    for field in row
+                )
+            )
+            buffer.write("\n")
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {model._meta.db_table} ({', '.join(columns)}) FROM STDIN",
+                buffer,
+            )
+
+    @staticmethod
+    def reset_sequences():
+        """Ids were set explicitly, move sequences past them"""
+        with connection.cursor() as cursor:
+            for model in (Order, Ticket):
+                table = model._meta.db_table
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table}"
+                )
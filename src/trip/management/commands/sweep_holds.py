@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from trip.booking import release_holds
+from trip.models import SeatHold
+
+
+class Command(BaseCommand):
+    help = "Release expired seat holds in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=0,
+            help="Keep running and sweep every given number of seconds",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_holds(
+                SeatHold.objects.filter(expires_at__lte=timezone.now())
+            )
+            if released or not options["every"]:
+                self.stdout.write(f"Released {released} expired holds")
+            if not options["every"]:
+                return
+            time.sleep(options["every"])
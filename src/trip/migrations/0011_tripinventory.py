@@ -0,0 +1,42 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:38
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_inventory(apps, schema_editor):
+    Trip = apps.get_model("trip", "Trip")
+    TripInventory = apps.get_model("trip", "TripInventory")
+    TripInventory.objects.bulk_create(
+        TripInventory(
+            trip_id=trip_id,
+            seats_booked=booked,
+            seats_available=(total_seats or 0) - booked,
+        )
+        for trip_id, total_seats, booked in Trip.objects.annotate(
+            booked=Count("tickets")
+        ).values_list("id", "train__total_seats", "booked")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trip', '0010_alter_order_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TripInventory',
+            fields=[
+                ('trip', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inventory', serialize=False, to='trip.trip')),
+                ('seats_booked', models.PositiveIntegerField(default=0)),
+                ('seats_available', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'trip inventories',
+            },
+        ),
+        migrations.RunPython(fill_inventory, migrations.RunPython.noop),
+    ]
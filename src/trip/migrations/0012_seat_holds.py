@@ -0,0 +1,48 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('trip', '0011_tripinventory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tripinventory',
+            name='seats_held',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='SeatHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('trip', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='trip.trip')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='HeldSeat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('car_num', models.PositiveIntegerField()),
+                ('seat_num', models.PositiveIntegerField()),
+                ('hold', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seats', to='trip.seathold')),
+                ('trip', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='held_seats', to='trip.trip')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='heldseat',
+            constraint=models.UniqueConstraint(fields=('car_num', 'seat_num', 'trip'), name='unique_held_car_num_seat_num_trip'),
+        ),
+    ]
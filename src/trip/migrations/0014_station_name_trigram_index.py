@@ -0,0 +1,22 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trip', '0013_keyset_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        # icontains is compiled to UPPER(name) LIKE UPPER(%s), the index
+        # has to be on the same expression to serve it
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX station_name_trgm_idx ON trip_station '
+                'USING gin (UPPER(name) gin_trgm_ops)'
+            ),
+            reverse_sql='DROP INDEX station_name_trgm_idx',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trip', '0014_station_name_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trip',
+            name='arrival_time',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:52
+
+import datetime
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trip', '0016_table_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('departure_offset', models.DurationField()),
+                ('arrival_offset', models.DurationField()),
+                ('days_of_week', models.CharField(default='1234567', help_text='ISO weekdays the trip runs on: 1 - Monday, 7 - Sunday', max_length=7, validators=[django.core.validators.RegexValidator('^[1-7]{1,7}$')])),
+                ('valid_from', models.DateField()),
+                ('valid_until', models.DateField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='scheduletemplate',
+            name='crew',
+            field=models.ManyToManyField(blank=True, related_name='schedule_templates', to='trip.crew'),
+        ),
+        migrations.AddField(
+            model_name='scheduletemplate',
+            name='route',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_templates', to='trip.route'),
+        ),
+        migrations.AddField(
+            model_name='scheduletemplate',
+            name='train',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_templates', to='trip.train'),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trips', to='trip.scheduletemplate'),
+        ),
+        migrations.AddConstraint(
+            model_name='trip',
+            constraint=models.UniqueConstraint(fields=('template', 'departure_time'), name='unique_template_departure_time'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduletemplate',
+            constraint=models.CheckConstraint(check=models.Q(('departure_offset__gte', datetime.timedelta(0)), ('departure_offset__lt', datetime.timedelta(days=1))), name='schedule_departure_during_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduletemplate',
+            constraint=models.CheckConstraint(check=models.Q(('arrival_offset__gte', django.db.models.expressions.F('departure_offset'))), name='schedule_arrival_after_departure'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduletemplate',
+            constraint=models.CheckConstraint(check=models.Q(('valid_until__isnull', True), ('valid_until__gte', django.db.models.expressions.F('valid_from')), _connector='OR'), name='schedule_valid_until_after_valid_from'),
+        ),
+    ]
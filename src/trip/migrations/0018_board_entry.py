@@ -0,0 +1,65 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trip', '0017_schedule_template'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('D', 'departure'), ('A', 'arrival')], max_length=1)),
+                ('time', models.DateTimeField()),
+                ('other_station', models.CharField(max_length=255)),
+                ('train', models.CharField(max_length=63)),
+                ('seats_available', models.IntegerField(default=0)),
+                ('station', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='board_entries', to='trip.station')),
+                ('trip', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='board_entries', to='trip.trip')),
+            ],
+            options={
+                'verbose_name_plural': 'board entries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='boardentry',
+            index=models.Index(fields=['station', 'kind', 'time', 'trip'], name='board_station_kind_time_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='boardentry',
+            constraint=models.UniqueConstraint(fields=('trip', 'kind'), name='unique_board_trip_kind'),
+        ),
+        # entries of the existing trips: departures from sources, arrivals at
+        # destinations
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO trip_boardentry
+                    (station_id, trip_id, kind, time, other_station, train,
+                     seats_available)
+                SELECT route.source_id, trip.id, 'D', trip.departure_time,
+                       destination.name, train.name_number,
+                       COALESCE(inventory.seats_available, 0)
+                FROM trip_trip trip
+                JOIN trip_route route ON route.id = trip.route_id
+                JOIN trip_station destination ON destination.id = route.destination_id
+                JOIN trip_train train ON train.id = trip.train_id
+                LEFT JOIN trip_tripinventory inventory ON inventory.trip_id = trip.id
+                UNION ALL
+                SELECT route.destination_id, trip.id, 'A', trip.arrival_time,
+                       source.name, train.name_number,
+                       COALESCE(inventory.seats_available, 0)
+                FROM trip_trip trip
+                JOIN trip_route route ON route.id = trip.route_id
+                JOIN trip_station source ON source.id = route.source_id
+                JOIN trip_train train ON train.id = trip.train_id
+                LEFT JOIN trip_tripinventory inventory ON inventory.trip_id = trip.id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
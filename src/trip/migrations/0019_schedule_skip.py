@@ -0,0 +1,26 @@
+# Generated by Django 4.0.4 on 2026-10-18 11:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trip', '0018_board_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleSkip',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skips', to='trip.scheduletemplate')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='scheduleskip',
+            constraint=models.UniqueConstraint(fields=('template', 'day'), name='unique_schedule_skip'),
+        ),
+    ]
@@ -1,6 +1,12 @@
-from django.db import models
-from django.db.models import CASCADE
-from django.db.models.constraints import UniqueConstraint
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.core.validators import RegexValidator
+from django.db import models, transaction
+from django.db.models import CASCADE, Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.constraints import CheckConstraint, UniqueConstraint
+from django.utils import timezone
 
 from train_ticket_service.settings import AUTH_USER_MODEL
 
@@ -25,8 +31,14 @@ class Train(models.Model):
         return self.name_number
 
     def save(self, *args, **kwargs):
+        adding = self._state.adding
         self.total_seats = self.carriages_quantity * self.carriage_type.seats_in_car
         super().save(*args, **kwargs)
+        TripInventory.objects.filter(trip__train=self).update(
+            seats_available=self.total_seats - F("seats_booked") - F("seats_held")
+        )
+        if not adding:
+            BoardEntry.update_seats(self.trips.all(), train=self.name_number)
 
 
 class Crew(models.Model):
@@ -66,7 +78,28 @@ class Trip(models.Model):
     crew = models.ManyToManyField("Crew", related_name="trips", blank=True)
     train = models.ForeignKey("Train", on_delete=CASCADE, related_name="trips")
     departure_time = models.DateTimeField()
-    arrival_time = models.DateTimeField()
+    arrival_time = models.DateTimeField(db_index=True)
+    template = models.ForeignKey(
+        "ScheduleTemplate",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="trips",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["departure_time", "id"], name="trip_departure_time_id_idx"
+            ),
+        ]
+        constraints = [
+            # a template makes one trip per departure
+            UniqueConstraint(
+                fields=["template", "departure_time"],
+                name="unique_template_departure_time",
+            )
+        ]
 
     def __str__(self):
         return (
@@ -74,6 +107,327 @@ class Trip(models.Model):
             f"/arrival: {self.arrival_time}"
         )
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        updated = TripInventory.objects.filter(trip=self).update(
+            seats_available=self.train.total_seats - F("seats_booked") - F("seats_held")
+        )
+        if not updated:
+            TripInventory.objects.create(
+                trip=self, seats_available=self.train.total_seats
+            )
+        if adding:
+            BoardEntry.create_for_trips(Trip.objects.filter(pk=self.pk))
+        else:
+            BoardEntry.refresh(Trip.objects.filter(pk=self.pk))
+
+
+class ScheduleTemplate(models.Model):
+    """
+    Trip running regularly: the train on the route at the same time on the
+    days of week, from `valid_from` until `valid_until` (inclusive, open
+    ended if empty). Offsets are counted from the local midnight of the
+    departure day (arrival can be on the next days). Trips are created by
+    `materialize_schedules`, one per template and departure day, except the
+    skipped days
+    """
+
+    route = models.ForeignKey(
+        "Route", on_delete=CASCADE, related_name="schedule_templates"
+    )
+    train = models.ForeignKey(
+        "Train", on_delete=CASCADE, related_name="schedule_templates"
+    )
+    crew = models.ManyToManyField("Crew", related_name="schedule_templates", blank=True)
+    departure_offset = models.DurationField()
+    arrival_offset = models.DurationField()
+    days_of_week = models.CharField(
+        max_length=7,
+        default="1234567",
+        validators=[RegexValidator(r"^[1-7]{1,7}$")],
+        help_text="ISO weekdays the trip runs on: 1 - Monday, 7 - Sunday",
+    )
+    valid_from = models.DateField()
+    valid_until = models.DateField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            CheckConstraint(
+                check=Q(departure_offset__gte=timedelta(0))
+                & Q(departure_offset__lt=timedelta(days=1)),
+                name="schedule_departure_during_day",
+            ),
+            CheckConstraint(
+                check=Q(arrival_offset__gte=F("departure_offset")),
+                name="schedule_arrival_after_departure",
+            ),
+            CheckConstraint(
+                check=Q(valid_until__isnull=True) | Q(valid_until__gte=F("valid_from")),
+                name="schedule_valid_until_after_valid_from",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.route} / {self.train} / departing +{self.departure_offset} "
+            f"on {self.days_of_week}"
+        )
+
+    def runs_on(self, day):
+        return (
+            self.valid_from <= day
+            and (self.valid_until is None or day <= self.valid_until)
+            and str(day.isoweekday()) in self.days_of_week
+        )
+
+    def trip_times(self, day):
+        """Departure and arrival time of the trip departing on the day"""
+        midnight = datetime.combine(day, time.min)
+        return (
+            timezone.make_aware(midnight + self.departure_offset),
+            timezone.make_aware(midnight + self.arrival_offset),
+        )
+
+
+class ScheduleSkip(models.Model):
+    """
+    Departure day the schedule template makes no trip on: its trip was
+    deleted, or the day is cancelled in advance
+    """
+
+    template = models.ForeignKey(
+        "ScheduleTemplate", on_delete=CASCADE, related_name="skips"
+    )
+    day = models.DateField()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["template", "day"], name="unique_schedule_skip")
+        ]
+
+    def __str__(self):
+        return f"{self.template} skipped on {self.day}"
+
+
+class TripInventory(models.Model):
+    """Denormalized seat counters of a trip, kept in step with its tickets and holds"""
+
+    trip = models.OneToOneField(
+        "Trip", on_delete=CASCADE, primary_key=True, related_name="inventory"
+    )
+    seats_booked = models.PositiveIntegerField(default=0)
+    seats_held = models.PositiveIntegerField(default=0)
+    seats_available = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "trip inventories"
+
+    def __str__(self):
+        return (
+            f"trip #{self.trip_id}: booked {self.seats_booked}, "
+            f"held {self.seats_held}, available {self.seats_available}"
+        )
+
+    @classmethod
+    def shift(cls, seats_per_trip, booked=0, held=0, available=0):
+        """Change counters by the given multipliers of {trip_id: seats_count}"""
+        for trip_id, count in seats_per_trip.items():
+            cls.objects.filter(trip_id=trip_id).update(
+                seats_booked=F("seats_booked") + booked * count,
+                seats_held=F("seats_held") + held * count,
+                seats_available=F("seats_available") + available * count,
+            )
+            if available:
+                BoardEntry.objects.filter(trip_id=trip_id).update(
+                    seats_available=F("seats_available") + available * count
+                )
+
+    @classmethod
+    def lock(cls, trip_ids):
+        """Lock inventory rows of the trips until the end of the transaction"""
+        list(
+            cls.objects.select_for_update()
+            .filter(trip_id__in=trip_ids)
+            .order_by("trip_id")
+            .values_list("trip_id", flat=True)
+        )
+
+    @classmethod
+    def book(cls, seats_per_trip):
+        """Move seats from available to booked, {trip_id: seats_count}"""
+        cls.shift(seats_per_trip, booked=1, available=-1)
+
+    @classmethod
+    def release(cls, seats_per_trip):
+        """Return booked seats back to available, {trip_id: seats_count}"""
+        cls.shift(seats_per_trip, booked=-1, available=1)
+
+    @classmethod
+    def hold(cls, seats_per_trip):
+        """Move seats from available to held, {trip_id: seats_count}"""
+        cls.shift(seats_per_trip, held=1, available=-1)
+
+    @classmethod
+    def release_hold(cls, seats_per_trip):
+        """Return held seats back to available, {trip_id: seats_count}"""
+        cls.shift(seats_per_trip, held=-1, available=1)
+
+    @classmethod
+    def recount(cls, trips):
+        """Reset counters of the trips to the ones recalculated from tickets"""
+        for trip_id, (booked, held, available) in cls.expected(trips).items():
+            cls.objects.filter(trip_id=trip_id).update(
+                seats_booked=booked, seats_held=held, seats_available=available
+            )
+        BoardEntry.update_seats(trips)
+
+    @classmethod
+    def expected(cls, trips=None):
+        """
+        Counters recalculated from tickets and holds:
+        {trip_id: (booked, held, available)}
+        """
+        trips = Trip.objects.all() if trips is None else trips
+        held = dict(
+            HeldSeat.objects.filter(trip__in=trips)
+            .values_list("trip_id")
+            .annotate(Count("id"))
+        )
+        return {
+            trip_id: (
+                booked,
+                held.get(trip_id, 0),
+                total_seats - booked - held.get(trip_id, 0),
+            )
+            for trip_id, total_seats, booked in trips.annotate(
+                booked=Count("tickets")
+            ).values_list("id", "train__total_seats", "booked")
+        }
+
+
+class BoardEntry(models.Model):
+    """
+    Departure of a trip from its source or arrival at its destination:
+    projection of trips for station boards, so a board is read from one
+    index range of the station without joins. Kept in step by saves of
+    trips, trains, stations and routes and by seat counters changes,
+    `BoardEntry.refresh` rebuilds entries of bulk created trips
+    """
+
+    DEPARTURE = "D"
+    ARRIVAL = "A"
+    KIND_CHOICES = [(DEPARTURE, "departure"), (ARRIVAL, "arrival")]
+    BATCH_SIZE = 1000
+
+    station = models.ForeignKey(
+        "Station", on_delete=CASCADE, related_name="board_entries", db_index=False
+    )
+    trip = models.ForeignKey(
+        "Trip", on_delete=CASCADE, related_name="board_entries", db_index=False
+    )
+    kind = models.CharField(max_length=1, choices=KIND_CHOICES)
+    time = models.DateTimeField()
+    # destination of departures, source of arrivals
+    other_station = models.CharField(max_length=255)
+    train = models.CharField(max_length=63)
+    seats_available = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "board entries"
+        constraints = [
+            UniqueConstraint(fields=["trip", "kind"], name="unique_board_trip_kind")
+        ]
+        indexes = [
+            models.Index(
+                fields=["station", "kind", "time", "trip"],
+                name="board_station_kind_time_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.get_kind_display()} of trip #{self.trip_id} "
+            f"at station #{self.station_id}: {self.time}"
+        )
+
+    @classmethod
+    def for_trips(cls, trips):
+        """Yield departure and arrival entries of the trips"""
+        rows = trips.values_list(
+            "id",
+            "departure_time",
+            "arrival_time",
+            "route__source_id",
+            "route__source__name",
+            "route__destination_id",
+            "route__destination__name",
+            "train__name_number",
+            "inventory__seats_available",
+        ).iterator(chunk_size=cls.BATCH_SIZE)
+        for (
+            trip_id,
+            departure_time,
+            arrival_time,
+            source_id,
+            source,
+            destination_id,
+            destination,
+            train,
+            seats_available,
+        ) in rows:
+            common = {
+                "trip_id": trip_id,
+                "train": train,
+                "seats_available": seats_available or 0,
+            }
+            yield cls(
+                station_id=source_id,
+                kind=cls.DEPARTURE,
+                time=departure_time,
+                other_station=destination,
+                **common,
+            )
+            yield cls(
+                station_id=destination_id,
+                kind=cls.ARRIVAL,
+                time=arrival_time,
+                other_station=source,
+                **common,
+            )
+
+    @classmethod
+    def create_for_trips(cls, trips):
+        """Insert entries of the trips without ones, in batches"""
+        entries = cls.for_trips(trips)
+        while True:
+            batch = list(islice(entries, cls.BATCH_SIZE))
+            if not batch:
+                break
+            cls.objects.bulk_create(batch)
+
+    @classmethod
+    def refresh(cls, trips):
+        """Replace entries of the trips with ones of their current data"""
+        with transaction.atomic(savepoint=False):
+            cls.objects.filter(trip__in=trips).delete()
+            cls.create_for_trips(trips)
+
+    @classmethod
+    def update_seats(cls, trips, **fields):
+        """Copy seat counters (and the given fields) to entries of the trips"""
+        cls.objects.filter(trip__in=trips).update(
+            seats_available=Coalesce(
+                Subquery(
+                    TripInventory.objects.filter(trip_id=OuterRef("trip_id")).values(
+                        "seats_available"
+                    )
+                ),
+                0,
+            ),
+            **fields,
+        )
+
 
 class Ticket(models.Model):
     car_num = models.PositiveIntegerField()
@@ -104,6 +458,86 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="order_created_at_id_idx"),
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="order_user_created_at_id_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"#{str(self.id)} tickets: {list(self.tickets.all())}"
+
+
+class SeatHold(models.Model):
+    """Seats of the trip reserved by user for a short time before ordering"""
+
+    trip = models.ForeignKey("Trip", on_delete=CASCADE, related_name="holds")
+    user = models.ForeignKey(
+        AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"#{str(self.id)} trip #{self.trip_id} until {self.expires_at}"
+
+
+class HeldSeat(models.Model):
+    car_num = models.PositiveIntegerField()
+    seat_num = models.PositiveIntegerField()
+    trip = models.ForeignKey("Trip", on_delete=CASCADE, related_name="held_seats")
+    hold = models.ForeignKey("SeatHold", on_delete=CASCADE, related_name="seats")
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["car_num", "seat_num", "trip"],
+                name="unique_held_car_num_seat_num_trip",
+            )
+        ]
+
+    def __str__(self):
+        return f"car#: {self.car_num}, seat#: {self.seat_num}"
+
+
+class TableVersion(models.Model):
+    """
+    Change counter of a table, bumped in the transaction of every change:
+    clients revalidate cached lists of reference data by its version
+    """
+
+    table = models.CharField(max_length=63, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.table} v{self.version} ({self.updated_at})"
+
+    @classmethod
+    def bump(cls, *models):
+        """Increment versions of tables of the models"""
+        tables = [model._meta.label_lower for model in models]
+        updated = cls.objects.filter(table__in=tables).update(
+            version=F("version") + 1, updated_at=timezone.now()
+        )
+        if updated < len(tables):
+            # tables without a counter yet
+            cls.objects.bulk_create(
+                [cls(table=table, version=1) for table in tables],
+                ignore_conflicts=True,
+            )
+
+    @classmethod
+    def get_versions(cls, *models):
+        """Return {table: (version, updated_at)} of the models"""
+        return {
+            table: (version, updated_at)
+            for table, version, updated_at in cls.objects.filter(
+                table__in=[model._meta.label_lower for model in models]
+            ).values_list("table", "version", "updated_at")
+        }
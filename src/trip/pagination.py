@@ -0,0 +1,168 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    Cursor pagination on unique ordering (field, "id"): the page continues
+    right after the last row of the previous one, so deep pages cost the same
+    as the first page. Used when `cursor` or `page_size` query parameter is
+    given, otherwise limit/offset pagination (or full list) works as before
+    """
+
+    ordering = ("id",)
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 20
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        )
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.model = queryset.model
+        self.base_url = request.build_absolute_uri()
+        size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.get_ordering(reverse)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+        results = list(queryset[: size + 1])
+        has_more = len(results) > size
+        results = results[:size]
+        if reverse:
+            results.reverse()
+
+        # paging backwards came from the next page, forwards - from the previous
+        has_next, has_previous = has_more, position is not None
+        if reverse:
+            has_next, has_previous = has_previous, has_next
+
+        self.next_position = self.previous_position = None
+        if results and has_next:
+            self.next_position = self.get_position(results[-1])
+        if results and has_previous:
+            self.previous_position = self.get_position(results[0])
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "next": self.get_cursor_link(self.next_position, False),
+                "previous": self.get_cursor_link(self.previous_position, True),
+                "results": data,
+            }
+        )
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, 0))
+        except ValueError:
+            size = 0
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, reverse=False):
+        """Ordering of the page query, flipped when paging backwards"""
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        )
+
+    @staticmethod
+    def after(ordering, position):
+        """
+        Rows after the position in the ordering: (a, b) > (x, y).
+        `a >= x` is repeated outside OR, so the index range starts at x
+        """
+        (first, last), (first_value, last_value) = ordering, position
+        lookup = "lt" if first.startswith("-") else "gt"
+        first, last = first.lstrip("-"), last.lstrip("-")
+        return Q(**{f"{first}__{lookup}e": first_value}) & (
+            Q(**{f"{first}__{lookup}": first_value})
+            | Q(**{first: first_value, f"{last}__{lookup}": last_value})
+        )
+
+    def get_position(self, obj):
+        if isinstance(obj, dict):
+            # row of values(): ordering fields are among its columns
+            obj = self.model(
+                **{field.lstrip("-"): obj[field.lstrip("-")] for field in self.ordering}
+            )
+        return [
+            obj._meta.get_field(field.lstrip("-")).value_to_string(obj)
+            for field in self.ordering
+        ]
+
+    def decode_cursor(self, request, model):
+        """Return (position, reverse) of the cursor"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            *position, reverse = json.loads(urlsafe_b64decode(encoded.encode()))
+            if len(position) != len(self.ordering):
+                raise ValueError(encoded)
+            position = [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (Base64Error, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(reverse)
+
+    def get_cursor_link(self, position, reverse):
+        if position is None:
+            return None
+        encoded = urlsafe_b64encode(json.dumps([*position, reverse]).encode())
+        url = remove_query_param(self.base_url, self.limit_query_param)
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded.decode())
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value (next/previous link)",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page with cursor "
+                f"pagination, {self.max_page_size} at most",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class TripPagination(KeysetPagination):
+    ordering = ("departure_time", "id")
+
+
+class OrderPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
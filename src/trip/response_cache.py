@@ -0,0 +1,167 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import urlencode
+from rest_framework import status
+from rest_framework.response import Response
+
+SCHEDULE_VERSION_KEY = "trip-cache-version:schedule"
+SEATS_VERSION_KEY = "trip-cache-version:seats"
+STATS_KEY = "trip-cache-stats"
+CACHE_HEADER = "X-Cache"
+# for commands changing trips: their invalidations reach the web workers
+# only through the shared cache
+LOCAL_CACHE_WARNING = (
+    "REDIS_URL is not set, the cache of this process is not shared: the API "
+    "serves trips and timetables cached before the change until they expire"
+)
+
+
+def trip_seats_version_key(trip_id):
+    return f"{SEATS_VERSION_KEY}:{trip_id}"
+
+
+def get_versions(keys):
+    """
+    Return current values of the version counters, missing ones start from
+    a time based value, so keys of a lost version are never reused
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(keys, now=True):
+    """
+    Increment version counters after commit, dropping data cached by
+    concurrent requests before the change became visible, and with `now`
+    at once as well, so the writer reads its own changes
+    """
+
+    def bump():
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                # no version yet, a new one is set on the next read
+                pass
+
+    if now:
+        bump()
+    transaction.on_commit(bump)
+
+
+def invalidate_schedule():
+    """Trips, routes, stations, trains or crew changed: drop all trip responses"""
+    bump_versions([SCHEDULE_VERSION_KEY])
+
+
+def invalidate_seats(trip_ids):
+    """
+    Seats of the trips changed: drop details of the trips. Lists are left
+    to TRIP_CACHE_TIMEOUT, every booking would drop all of them otherwise
+    """
+    bump_versions([trip_seats_version_key(trip_id) for trip_id in trip_ids])
+
+
+def get_query_params(view, request):
+    """
+    Query parameters the response depends on (filters and pagination) in
+    stable order, unknown parameters are left out
+    """
+    names = set(view.filterset_class.base_filters)
+    paginator = view.paginator
+    if paginator is not None:
+        names.update(
+            getattr(paginator, name)
+            for name in (
+                "limit_query_param",
+                "offset_query_param",
+                "cursor_query_param",
+                "page_size_query_param",
+            )
+            if hasattr(paginator, name)
+        )
+    return sorted(
+        (name, request.query_params.getlist(name))
+        for name in names & set(request.query_params)
+    )
+
+
+def response_cache_key(view, request):
+    if view.action == "retrieve":
+        trip_id = view.kwargs[view.lookup_url_kwarg or view.lookup_field]
+        versions = get_versions([SCHEDULE_VERSION_KEY, trip_seats_version_key(trip_id)])
+        return f"trip-cache:retrieve:{trip_id}:" + ":".join(map(str, versions))
+
+    versions = get_versions([SCHEDULE_VERSION_KEY])
+    params = urlencode(get_query_params(view, request), doseq=True)
+    digest = hashlib.md5(params.encode()).hexdigest()
+    return f"trip-cache:{view.action}:{digest}:" + ":".join(map(str, versions))
+
+
+def count(action, outcome):
+    key = f"{STATS_KEY}:{action}:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def get_stats(actions):
+    """Hits and misses of cached responses of the actions"""
+    keys = {
+        (action, outcome): f"{STATS_KEY}:{action}:{outcome}"
+        for action in actions
+        for outcome in ("hits", "misses")
+    }
+    counters = cache.get_many(keys.values())
+    stats = {}
+    for (action, outcome), key in keys.items():
+        stats.setdefault(action, {})[outcome] = counters.get(key, 0)
+    for action_stats in stats.values():
+        requests = action_stats["hits"] + action_stats["misses"]
+        action_stats["hit_ratio"] = (
+            round(action_stats["hits"] / requests, 4) if requests else None
+        )
+    return stats
+
+
+def get_cached_response(view, request):
+    """Return cache key of the response and the cached response or None"""
+    key = response_cache_key(view, request)
+    data = cache.get(key)
+    if data is None:
+        return key, None
+    count(view.action, "hits")
+    return key, Response(data, headers={CACHE_HEADER: "HIT"})
+
+
+def cached_response(method):
+    """
+    Serve successful responses of the viewset action from cache for
+    TRIP_CACHE_TIMEOUT seconds, keyed by the action, its query parameters
+    and the versions of the data it shows
+    """
+
+    @wraps(method)
+    def wrapper(view, request, *args, **kwargs):
+        key, response = get_cached_response(view, request)
+        if response is not None:
+            return response
+
+        count(view.action, "misses")
+        response = method(view, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.TRIP_CACHE_TIMEOUT)
+        response[CACHE_HEADER] = "MISS"
+        return response
+
+    return wrapper
@@ -0,0 +1,85 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+
+from trip.journeys import day_bounds, invalidate_timetables
+from trip.models import ScheduleSkip, ScheduleTemplate, Trip
+from trip.response_cache import invalidate_schedule
+from trip.trip_import import create_trips
+
+MATERIALIZE_BATCH_SIZE = 1000
+
+
+def materialize_trips(start, days=1, batch_size=MATERIALIZE_BATCH_SIZE):
+    """
+    Create trips of schedule templates departing during `days` days from
+    `start`, day by day. Days a template already has a trip on, or skips
+    (its trip was deleted), are left alone, so runs over the same days create
+    only the missing trips and deleted ones stay deleted. Templates are
+    locked until the end of the run, so concurrent runs do not duplicate
+    trips. Return number of created trips
+    """
+    end = start + timedelta(days=days)
+    created = 0
+    with transaction.atomic():
+        templates = list(
+            ScheduleTemplate.objects.filter(valid_from__lt=end)
+            .filter(Q(valid_until__isnull=True) | Q(valid_until__gte=start))
+            .select_related("train")
+            .select_for_update(of=("self",))
+            .order_by("id")
+        )
+        crew = defaultdict(set)
+        for template_id, crew_id in ScheduleTemplate.crew.through.objects.filter(
+            scheduletemplate__in=templates
+        ).values_list("scheduletemplate_id", "crew_id"):
+            crew[template_id].add(crew_id)
+        skips = set(
+            ScheduleSkip.objects.filter(
+                template__in=templates, day__gte=start, day__lt=end
+            ).values_list("template_id", "day")
+        )
+
+        pending = []
+        for day in (start + timedelta(days=number) for number in range(days)):
+            running = [
+                template
+                for template in templates
+                if template.runs_on(day) and (template.id, day) not in skips
+            ]
+            if not running:
+                continue
+            start_of_day, end_of_day = day_bounds(day)
+            # a template makes one trip a day, also if its times were changed
+            existing = set(
+                Trip.objects.filter(
+                    template__in=running,
+                    departure_time__gte=start_of_day,
+                    departure_time__lt=end_of_day,
+                ).values_list("template_id", flat=True)
+            )
+            for template in running:
+                if template.id in existing:
+                    continue
+                departure_time, arrival_time = template.trip_times(day)
+                trip = Trip(
+                    route_id=template.route_id,
+                    train_id=template.train_id,
+                    departure_time=departure_time,
+                    arrival_time=arrival_time,
+                    template=template,
+                )
+                pending.append((trip, crew[template.id], template.train.total_seats))
+            if len(pending) >= batch_size:
+                created += len(create_trips(pending))
+                pending = []
+        if pending:
+            created += len(create_trips(pending))
+
+        if created:
+            # bulk_create sends no signals of the saved trips
+            invalidate_schedule()
+            invalidate_timetables()
+    return created
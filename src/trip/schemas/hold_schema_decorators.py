@@ -0,0 +1,15 @@
+from drf_spectacular.utils import extend_schema
+
+from trip.serializers import OrderSerializer
+
+
+def hold_confirm_schema():
+    """
+    Adds to Swagger documentation the order returned by hold confirmation
+    """
+    return extend_schema(
+        request=None,
+        responses={201: OrderSerializer},
+        description="Turn the hold into an order of its seats, the hold must "
+        "not be expired.",
+    )
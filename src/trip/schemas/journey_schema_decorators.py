@@ -0,0 +1,17 @@
+from drf_spectacular.utils import extend_schema
+
+from trip.serializers import JourneyQuerySerializer, JourneySerializer
+
+
+def journey_search_schema():
+    """
+    Adds to Swagger documentation parameters of the journey search
+    """
+    return extend_schema(
+        parameters=[JourneyQuerySerializer],
+        responses=JourneySerializer(many=True),
+        description="Find journeys with transfers between two stations "
+        "departing on the date: the earliest arrival for every number of "
+        "transfers, each next journey arrives earlier with more transfers. "
+        "Journeys may continue on the next day.",
+    )
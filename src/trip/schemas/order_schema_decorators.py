@@ -1,5 +1,12 @@
 from drf_spectacular.types import OpenApiTypes
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
+from drf_spectacular.utils import (
+    extend_schema,
+    OpenApiParameter,
+    OpenApiExample,
+    OpenApiResponse,
+)
+
+from trip.serializers import OrderExportQuerySerializer
 
 
 def order_filter_schema():
@@ -27,3 +34,48 @@ def order_filter_schema():
             )
         ]
     )
+
+
+def order_create_schema():
+    """
+    Adds to Swagger documentation the order mode with automatic seats choice
+    """
+    return extend_schema(
+        description="Create order with chosen seats ('tickets' list), or send "
+        "'trip' and 'quantity' instead to get free seats picked by the "
+        "server: adjacent seats of one carriage if possible.",
+        examples=[
+            OpenApiExample(
+                name="Chosen seats",
+                value={"tickets": [{"trip": 1, "car_num": 2, "seat_num": 14}]},
+                request_only=True,
+            ),
+            OpenApiExample(
+                name="Seats picked by server",
+                value={"trip": 1, "quantity": 3},
+                request_only=True,
+            ),
+        ],
+    )
+
+
+def order_export_schema():
+    """
+    Adds to Swagger documentation parameters and formats of the orders export
+    """
+    return extend_schema(
+        parameters=[OrderExportQuerySerializer],
+        responses={
+            (200, "application/x-ndjson"): OpenApiResponse(
+                OpenApiTypes.STR,
+                description="One JSON object per line: order with its tickets",
+            ),
+            (200, "text/csv"): OpenApiResponse(
+                OpenApiTypes.STR,
+                description="Header and one line per ticket with its order",
+            ),
+        },
+        description="Stream all orders with tickets, oldest first, as NDJSON "
+        "(output=ndjson) or CSV (output=csv). Memory use of the server does "
+        "not depend on the export size. Admin only.",
+    )
@@ -1,7 +1,12 @@
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 
-from trip.serializers import StationSerializer
+from trip.serializers import (
+    NearbyStationQuerySerializer,
+    NearbyStationSerializer,
+    StationBoardQuerySerializer,
+    StationBoardSerializer,
+)
 
 
 def station_filter_schema():
@@ -45,3 +50,27 @@ def station_filter_schema():
             )
         ]
     )
+
+
+def station_nearby_schema():
+    """
+    Adds to Swagger documentation parameters of the nearby stations search
+    """
+    return extend_schema(
+        parameters=[NearbyStationQuerySerializer],
+        responses=NearbyStationSerializer(many=True),
+        description="Return stations within the radius (km) from the point "
+        "sorted by distance, the closest first.",
+    )
+
+
+def station_board_schema():
+    """
+    Adds to Swagger documentation parameters and format of the station board
+    """
+    return extend_schema(
+        parameters=[StationBoardQuerySerializer],
+        responses=StationBoardSerializer,
+        description="Return the next departures from the station and arrivals "
+        "at it, the earliest first, with free seats of the trips.",
+    )
@@ -0,0 +1,58 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiExample
+
+from trip.serializers import (
+    SeatMapSerializer,
+    TripImportReportSerializer,
+    TripImportSerializer,
+)
+
+
+def seat_map_schema():
+    """
+    Adds to Swagger documentation description of the seat map format
+    """
+    return extend_schema(
+        responses=SeatMapSerializer,
+        description="Return taken seats of the trip. Every item of 'cars' is "
+        "a base64 encoded bitset of one carriage (cars ordered from 1): "
+        "seat N is taken if bit (N - 1) % 8 (counting from the highest one) "
+        "of byte (N - 1) // 8 is set.",
+    )
+
+
+def trip_cache_stats_schema():
+    """
+    Adds to Swagger documentation format of the trips cache statistics
+    """
+    return extend_schema(
+        responses=OpenApiTypes.OBJECT,
+        description="Return hits, misses and hit ratio of cached trips list "
+        "and trip details responses (X-Cache response header shows HIT or "
+        "MISS of a single response). Admin only.",
+        examples=[
+            OpenApiExample(
+                name="Statistics",
+                value={
+                    "list": {"hits": 950, "misses": 50, "hit_ratio": 0.95},
+                    "retrieve": {"hits": 0, "misses": 0, "hit_ratio": None},
+                },
+                response_only=True,
+            )
+        ],
+    )
+
+
+def trip_import_schema():
+    """
+    Adds to Swagger documentation the file format and report of the trips import
+    """
+    return extend_schema(
+        request={"multipart/form-data": TripImportSerializer},
+        responses=TripImportReportSerializer,
+        description="Create trips of a CSV (with a header) or NDJSON file in "
+        "bulk. A row has 'train', 'departure_time', 'arrival_time', 'crew' "
+        "(ids, separated by spaces in CSV) and 'route' id or 'from_station' "
+        "and 'to_station' names. Invalid rows are reported with their line "
+        "numbers, the other ones are created. Admin only.",
+    )
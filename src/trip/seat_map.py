@@ -0,0 +1,231 @@
+import base64
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from trip.models import Ticket, HeldSeat
+
+
+class SeatMap:
+    """
+    Occupancy bitmap of the trip seats: one bit per seat, every car starts
+    from a new byte, seat 1 is the highest bit of the car's first byte
+    """
+
+    def __init__(self, carriages, seats_in_car, bits=None):
+        self.carriages = carriages
+        self.seats_in_car = seats_in_car
+        self.car_size = (seats_in_car + 7) // 8
+        self.bits = (
+            bytearray(bits)
+            if bits is not None
+            else bytearray(self.car_size * carriages)
+        )
+
+    @classmethod
+    def for_train(cls, train, seats=()):
+        seat_map = cls(train.carriages_quantity, train.carriage_type.seats_in_car)
+        for car_num, seat_num in seats:
+            if seat_map.contains(car_num, seat_num):
+                seat_map.take(car_num, seat_num)
+        return seat_map
+
+    def contains(self, car_num, seat_num):
+        return 1 <= car_num <= self.carriages and 1 <= seat_num <= self.seats_in_car
+
+    def _position(self, car_num, seat_num):
+        if not self.contains(car_num, seat_num):
+            raise IndexError(f"seat {car_num}/{seat_num} is out of the train")
+        seat_index = seat_num - 1
+        return (
+            (car_num - 1) * self.car_size + seat_index // 8,
+            0x80 >> (seat_index % 8),
+        )
+
+    def take(self, car_num, seat_num):
+        index, mask = self._position(car_num, seat_num)
+        self.bits[index] |= mask
+
+    def is_taken(self, car_num, seat_num):
+        index, mask = self._position(car_num, seat_num)
+        return bool(self.bits[index] & mask)
+
+    def car(self, car_num):
+        start = (car_num - 1) * self.car_size
+        return bytes(self.bits[start : start + self.car_size])
+
+    def free_seats(self, car_num):
+        return [
+            seat_num
+            for seat_num in range(1, self.seats_in_car + 1)
+            if not self.is_taken(car_num, seat_num)
+        ]
+
+    def free_runs(self, car_num):
+        """Return runs of adjacent free seats of the car as (first_seat, length)"""
+        runs = []
+        start = None
+        for seat_num in range(1, self.seats_in_car + 2):
+            free = seat_num <= self.seats_in_car and not self.is_taken(
+                car_num, seat_num
+            )
+            if free and start is None:
+                start = seat_num
+            elif not free and start is not None:
+                runs.append((start, seat_num - start))
+                start = None
+        return runs
+
+    def allocate(self, quantity):
+        """
+        Pick free seats for a group preferring adjacent seats in one car (the
+        tightest fitting run), then one car (the fewest separated runs),
+        then the fewest cars.
+        Return list of (car_num, seat_num) or None if there are not enough seats
+        """
+        runs = {
+            car_num: self.free_runs(car_num) for car_num in range(1, self.carriages + 1)
+        }
+        free = {
+            car_num: sum(size for _, size in car_runs)
+            for car_num, car_runs in runs.items()
+        }
+        if sum(free.values()) < quantity:
+            return None
+
+        fitting = [
+            (size, car_num, start)
+            for car_num, car_runs in runs.items()
+            for start, size in car_runs
+            if size >= quantity
+        ]
+        if fitting:
+            _, car_num, start = min(fitting)
+            return [(car_num, seat_num) for seat_num in range(start, start + quantity)]
+
+        single_car = [car_num for car_num in runs if free[car_num] >= quantity]
+        if single_car:
+            car_num = min(
+                single_car,
+                key=lambda car_num: (
+                    self._runs_needed(runs[car_num], quantity),
+                    car_num,
+                ),
+            )
+            return self._take(car_num, runs[car_num], quantity)
+
+        seats = []
+        for car_num in sorted(runs, key=lambda car_num: (-free[car_num], car_num)):
+            seats += self._take(
+                car_num, runs[car_num], min(free[car_num], quantity - len(seats))
+            )
+            if len(seats) == quantity:
+                break
+        return seats
+
+    @staticmethod
+    def _runs_needed(runs, quantity):
+        """Return how many of the largest free runs are needed to seat the group"""
+        covered = 0
+        for needed, size in enumerate(sorted((size for _, size in runs), reverse=True)):
+            covered += size
+            if covered >= quantity:
+                return needed + 1
+
+    @staticmethod
+    def _take(car_num, runs, quantity):
+        """Take seats of the car from its largest free runs first"""
+        seats = []
+        for start, size in sorted(runs, key=lambda run: (-run[1], run[0])):
+            count = min(size, quantity - len(seats))
+            seats.extend(
+                (car_num, seat_num) for seat_num in range(start, start + count)
+            )
+            if len(seats) == quantity:
+                break
+        return sorted(seats)
+
+    @property
+    def seats_taken(self):
+        return sum(bin(byte).count("1") for byte in self.bits)
+
+    @property
+    def seats_free(self):
+        return self.carriages * self.seats_in_car - self.seats_taken
+
+    @property
+    def cars(self):
+        return [
+            base64.b64encode(self.car(car_num)).decode()
+            for car_num in range(1, self.carriages + 1)
+        ]
+
+
+SEAT_FIELDS = ("trip_id", "car_num", "seat_num")
+
+
+def build_seat_map(trip):
+    """
+    Build seat map of the trip with a single scan of its booked and held
+    seats (trip.train and its carriage type are expected to be loaded)
+    """
+    return SeatMap.for_train(
+        trip.train,
+        Ticket.objects.filter(trip_id=trip.id)
+        .values_list("car_num", "seat_num")
+        .union(
+            HeldSeat.objects.filter(trip_id=trip.id).values_list(
+                "car_num", "seat_num"
+            ),
+            all=True,
+        ),
+    )
+
+
+def find_taken_seats(requested):
+    """Return which of requested (trip_id, car_num, seat_num) are booked or held"""
+    if not requested:
+        return set()
+    lookup = {
+        "trip_id__in": {trip_id for trip_id, _, _ in requested},
+        "car_num__in": {car_num for _, car_num, _ in requested},
+        "seat_num__in": {seat_num for _, _, seat_num in requested},
+    }
+    return requested & set(
+        Ticket.objects.filter(**lookup)
+        .values_list(*SEAT_FIELDS)
+        .union(HeldSeat.objects.filter(**lookup).values_list(*SEAT_FIELDS), all=True)
+    )
+
+
+def seat_map_cache_key(trip_id):
+    return f"seat-map:{trip_id}"
+
+
+def get_seat_map(trip):
+    """Return seat map of the trip from cache or build it"""
+    train = trip.train
+    key = seat_map_cache_key(trip.id)
+    cached = cache.get(key)
+    if cached is not None:
+        carriages, seats_in_car, bits = cached
+        if (carriages, seats_in_car) == (
+            train.carriages_quantity,
+            train.carriage_type.seats_in_car,
+        ):
+            return SeatMap(carriages, seats_in_car, bits)
+
+    seat_map = build_seat_map(trip)
+    cache.set(
+        key,
+        (seat_map.carriages, seat_map.seats_in_car, bytes(seat_map.bits)),
+        settings.SEAT_MAP_CACHE_TIMEOUT,
+    )
+    return seat_map
+
+
+def invalidate_seat_maps(trip_ids):
+    """Drop cached seat maps of the trips once booking or hold is committed"""
+    keys = [seat_map_cache_key(trip_id) for trip_id in trip_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -1,9 +1,36 @@
-from django.db import transaction
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
-from trip.models import CarriageType, Train, Crew, Station, Route, Trip, Ticket, Order
+from trip.booking import book_tickets, hold_seats, lock_seats, SEAT_TAKEN_MESSAGE
+from trip.export import EXPORT_FORMATS
+from trip.trip_import import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    IMPORT_MAX_ERRORS,
+    MAX_ID,
+    NOT_UTF8_MESSAGE,
+    import_trips,
+    read_rows,
+)
+from trip.models import (
+    CarriageType,
+    Train,
+    Crew,
+    Station,
+    Route,
+    Trip,
+    TripInventory,
+    Ticket,
+    Order,
+    SeatHold,
+    HeldSeat,
+    BoardEntry,
+)
+from trip.seat_map import build_seat_map, find_taken_seats
 
 
 class CarriageTypeSerializer(serializers.ModelSerializer):
@@ -31,9 +58,7 @@ class TrainSerializer(serializers.ModelSerializer):
 
 
 class TrainListSerializer(TrainSerializer):
-    carriage_type = serializers.SlugRelatedField(
-        read_only=True, slug_field="category"
-    )
+    carriage_type = serializers.SlugRelatedField(read_only=True, slug_field="category")
 
 
 class CrewSerializer(serializers.ModelSerializer):
@@ -55,6 +80,52 @@ class StationSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class NearbyStationQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90, help_text="Latitude")
+    lon = serializers.FloatField(min_value=-180, max_value=180, help_text="Longitude")
+    radius = serializers.FloatField(
+        min_value=0,
+        max_value=1000,
+        default=50,
+        help_text="Search radius in kilometers",
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class NearbyStationSerializer(StationSerializer):
+    distance = serializers.FloatField(help_text="Distance in kilometers")
+
+
+class StationBoardQuerySerializer(serializers.Serializer):
+    after = serializers.DateTimeField(
+        required=False, help_text="Show trips from the time, now by default"
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class BoardDepartureSerializer(serializers.ModelSerializer):
+    departure_time = serializers.DateTimeField(source="time")
+    to_station = serializers.CharField(source="other_station")
+
+    class Meta:
+        model = BoardEntry
+        fields = ["trip", "departure_time", "to_station", "train", "seats_available"]
+
+
+class BoardArrivalSerializer(serializers.ModelSerializer):
+    arrival_time = serializers.DateTimeField(source="time")
+    from_station = serializers.CharField(source="other_station")
+
+    class Meta:
+        model = BoardEntry
+        fields = ["trip", "arrival_time", "from_station", "train", "seats_available"]
+
+
+class StationBoardSerializer(serializers.Serializer):
+    departures = BoardDepartureSerializer(many=True)
+    arrivals = BoardArrivalSerializer(many=True)
+
+
 class RouteSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -72,6 +143,22 @@ class RouteDetailSerializer(RouteSerializer):
     destination = StationSerializer(read_only=True)
 
 
+def check_trip_times(data):
+    """Raise validation error if arrival_time is before departure_time"""
+    departure_time = data["departure_time"]
+    arrival_time = data["arrival_time"]
+
+    if not (departure_time <= arrival_time):
+        raise serializers.ValidationError(
+            {
+                f"departure_time > arrival_time: Departure time cannot "
+                f"be bigger than arrival time, check input parameters! "
+                f"Your departure_time - {departure_time}, "
+                f"arrival_time {arrival_time}."
+            }
+        )
+
+
 class TripSerializer(serializers.ModelSerializer):
     from_station = serializers.CharField(source="route.source.name", read_only=True)
     to_station = serializers.CharField(source="route.destination.name", read_only=True)
@@ -92,25 +179,97 @@ class TripSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         """Validate if arrival_time bigger than departure_time"""
-        departure_time = data["departure_time"]
-        arrival_time = data["arrival_time"]
+        check_trip_times(data)
+        return data
 
-        if not (departure_time <= arrival_time):
+
+class TripImportRowSerializer(serializers.Serializer):
+    """
+    Trip row of a bulk import: fields are parsed without database lookups,
+    references are checked for the whole batch by the import
+    """
+
+    route = serializers.IntegerField(required=False, min_value=1, max_value=MAX_ID)
+    from_station = serializers.CharField(required=False)
+    to_station = serializers.CharField(required=False)
+    train = serializers.IntegerField(min_value=1, max_value=MAX_ID)
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    crew = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_ID), required=False
+    )
+
+    def validate(self, data):
+        if "route" not in data and not (
+            data.get("from_station") and data.get("to_station")
+        ):
             raise serializers.ValidationError(
-                {
-                    f"departure_time > arrival_time: Departure time cannot "
-                    f"be bigger than arrival time, check input parameters! "
-                    f"Your departure_time - {departure_time}, "
-                    f"arrival_time {arrival_time}."
-                }
+                "Route is required: route id or from_station and to_station names."
             )
+        check_trip_times(data)
+        return data
+
+    def validate_rows(self, rows):
+        """
+        Yield (line, validated row, None) or (line, None, errors), the rest
+        of a file which is not UTF-8 is reported as an error of the next line
+        """
+        line = 0
+        rows = iter(rows)
+        while True:
+            try:
+                line, row = next(rows)
+            except StopIteration:
+                return
+            except UnicodeDecodeError:
+                yield line + 1, None, {"file": [NOT_UTF8_MESSAGE]}
+                return
+            try:
+                yield line, self.run_validation(row), None
+            except serializers.ValidationError as error:
+                yield line, None, error.detail
+
+
+class TripImportSerializer(serializers.Serializer):
+    file = serializers.FileField(
+        help_text="CSV with a header or NDJSON (a trip per line)"
+    )
+    file_format = serializers.ChoiceField(
+        choices=IMPORT_FORMATS,
+        required=False,
+        help_text="Format of the file, by its extension (.csv) by default",
+    )
 
+    def validate(self, data):
+        if "file_format" not in data:
+            name = data["file"].name or ""
+            data["file_format"] = "csv" if name.lower().endswith(".csv") else "ndjson"
         return data
 
+    def create(self, validated_data):
+        """Import trips of the file, return the import report"""
+        rows = read_rows(validated_data["file"], validated_data["file_format"])
+        return import_trips(
+            TripImportRowSerializer().validate_rows(rows),
+            batch_size=validated_data.get("batch_size", IMPORT_BATCH_SIZE),
+            max_errors=validated_data.get("max_errors", IMPORT_MAX_ERRORS),
+        )
+
+
+class TripImportReportSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    errors = serializers.ListField(
+        child=serializers.DictField(),
+        help_text="Line numbers and errors of the first failed rows",
+    )
+
 
 class TripListSerializer(TripSerializer):
     train = serializers.SlugRelatedField(read_only=True, slug_field="name_number")
-    seats_available = serializers.IntegerField(read_only=True)
+    seats_available = serializers.IntegerField(
+        source="inventory.seats_available", read_only=True
+    )
 
     class Meta:
         model = Trip
@@ -134,8 +293,13 @@ class TripDetailSerializer(TripSerializer):
     total_seats_capacity = serializers.IntegerField(
         source="train.total_seats", read_only=True
     )
-    seats_available = serializers.IntegerField(read_only=True)
-    seats_booked = serializers.IntegerField(read_only=True)
+    seats_available = serializers.IntegerField(
+        source="inventory.seats_available", read_only=True
+    )
+    seats_booked = serializers.IntegerField(
+        source="inventory.seats_booked", read_only=True
+    )
+    seats_held = serializers.IntegerField(source="inventory.seats_held", read_only=True)
 
     class Meta:
         model = Trip
@@ -148,48 +312,184 @@ class TripDetailSerializer(TripSerializer):
             "total_seats_capacity",
             "seats_available",
             "seats_booked",
+            "seats_held",
             "crew",
         ]
 
 
+class SeatMapSerializer(serializers.Serializer):
+    carriages = serializers.IntegerField(read_only=True)
+    seats_in_car = serializers.IntegerField(read_only=True)
+    seats_taken = serializers.IntegerField(read_only=True)
+    cars = serializers.ListField(child=serializers.CharField(), read_only=True)
+
+
+class JourneyQuerySerializer(serializers.Serializer):
+    from_station = serializers.IntegerField(
+        min_value=1, help_text="Id of the departure station"
+    )
+    to = serializers.IntegerField(min_value=1, help_text="Id of the arrival station")
+    date = serializers.DateField(help_text="Departure date (YYYY-MM-DD)")
+    max_transfers = serializers.IntegerField(min_value=0, max_value=5, default=2)
+    min_connection = serializers.IntegerField(
+        min_value=0,
+        max_value=24 * 60,
+        required=False,
+        help_text="Minimum minutes to change trains",
+    )
+
+    def get_fields(self):
+        """`from` is a keyword, so the field is renamed here"""
+        fields = super().get_fields()
+        fields["from"] = fields.pop("from_station")
+        return fields
+
+    def validate(self, data):
+        if data["from"] == data["to"]:
+            raise serializers.ValidationError(
+                {"to": "Arrival station must differ from the departure one"}
+            )
+        return data
+
+
+class JourneyLegSerializer(serializers.Serializer):
+    trip = serializers.IntegerField()
+    from_station = serializers.IntegerField()
+    from_station_name = serializers.CharField()
+    to_station = serializers.IntegerField()
+    to_station_name = serializers.CharField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+
+
+class JourneySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    duration = serializers.DurationField()
+    transfers = serializers.IntegerField()
+    legs = JourneyLegSerializer(many=True)
+
+
+def positive_int_or_none(value, limit=2**31):
+    """Return value as int if it is a valid id/number for the database"""
+    if isinstance(value, bool):
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if 0 < value < limit else None
+
+
+def check_seat_in_train(train, car_num, seat_num):
+    """Raise validation error if the train has no such carriage or seat"""
+    total_carriages = train.carriages_quantity
+    total_seats = train.carriage_type.seats_in_car
+
+    if not (1 <= car_num <= total_carriages):
+        raise serializers.ValidationError(
+            {
+                "car_num": f"carriage number must be in range "
+                f"[1, {total_carriages}] not {car_num}"
+            }
+        )
+
+    if not (1 <= seat_num <= total_seats):
+        raise serializers.ValidationError(
+            {
+                "seat_num": f"seat number must be in range "
+                f"[1, {total_seats}] not {seat_num}"
+            }
+        )
+
+
+class TripPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Takes trip from the ones preloaded for the whole order if possible"""
+
+    def to_internal_value(self, data):
+        trips = getattr(self.parent.parent, "trips", None)
+        if trips is None:
+            return super().to_internal_value(data)
+
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            trip = trips.get(int(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if trip is None:
+            self.fail("does_not_exist", pk_value=data)
+        return trip
+
+
+class BookedSeatValidator(UniqueTogetherValidator):
+    """Checks the seat against the taken ones preloaded for the whole order"""
+
+    def __call__(self, attrs, serializer):
+        taken_seats = getattr(serializer.parent, "taken_seats", None)
+        if taken_seats is None:
+            return super().__call__(attrs, serializer)
+
+        self.enforce_required_fields(attrs, serializer)
+        seat = (attrs["trip"].id, attrs["car_num"], attrs["seat_num"])
+        if seat in taken_seats:
+            raise serializers.ValidationError(self.message, code="unique")
+        taken_seats.add(seat)
+
+
+class TicketBookingListSerializer(serializers.ListSerializer):
+    """
+    Validates all tickets of the order with one query for trips (with trains
+    and carriage types) and one query for already booked or held seats
+    """
+
+    trips = None
+    taken_seats = None
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        requested = {
+            (
+                positive_int_or_none(ticket.get("trip"), limit=2**63),
+                positive_int_or_none(ticket.get("car_num")),
+                positive_int_or_none(ticket.get("seat_num")),
+            )
+            for ticket in data
+            if isinstance(ticket, dict)
+        }
+        trip_ids = {trip_id for trip_id, _, _ in requested if trip_id}
+        requested = {seat for seat in requested if None not in seat}
+
+        self.trips = Trip.objects.select_related("train__carriage_type").in_bulk(
+            trip_ids
+        )
+        self.taken_seats = find_taken_seats(requested)
+        try:
+            return super().to_internal_value(data)
+        finally:
+            self.trips = self.taken_seats = None
+
+
 class TicketSerializer(serializers.ModelSerializer):
-    trip = serializers.PrimaryKeyRelatedField(queryset=Trip.objects.all())
+    trip = TripPrimaryKeyRelatedField(queryset=Trip.objects.all())
 
     class Meta:
         model = Ticket
         fields = ["trip", "car_num", "seat_num"]
+        list_serializer_class = TicketBookingListSerializer
 
     validators = [
-        UniqueTogetherValidator(
+        BookedSeatValidator(
             queryset=Ticket.objects.all(),
             fields=["car_num", "seat_num", "trip"],
-            message="Booking prohibited! This place already taken!",
+            message=SEAT_TAKEN_MESSAGE,
         )
     ]
 
     def validate(self, data):
-        car_num = data["car_num"]
-        seat_num = data["seat_num"]
-        train = data["trip"].train
-
-        total_carriages = train.carriages_quantity
-        total_seats = train.carriage_type.seats_in_car
-
-        if not (1 <= car_num <= total_carriages):
-            raise serializers.ValidationError(
-                {
-                    "car_num": f"carriage number must be in range "
-                    f"[1, {total_carriages}] not {car_num}"
-                }
-            )
-
-        if not (1 <= seat_num <= total_seats):
-            raise serializers.ValidationError(
-                {
-                    "seat_num": f"seat number must be in range "
-                    f"[1, {total_seats}] not {seat_num}"
-                }
-            )
+        check_seat_in_train(data["trip"].train, data["car_num"], data["seat_num"])
         return data
 
 
@@ -212,15 +512,165 @@ class OrderSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets", [])
+            # seats validated before the lock may be taken by a concurrent hold
+            if lock_seats(
+                {
+                    (ticket["trip"].id, ticket["car_num"], ticket["seat_num"])
+                    for ticket in tickets_data
+                }
+            ):
+                raise serializers.ValidationError({"tickets": SEAT_TAKEN_MESSAGE})
             order = Order.objects.create(**validated_data)
-            for ticket in tickets_data:
-                Ticket.objects.create(order=order, **ticket)
+            try:
+                book_tickets(order, tickets_data)
+            except IntegrityError:
+                raise serializers.ValidationError({"tickets": SEAT_TAKEN_MESSAGE})
             return order
 
 
+class OrderAutoSeatSerializer(OrderSerializer):
+    """Order of seats for a group, the seats are picked by the server"""
+
+    ALLOCATION_ATTEMPTS = 3
+
+    trip = serializers.PrimaryKeyRelatedField(
+        queryset=Trip.objects.select_related("train__carriage_type"),
+        write_only=True,
+    )
+    quantity = serializers.IntegerField(min_value=1, max_value=50, write_only=True)
+    tickets = TicketSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ["id", "created_at", "created_by", "trip", "quantity", "tickets"]
+
+    def create(self, validated_data):
+        trip = validated_data.pop("trip")
+        quantity = validated_data.pop("quantity")
+
+        for _ in range(self.ALLOCATION_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    # the inventory row lock serializes bookings and holds on the trip
+                    TripInventory.lock([trip.id])
+                    seat_map = build_seat_map(trip)
+                    seats = seat_map.allocate(quantity)
+                    if seats is None:
+                        raise serializers.ValidationError(
+                            {
+                                "quantity": f"Only {seat_map.seats_free} seats "
+                                f"are available on the trip, not {quantity}"
+                            }
+                        )
+                    order = Order.objects.create(**validated_data)
+                    book_tickets(
+                        order,
+                        [
+                            {"trip": trip, "car_num": car_num, "seat_num": seat_num}
+                            for car_num, seat_num in seats
+                        ],
+                    )
+                    return order
+            except IntegrityError:
+                continue
+
+        raise serializers.ValidationError(
+            {"quantity": "Seats are being booked by other users, try again"}
+        )
+
+
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(read_only=True, many=True)
 
 
 class OrderDetailSerializer(OrderSerializer):
     tickets = TicketDetailSerializer(read_only=True, many=True)
+
+
+class OrderExportQuerySerializer(serializers.Serializer):
+    created_after = serializers.DateTimeField(
+        required=False,
+        input_formats=["iso-8601", "%Y-%m-%d"],
+        help_text="Orders created at or after (date or date and time)",
+    )
+    created_before = serializers.DateTimeField(
+        required=False,
+        input_formats=["iso-8601", "%Y-%m-%d"],
+        help_text="Orders created before (date or date and time)",
+    )
+    user = serializers.CharField(
+        required=False, help_text="Part of email of the user who made the order"
+    )
+    output = serializers.ChoiceField(choices=EXPORT_FORMATS, default="ndjson")
+
+
+class HeldSeatSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = HeldSeat
+        fields = ["car_num", "seat_num"]
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    trip = serializers.PrimaryKeyRelatedField(
+        queryset=Trip.objects.select_related("train__carriage_type")
+    )
+    seats = HeldSeatSerializer(many=True, allow_empty=False, max_length=50)
+
+    class Meta:
+        model = SeatHold
+        fields = ["id", "trip", "seats", "created_at", "expires_at"]
+        read_only_fields = ["expires_at"]
+
+    def validate(self, data):
+        """Validate if seats exist in the train and nobody booked or held them"""
+        trip = data["trip"]
+        seats = [(seat["car_num"], seat["seat_num"]) for seat in data["seats"]]
+
+        errors = []
+        for car_num, seat_num in seats:
+            try:
+                check_seat_in_train(trip.train, car_num, seat_num)
+            except serializers.ValidationError as error:
+                errors.append(serializers.as_serializer_error(error))
+            else:
+                errors.append({})
+        if any(errors):
+            raise serializers.ValidationError({"seats": errors})
+
+        taken = {
+            (car_num, seat_num)
+            for _, car_num, seat_num in find_taken_seats(
+                {(trip.id, car_num, seat_num) for car_num, seat_num in seats}
+            )
+        }
+        errors = []
+        for seat in seats:
+            if seat in taken:
+                errors.append({"non_field_errors": [SEAT_TAKEN_MESSAGE]})
+            else:
+                errors.append({})
+            taken.add(seat)
+        if any(errors):
+            raise serializers.ValidationError({"seats": errors})
+
+        return data
+
+    def create(self, validated_data):
+        seats_data = validated_data.pop("seats")
+        with transaction.atomic():
+            if lock_seats(
+                {
+                    (validated_data["trip"].id, seat["car_num"], seat["seat_num"])
+                    for seat in seats_data
+                }
+            ):
+                raise serializers.ValidationError({"seats": SEAT_TAKEN_MESSAGE})
+            hold = SeatHold.objects.create(
+                expires_at=timezone.now() + settings.SEAT_HOLD_TTL, **validated_data
+            )
+            try:
+                hold_seats(hold, seats_data)
+            except IntegrityError:
+                raise serializers.ValidationError({"seats": SEAT_TAKEN_MESSAGE})
+        return hold
@@ -0,0 +1,179 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from trip.geo import invalidate_station_index
+from trip.journeys import invalidate_timetables, on_trip_change
+from trip.response_cache import invalidate_schedule, invalidate_seats
+from trip.seat_map import invalidate_seat_maps
+from trip.models import (
+    BoardEntry,
+    CarriageType,
+    Crew,
+    HeldSeat,
+    Route,
+    ScheduleSkip,
+    ScheduleTemplate,
+    Station,
+    TableVersion,
+    Ticket,
+    Train,
+    Trip,
+    TripInventory,
+)
+
+
+@receiver(pre_save, sender=Trip)
+def remember_departure_day(sender, instance, **kwargs):
+    """Keep the day the trip departed on before the change"""
+    instance.departed_on = None
+    if not instance._state.adding:
+        departure_time = (
+            Trip.objects.filter(pk=instance.pk)
+            .values_list("departure_time", flat=True)
+            .first()
+        )
+        if departure_time:
+            instance.departed_on = timezone.localdate(departure_time)
+
+
+@receiver(post_save, sender=Trip)
+def update_trip_timetables(sender, instance, **kwargs):
+    days = [timezone.localdate(instance.departure_time)]
+    if getattr(instance, "departed_on", None):
+        days.append(instance.departed_on)
+    on_trip_change(instance.pk, days)
+
+
+@receiver(post_delete, sender=Trip)
+def remove_trip_from_timetables(sender, instance, **kwargs):
+    on_trip_change(instance.pk, [timezone.localdate(instance.departure_time)])
+
+
+@receiver(post_delete, sender=Trip)
+def skip_deleted_trip_day(sender, instance, **kwargs):
+    """Keep schedule materializer from creating the deleted trip again"""
+    if instance.template_id is None:
+        return
+    # the template may be deleted along with the trip (route or train)
+    if ScheduleTemplate.objects.filter(pk=instance.template_id).exists():
+        ScheduleSkip.objects.get_or_create(
+            template_id=instance.template_id,
+            day=timezone.localdate(instance.departure_time),
+        )
+
+
+@receiver(post_delete, sender=ScheduleTemplate)
+def remove_template_skips(sender, instance, **kwargs):
+    # skips of trips deleted together with the template before it
+    ScheduleSkip.objects.filter(template_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Station)
+def rename_station_on_boards(sender, instance, created, **kwargs):
+    if created:
+        return
+    BoardEntry.objects.filter(
+        kind=BoardEntry.DEPARTURE, trip__route__destination=instance
+    ).update(other_station=instance.name)
+    BoardEntry.objects.filter(
+        kind=BoardEntry.ARRIVAL, trip__route__source=instance
+    ).update(other_station=instance.name)
+
+
+@receiver(post_save, sender=Route)
+def refresh_route_boards(sender, instance, created, **kwargs):
+    if not created:
+        BoardEntry.refresh(instance.trips.all())
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+def drop_timetables(sender, **kwargs):
+    invalidate_timetables()
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+def drop_station_index(sender, **kwargs):
+    invalidate_station_index()
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_delete, sender=Trip)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+@receiver(post_save, sender=Train)
+@receiver(post_delete, sender=Train)
+@receiver(post_save, sender=CarriageType)
+@receiver(post_delete, sender=CarriageType)
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=Crew)
+def drop_trip_responses(sender, **kwargs):
+    invalidate_schedule()
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_trip(sender, instance, **kwargs):
+    """Keep the trip the ticket was booked on before the change"""
+    instance.booked_trip_id = None
+    if not instance._state.adding:
+        instance.booked_trip_id = (
+            Ticket.objects.filter(pk=instance.pk)
+            .values_list("trip_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Ticket)
+def count_saved_ticket(sender, instance, created, **kwargs):
+    """Count single saved tickets (admin) in the trips inventory"""
+    trips = [instance.trip_id]
+    if created:
+        TripInventory.book({instance.trip_id: 1})
+    elif getattr(instance, "booked_trip_id", instance.trip_id) != instance.trip_id:
+        TripInventory.release({instance.booked_trip_id: 1})
+        TripInventory.book({instance.trip_id: 1})
+        trips.append(instance.booked_trip_id)
+    invalidate_seat_maps(trips)
+    invalidate_seats(trips)
+
+
+@receiver(post_delete, sender=Ticket)
+def release_deleted_ticket(sender, instance, **kwargs):
+    """
+    Return seat of the deleted ticket to the trip inventory, also when
+    the ticket goes with its order or user
+    """
+    TripInventory.release({instance.trip_id: 1})
+    invalidate_seat_maps([instance.trip_id])
+    invalidate_seats([instance.trip_id])
+
+
+@receiver(post_delete, sender=HeldSeat)
+def release_deleted_held_seat(sender, instance, **kwargs):
+    """
+    Return the held seat to the trip inventory, also when the hold goes
+    with its user
+    """
+    TripInventory.release_hold({instance.trip_id: 1})
+    invalidate_seat_maps([instance.trip_id])
+    invalidate_seats([instance.trip_id])
+
+
+@receiver(post_save, sender=CarriageType)
+@receiver(post_delete, sender=CarriageType)
+@receiver(post_save, sender=Train)
+@receiver(post_delete, sender=Train)
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=Crew)
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def bump_table_version(sender, **kwargs):
+    TableVersion.bump(sender)
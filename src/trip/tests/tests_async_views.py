@@ -0,0 +1,108 @@
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, AsyncClient, Client
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from trip.models import (
+    Train,
+    CarriageType,
+    Station,
+    Trip,
+    Ticket,
+    Order,
+    Route,
+)
+from trip.response_cache import get_stats
+
+
+class AsyncTripViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+        self.token = f"Bearer {AccessToken.for_user(self.user)}"
+
+        carriage = CarriageType.objects.create(category="test_class1", seats_in_car=50)
+        train = Train.objects.create(
+            name_number="001T", carriages_quantity=4, carriage_type=carriage
+        )
+        station1 = Station.objects.create(
+            name="St1", latitude=10.0001, longitude=11.0002
+        )
+        station2 = Station.objects.create(
+            name="St2", latitude=20.0001, longitude=21.0002
+        )
+        route = Route.objects.create(
+            source=station1, destination=station2, distance=150
+        )
+        self.trip = Trip.objects.create(
+            route=route,
+            train=train,
+            departure_time=make_aware(datetime(2025, 3, 24, 7, 12, 0)),
+            arrival_time=make_aware(datetime(2025, 3, 24, 15, 10, 0)),
+        )
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(trip=self.trip, order=order, car_num=2, seat_num=7)
+
+    @staticmethod
+    def urls(name, *args):
+        async_url = reverse(f"trip:async-{name}", args=args)
+        return async_url, reverse(f"trip:{name}", args=args)
+
+    async def async_get(self, url, auth=True, method="get"):
+        # extra arguments of the async client are request headers
+        headers = {"AUTHORIZATION": self.token} if auth else {}
+        return await getattr(AsyncClient(), method)(url, **headers)
+
+    async def sync_get(self, url, auth=True):
+        headers = {"HTTP_AUTHORIZATION": self.token} if auth else {}
+        return await sync_to_async(Client().get)(url, **headers)
+
+    async def test_responses_match_sync_views(self):
+        for name, args, query in [
+            ("trip-list", [], "?source=St1"),
+            ("trip-list", [], "?page_size=1"),
+            ("trip-detail", [self.trip.id], ""),
+            ("trip-seats", [self.trip.id], ""),
+            ("trip-detail", [self.trip.id + 100], ""),
+        ]:
+            async_url, url = self.urls(name, *args)
+            with self.subTest(async_url + query):
+                res = await self.async_get(async_url + query)
+                await sync_to_async(cache.clear)()
+                expected = await self.sync_get(url + query)
+
+                self.assertEqual(res.status_code, expected.status_code)
+                self.assertEqual(res.content, expected.content)
+                self.assertEqual(res["Content-Type"], expected["Content-Type"])
+                self.assertEqual(res.get("X-Cache"), expected.get("X-Cache"))
+
+    async def test_cached_response_is_served(self):
+        async_url, url = self.urls("trip-detail", self.trip.id)
+
+        expected = await self.sync_get(url)
+        res = await self.async_get(async_url)
+
+        self.assertEqual(res["X-Cache"], "HIT")
+        self.assertEqual(res.content, expected.content)
+        self.assertEqual(get_stats(["retrieve"])["retrieve"]["hits"], 1)
+
+    async def test_authentication_and_methods(self):
+        async_url, url = self.urls("trip-list")
+
+        res = await self.async_get(async_url, auth=False)
+        expected = await self.sync_get(url, auth=False)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res.content, expected.content)
+        self.assertEqual(res["WWW-Authenticate"], expected["WWW-Authenticate"])
+
+        res = await self.async_get(async_url, method="post")
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
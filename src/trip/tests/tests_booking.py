@@ -0,0 +1,282 @@
+import json
+from datetime import datetime
+from io import StringIO
+from threading import Barrier, Thread
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.models import (
+    Train,
+    CarriageType,
+    Station,
+    Trip,
+    TripInventory,
+    Route,
+    Ticket,
+)
+from trip.seat_map import SeatMap
+
+ORDER_URL = reverse("trip:order-list")
+
+
+class BookingTestMixin:
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.carriage = CarriageType.objects.create(
+            category="test_class1", seats_in_car=10
+        )
+        self.train = Train.objects.create(
+            name_number="001T", carriages_quantity=3, carriage_type=self.carriage
+        )
+        self.station1 = Station.objects.create(
+            name="St1", latitude=10.0001, longitude=11.0002
+        )
+        self.station2 = Station.objects.create(
+            name="St2", latitude=20.0001, longitude=21.0002
+        )
+        self.route = Route.objects.create(
+            source=self.station1, destination=self.station2, distance=150
+        )
+        self.trip = Trip.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=make_aware(datetime(2025, 3, 24, 7, 12, 0)),
+            arrival_time=make_aware(datetime(2025, 3, 24, 15, 10, 0)),
+        )
+        self.other_trip = Trip.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=make_aware(datetime(2025, 3, 25, 7, 12, 0)),
+            arrival_time=make_aware(datetime(2025, 3, 25, 15, 10, 0)),
+        )
+
+    def book(self, *seats, trip=None):
+        trip = trip or self.trip
+        order_data = {
+            "tickets": [
+                {"car_num": car_num, "seat_num": seat_num, "trip": trip.id}
+                for car_num, seat_num in seats
+            ]
+        }
+        return self.client.post(ORDER_URL, order_data, format="json")
+
+
+class BulkOrderCreateTests(BookingTestMixin, TestCase):
+    def count_queries(self, *seats):
+        with CaptureQueriesContext(connection) as context:
+            res = self.book(*seats)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return len(context)
+
+    def test_order_queries_do_not_grow_with_tickets(self):
+        single = self.count_queries((1, 1))
+        group = self.count_queries((2, 1), (2, 2), (2, 3), (2, 4), (2, 5), (2, 6))
+
+        self.assertEqual(single, group)
+        self.assertEqual(Ticket.objects.filter(trip=self.trip).count(), 7)
+
+    def test_order_with_tickets_of_several_trips(self):
+        order_data = {
+            "tickets": [
+                {"car_num": 1, "seat_num": 1, "trip": self.trip.id},
+                {"car_num": 1, "seat_num": 1, "trip": self.other_trip.id},
+            ]
+        }
+
+        res = self.client.post(ORDER_URL, order_data, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        inventory = TripInventory.objects.get(trip=self.other_trip)
+        self.assertEqual(inventory.seats_booked, 1)
+
+    def test_taken_seat_error_is_reported_per_ticket(self):
+        self.book((1, 1))
+
+        res = self.book((1, 2), (1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][0], {})
+        self.assertEqual(
+            res.data["tickets"][1]["non_field_errors"][0],
+            "Booking prohibited! This place already taken!",
+        )
+
+    def test_same_seat_twice_in_order_rejected(self):
+        res = self.book((1, 3), (1, 3))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"][1]["non_field_errors"][0],
+            "Booking prohibited! This place already taken!",
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_unknown_trip_rejected(self):
+        order_data = {"tickets": [{"car_num": 1, "seat_num": 1, "trip": 0}]}
+
+        res = self.client.post(ORDER_URL, order_data, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"][0]["trip"][0], 'Invalid pk "0" - object does not exist.'
+        )
+
+    def test_wrong_trip_type_rejected(self):
+        order_data = {"tickets": [{"car_num": 1, "seat_num": 1, "trip": "abc"}]}
+
+        res = self.client.post(ORDER_URL, order_data, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Incorrect type", res.data["tickets"][0]["trip"][0])
+
+
+class SeatAllocationTests(TestCase):
+    def setUp(self):
+        self.seat_map = SeatMap(carriages=3, seats_in_car=10)
+
+    def take(self, car_num, *seats):
+        for seat_num in seats:
+            self.seat_map.take(car_num, seat_num)
+
+    def test_group_gets_tightest_adjacent_run(self):
+        self.take(1, 4)
+        self.take(2, 1, 2, 3, 4, 5, 6, 9)
+
+        self.assertEqual(self.seat_map.allocate(2), [(2, 7), (2, 8)])
+        self.assertEqual(self.seat_map.allocate(3), [(1, 1), (1, 2), (1, 3)])
+
+    def test_group_kept_in_one_car_when_no_adjacent_seats(self):
+        self.take(1, 3, 6, 9)
+        self.take(2, 2, 4, 6, 8, 10)
+        self.take(3, 3, 4, 5, 6, 7, 8, 9, 10)
+
+        seats = self.seat_map.allocate(5)
+
+        self.assertEqual({car_num for car_num, _ in seats}, {1})
+        self.assertEqual(len(seats), 5)
+
+    def test_group_spread_over_fewest_cars(self):
+        self.take(1, *range(1, 9))
+        self.take(2, *range(1, 5))
+        self.take(3, *range(1, 8))
+
+        seats = self.seat_map.allocate(8)
+
+        self.assertEqual({car_num for car_num, _ in seats}, {2, 3})
+        self.assertEqual(len(set(seats)), 8)
+
+    def test_not_enough_seats(self):
+        self.take(1, *range(1, 11))
+        self.take(2, *range(1, 11))
+        self.take(3, *range(1, 9))
+
+        self.assertIsNone(self.seat_map.allocate(3))
+
+
+class AutoSeatOrderTests(BookingTestMixin, TestCase):
+    def test_order_with_quantity_gets_adjacent_seats(self):
+        self.book((1, 1), (1, 2))
+
+        res = self.client.post(
+            ORDER_URL, {"trip": self.trip.id, "quantity": 3}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(ticket["car_num"], ticket["seat_num"]) for ticket in res.data["tickets"]],
+            [(1, 3), (1, 4), (1, 5)],
+        )
+        inventory = TripInventory.objects.get(trip=self.trip)
+        self.assertEqual(inventory.seats_booked, 5)
+
+    def test_order_with_quantity_bigger_than_free_seats(self):
+        res = self.client.post(
+            ORDER_URL, {"trip": self.trip.id, "quantity": 31}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("quantity", res.data)
+        self.assertFalse(Ticket.objects.exists())
+
+
+class ConcurrentAutoSeatOrderTests(BookingTestMixin, TransactionTestCase):
+    def test_concurrent_orders_never_share_seats(self):
+        workers = 6
+        barrier = Barrier(workers)
+        statuses = []
+
+        def order_seats():
+            client = APIClient()
+            client.force_authenticate(user=self.user)
+            barrier.wait()
+            try:
+                res = client.post(
+                    ORDER_URL, {"trip": self.trip.id, "quantity": 5}, format="json"
+                )
+                statuses.append(res.status_code)
+            finally:
+                connection.close()
+
+        threads = [Thread(target=order_seats) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses.count(status.HTTP_201_CREATED), workers)
+        seats = list(
+            Ticket.objects.filter(trip=self.trip).values_list("car_num", "seat_num")
+        )
+        self.assertEqual(len(seats), 30)
+        self.assertEqual(len(set(seats)), 30)
+        self.assertEqual(TripInventory.objects.get(trip=self.trip).seats_available, 0)
+
+
+class BookingBenchmarkTests(BookingTestMixin, TransactionTestCase):
+    def bench(self, *args):
+        out = StringIO()
+        call_command(
+            "bench_booking",
+            "--trip",
+            str(self.trip.id),
+            "--workers",
+            "4",
+            "--requests",
+            "3",
+            "--json",
+            *args,
+            stdout=out,
+        )
+        return json.loads(out.getvalue())
+
+    def test_manual_mode_reports_conflicts_without_double_booking(self):
+        report = self.bench("--seats", "2", "--hot-seats", "6")
+
+        self.assertEqual(report["requests"], 12)
+        self.assertEqual(report["created"] + report["conflict"], 12)
+        self.assertGreater(report["conflict"], 0)
+        self.assertEqual(report["seats_ordered"], report["tickets_in_db"])
+        self.assertEqual(report["double_booked_seats"], 0)
+        self.assertTrue(report["inventory_in_sync"])
+
+    def test_bench_data_is_removed_and_counters_restored(self):
+        self.bench("--mode", "auto", "--seats", "3")
+
+        self.assertFalse(Ticket.objects.filter(trip=self.trip).exists())
+        self.assertEqual(TripInventory.objects.get(trip=self.trip).seats_available, 30)
+        self.assertFalse(
+            get_user_model().objects.filter(email__startswith="bench-").exists()
+        )
@@ -0,0 +1,123 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.models import Train, CarriageType, Crew, Station, Route
+
+CARRIAGE_URL = reverse("trip:carriage-list")
+TRAIN_URL = reverse("trip:train-list")
+CREW_URL = reverse("trip:crew-list")
+STATION_URL = reverse("trip:station-list")
+ROUTE_URL = reverse("trip:route-list")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.carriage = CarriageType.objects.create(
+            category="test_class1", seats_in_car=10
+        )
+        self.train = Train.objects.create(
+            name_number="001T", carriages_quantity=3, carriage_type=self.carriage
+        )
+        self.crew = Crew.objects.create(first_name="Ivan", last_name="Franko")
+        self.station1 = Station.objects.create(
+            name="St1", latitude=10.0001, longitude=11.0002
+        )
+        self.station2 = Station.objects.create(
+            name="St2", latitude=20.0001, longitude=21.0002
+        )
+        self.route = Route.objects.create(
+            source=self.station1, destination=self.station2, distance=150
+        )
+
+    def get(self, url, expected=status.HTTP_200_OK, **headers):
+        res = self.client.get(url, **headers)
+        self.assertEqual(res.status_code, expected, url)
+        return res
+
+    def test_matching_etag_gets_not_modified_with_one_query(self):
+        for url in [
+            CARRIAGE_URL,
+            TRAIN_URL,
+            CREW_URL,
+            STATION_URL,
+            ROUTE_URL,
+            reverse("trip:route-detail", args=[self.route.id]),
+        ]:
+            with self.subTest(url):
+                res = self.get(url)
+                self.assertTrue(res.has_header("Last-Modified"))
+
+                with self.assertNumQueries(1):
+                    not_modified = self.get(
+                        url,
+                        status.HTTP_304_NOT_MODIFIED,
+                        HTTP_IF_NONE_MATCH=res["ETag"],
+                    )
+
+                self.assertEqual(not_modified.content, b"")
+                self.assertEqual(not_modified["ETag"], res["ETag"])
+
+    def test_changes_update_etag_of_dependent_lists(self):
+        etags = {url: self.get(url)["ETag"] for url in [STATION_URL, ROUTE_URL]}
+
+        self.station1.name = "Renamed"
+        self.station1.save()
+
+        for url, etag in etags.items():
+            res = self.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertNotEqual(res["ETag"], etag)
+        self.assertIn("Renamed", str(res.data))
+
+        etag = self.get(TRAIN_URL)["ETag"]
+        self.carriage.category = "test_class2"
+        self.carriage.save()
+
+        res = self.get(TRAIN_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.data[0]["carriage_type"], "test_class2")
+
+    def test_if_modified_since(self):
+        last_modified = self.get(CREW_URL)["Last-Modified"]
+
+        self.get(
+            CREW_URL,
+            status.HTTP_304_NOT_MODIFIED,
+            HTTP_IF_MODIFIED_SINCE=last_modified,
+        )
+        self.get(CREW_URL, HTTP_IF_MODIFIED_SINCE="Mon, 01 Jan 2001 00:00:00 GMT")
+
+    def test_other_renderer_has_other_etag(self):
+        etag = self.get(STATION_URL)["ETag"]
+
+        res = self.get(
+            f"{STATION_URL}?format=api",
+            HTTP_IF_NONE_MATCH=etag,
+        )
+
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_deleted_object_is_not_served_as_not_modified(self):
+        url = reverse("trip:crew-detail", args=[self.crew.id])
+        etag = self.get(url)["ETag"]
+
+        self.crew.delete()
+
+        self.get(url, status.HTTP_404_NOT_FOUND, HTTP_IF_NONE_MATCH=etag)
+
+    def test_seed_scale_updates_etags(self):
+        etag = self.get(STATION_URL)["ETag"]
+
+        call_command("seed_scale", trips=5, tickets=10, stdout=StringIO())
+
+        self.get(STATION_URL, HTTP_IF_NONE_MATCH=etag)
@@ -1,7 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timezone
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import make_aware
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
@@ -304,6 +306,17 @@ class TripFilterTests(TestCase):
         res = self.client.get(TRIP_URL + "?crew=Hatiko")
         self.assertEqual(len(res.data), 0)
 
+    def test_name_filters_resolve_station_and_crew_ids_without_distinct(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(TRIP_URL + "?city=St1,St3&source=st&crew=Doe")
+
+        self.assertEqual(
+            sorted(trip["id"] for trip in res.data),
+            [self.trip1.id, self.trip3.id, self.trip4.id],
+        )
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("DISTINCT", queries[0]["sql"])
+
     def test_filter_by_train(self):
         res = self.client.get(TRIP_URL + "?train=001T")
         self.assertEqual(len(res.data), 1)
@@ -343,3 +356,42 @@ class TripFilterTests(TestCase):
 
         res = self.client.get(TRIP_URL + "?date=2025-03-24,2025-04-24")
         self.assertEqual(len(res.data), 3)
+
+    def test_date_filters_compare_timestamps_without_date_cast(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                TRIP_URL + "?dep=2025-03-24,2025-05-24,2025-03-25,2025-03-23"
+            )
+
+        self.assertEqual(len(res.data), 2)
+        self.assertNotIn("::date", queries[0]["sql"])
+        self.assertNotIn("DISTINCT", queries[0]["sql"])
+        # consecutive days are merged into one range
+        self.assertEqual(queries[0]["sql"].count('departure_time" >='), 2)
+
+    def test_filter_by_departure_date_range(self):
+        res = self.client.get(TRIP_URL + "?date_from=2025-04-24")
+        self.assertEqual(len(res.data), 3)
+
+        res = self.client.get(TRIP_URL + "?date_from=2025-03-25&date_to=2025-04-24")
+        self.assertEqual(len(res.data), 2)
+
+        res = self.client.get(TRIP_URL + "?date_to=2025-03-23")
+        self.assertEqual(len(res.data), 0)
+
+    @override_settings(TIME_ZONE="Europe/Kiev")
+    def test_date_filters_use_server_timezone(self):
+        # departs 2025-03-24 00:30 in Kyiv, while in UTC it is the day before
+        self.trip1.departure_time = datetime(2025, 3, 23, 22, 30, tzinfo=timezone.utc)
+        self.trip1.save()
+
+        res = self.client.get(TRIP_URL + "?dep=2025-03-24")
+        self.assertEqual(len(res.data), 1)
+
+        res = self.client.get(TRIP_URL + "?dep=2025-03-23")
+        self.assertEqual(len(res.data), 0)
+
+    def test_invalid_date_returns_error(self):
+        res = self.client.get(TRIP_URL + "?dep=2025-13-01")
+
+        self.assertEqual(res.status_code, 400)
@@ -0,0 +1,226 @@
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from trip.models import BoardEntry, TripInventory, Ticket, Order, SeatHold, HeldSeat
+from trip.tests.tests_booking import BookingTestMixin
+
+ORDER_URL_AUTO = reverse("trip:order-list")
+
+HOLD_URL = reverse("trip:hold-list")
+TRIP_URL = reverse("trip:trip-list")
+
+
+def confirm_url(hold_id):
+    return reverse("trip:hold-confirm", args=[hold_id])
+
+
+class SeatHoldTests(BookingTestMixin, TestCase):
+    def hold(self, *seats, trip=None):
+        hold_data = {
+            "trip": (trip or self.trip).id,
+            "seats": [
+                {"car_num": car_num, "seat_num": seat_num}
+                for car_num, seat_num in seats
+            ],
+        }
+        return self.client.post(HOLD_URL, hold_data, format="json")
+
+    def inventory(self):
+        return TripInventory.objects.get(trip=self.trip)
+
+    def expire(self, hold_id):
+        SeatHold.objects.filter(id=hold_id).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_hold_counts_against_availability(self):
+        res = self.hold((1, 1), (1, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertGreater(
+            datetime.fromisoformat(res.data["expires_at"].replace("Z", "+00:00")),
+            timezone.now(),
+        )
+        res = self.client.get(TRIP_URL + f"{self.trip.id}/")
+        self.assertEqual(res.data["seats_held"], 2)
+        self.assertEqual(res.data["seats_available"], 28)
+        trips = {trip["id"]: trip for trip in self.client.get(TRIP_URL).data}
+        self.assertEqual(trips[self.trip.id]["seats_available"], 28)
+
+    def test_held_seat_shown_taken_in_seat_map(self):
+        self.hold((2, 3))
+
+        res = self.client.get(reverse("trip:trip-seats", args=[self.trip.id]))
+
+        self.assertEqual(res.data["seats_taken"], 1)
+
+    def test_held_seat_cannot_be_ordered_or_held(self):
+        self.hold((1, 1))
+
+        res = self.book((1, 1))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"][0]["non_field_errors"][0],
+            "Booking prohibited! This place already taken!",
+        )
+
+        res = self.hold((1, 2), (1, 1))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["seats"][0], {})
+        self.assertIn("non_field_errors", res.data["seats"][1])
+
+    def test_auto_order_skips_held_seats(self):
+        self.hold((1, 1), (1, 2))
+
+        res = self.client.post(
+            ORDER_URL_AUTO, {"trip": self.trip.id, "quantity": 2}, format="json"
+        )
+
+        self.assertEqual(
+            [(ticket["car_num"], ticket["seat_num"]) for ticket in res.data["tickets"]],
+            [(1, 3), (1, 4)],
+        )
+
+    def test_hold_seat_out_of_train(self):
+        res = self.hold((4, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["seats"][0]["car_num"][0],
+            "carriage number must be in range [1, 3] not 4",
+        )
+
+    def test_confirm_hold_creates_order(self):
+        hold_id = self.hold((1, 1), (1, 2)).data["id"]
+
+        res = self.client.post(confirm_url(hold_id))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(id=res.data["id"])
+        self.assertEqual(order.user, self.user)
+        self.assertEqual(order.tickets.count(), 2)
+        self.assertFalse(SeatHold.objects.exists())
+        inventory = self.inventory()
+        self.assertEqual(
+            (inventory.seats_booked, inventory.seats_held, inventory.seats_available),
+            (2, 0, 28),
+        )
+
+    def test_seats_rechecked_under_inventory_lock(self):
+        self.hold((1, 1))
+
+        # validation missing the hold, as it does when the hold commits later
+        with mock.patch("trip.serializers.find_taken_seats", return_value=set()):
+            order_res = self.book((1, 1))
+            hold_res = self.hold((1, 1))
+
+        self.assertEqual(order_res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            order_res.data["tickets"],
+            "Booking prohibited! This place already taken!",
+        )
+        self.assertEqual(hold_res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+        self.assertEqual(HeldSeat.objects.count(), 1)
+
+    def test_confirm_hold_on_booked_seat_releases_hold(self):
+        hold_id = self.hold((1, 1), (1, 2)).data["id"]
+        Ticket.objects.create(
+            order=Order.objects.create(user=self.user),
+            trip=self.trip,
+            car_num=1,
+            seat_num=2,
+        )
+
+        res = self.client.post(confirm_url(hold_id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["seats"], "Booking prohibited! This place already taken!"
+        )
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertEqual(Ticket.objects.count(), 1)
+        inventory = self.inventory()
+        self.assertEqual(
+            (inventory.seats_booked, inventory.seats_held, inventory.seats_available),
+            (1, 0, 29),
+        )
+
+    def test_confirm_expired_hold_rejected(self):
+        hold_id = self.hold((1, 1)).data["id"]
+        self.expire(hold_id)
+
+        res = self.client.post(confirm_url(hold_id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_release_hold(self):
+        hold_id = self.hold((1, 1)).data["id"]
+
+        res = self.client.delete(HOLD_URL + f"{hold_id}/")
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(HeldSeat.objects.exists())
+        self.assertEqual(self.inventory().seats_available, 30)
+
+    def test_user_deletion_releases_held_seats(self):
+        self.hold((1, 1), (1, 2))
+
+        self.user.delete()
+
+        inventory = self.inventory()
+        self.assertEqual(
+            (inventory.seats_booked, inventory.seats_held, inventory.seats_available),
+            (0, 0, 30),
+        )
+        self.assertEqual(
+            set(
+                BoardEntry.objects.filter(trip=self.trip).values_list(
+                    "seats_available", flat=True
+                )
+            ),
+            {30},
+        )
+
+    def test_sweep_releases_only_expired_holds(self):
+        expired_ids = [
+            self.hold((1, 1), (1, 2)).data["id"],
+            self.hold((2, 1), trip=self.other_trip).data["id"],
+        ]
+        self.hold((3, 1))
+        for hold_id in expired_ids:
+            self.expire(hold_id)
+
+        call_command("sweep_holds", stdout=StringIO())
+
+        self.assertEqual(SeatHold.objects.count(), 1)
+        inventory = self.inventory()
+        self.assertEqual((inventory.seats_held, inventory.seats_available), (1, 29))
+        self.assertEqual(
+            TripInventory.objects.get(trip=self.other_trip).seats_available, 30
+        )
+        call_command("rebuild_inventory", check=True, stdout=StringIO())
+
+    def test_user_sees_only_own_holds(self):
+        self.hold((1, 1))
+        other = SeatHold.objects.create(
+            trip=self.trip,
+            user=self.user.__class__.objects.create_user(
+                email="other@test.com", password="test_password"
+            ),
+            expires_at=make_aware(datetime(2030, 1, 1)),
+        )
+
+        res = self.client.get(HOLD_URL)
+
+        self.assertEqual(len(res.data), 1)
+        self.assertNotEqual(res.data[0]["id"], other.id)
@@ -0,0 +1,154 @@
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.models import (
+    Train,
+    CarriageType,
+    Station,
+    Trip,
+    TripInventory,
+    Route,
+    Order,
+    Ticket,
+)
+
+TRIP_URL = reverse("trip:trip-list")
+ORDER_URL = reverse("trip:order-list")
+
+
+class TripInventoryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.carriage = CarriageType.objects.create(
+            category="test_class1", seats_in_car=50
+        )
+        self.train = Train.objects.create(
+            name_number="001T", carriages_quantity=4, carriage_type=self.carriage
+        )
+        self.station1 = Station.objects.create(
+            name="St1", latitude=10.0001, longitude=11.0002
+        )
+        self.station2 = Station.objects.create(
+            name="St2", latitude=20.0001, longitude=21.0002
+        )
+        self.route = Route.objects.create(
+            source=self.station1, destination=self.station2, distance=150
+        )
+        self.trip = Trip.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=make_aware(datetime(2025, 3, 24, 7, 12, 0)),
+            arrival_time=make_aware(datetime(2025, 3, 24, 15, 10, 0)),
+        )
+
+    def book(self, *seats):
+        order_data = {
+            "tickets": [
+                {"car_num": car_num, "seat_num": seat_num, "trip": self.trip.id}
+                for car_num, seat_num in seats
+            ]
+        }
+        return self.client.post(ORDER_URL, order_data, format="json")
+
+    def test_inventory_created_with_trip(self):
+        inventory = TripInventory.objects.get(trip=self.trip)
+
+        self.assertEqual(inventory.seats_booked, 0)
+        self.assertEqual(inventory.seats_available, 200)
+
+    def test_order_books_seats_in_inventory(self):
+        res = self.book((1, 1), (1, 2), (2, 1))
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.get(TRIP_URL + f"{self.trip.id}/")
+
+        self.assertEqual(res.data["seats_booked"], 3)
+        self.assertEqual(res.data["seats_available"], 197)
+        self.assertEqual(self.client.get(TRIP_URL).data[0]["seats_available"], 197)
+
+    def test_order_cancel_releases_seats(self):
+        order_id = self.book((1, 1), (1, 2)).data["id"]
+
+        res = self.client.delete(ORDER_URL + f"{order_id}/")
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        inventory = TripInventory.objects.get(trip=self.trip)
+        self.assertEqual(inventory.seats_booked, 0)
+        self.assertEqual(inventory.seats_available, 200)
+
+    def test_user_deletion_releases_seats(self):
+        self.book((1, 1), (1, 2))
+
+        self.user.delete()
+
+        inventory = TripInventory.objects.get(trip=self.trip)
+        self.assertEqual(inventory.seats_booked, 0)
+        self.assertEqual(inventory.seats_available, 200)
+
+    def test_ticket_saved_or_deleted_directly_counted(self):
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            order=order, trip=self.trip, car_num=1, seat_num=1
+        )
+        ticket.seat_num = 2
+        ticket.save()
+
+        inventory = TripInventory.objects.get(trip=self.trip)
+        self.assertEqual(inventory.seats_booked, 1)
+        self.assertEqual(inventory.seats_available, 199)
+        res = self.client.get(reverse("trip:trip-seats", args=[self.trip.id]))
+        self.assertEqual(res.data["seats_taken"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.delete()
+
+        inventory = TripInventory.objects.get(trip=self.trip)
+        self.assertEqual(inventory.seats_booked, 0)
+        self.assertEqual(inventory.seats_available, 200)
+        res = self.client.get(reverse("trip:trip-seats", args=[self.trip.id]))
+        self.assertEqual(res.data["seats_taken"], 0)
+
+    def test_train_capacity_change_updates_available_seats(self):
+        self.book((1, 1))
+
+        self.train.carriages_quantity = 2
+        self.train.save()
+
+        inventory = TripInventory.objects.get(trip=self.trip)
+        self.assertEqual(inventory.seats_available, 99)
+
+    def test_rebuild_command_checks_and_fixes_counters(self):
+        self.book((1, 1))
+        TripInventory.objects.filter(trip=self.trip).update(
+            seats_booked=0, seats_available=200
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_inventory", check=True, stdout=StringIO())
+
+        call_command("rebuild_inventory", stdout=StringIO())
+
+        inventory = TripInventory.objects.get(trip=self.trip)
+        self.assertEqual(inventory.seats_booked, 1)
+        self.assertEqual(inventory.seats_available, 199)
+        call_command("rebuild_inventory", check=True, stdout=StringIO())
+
+    def test_rebuild_command_creates_missing_inventory(self):
+        TripInventory.objects.filter(trip=self.trip).delete()
+
+        call_command("rebuild_inventory", stdout=StringIO())
+
+        self.assertTrue(TripInventory.objects.filter(trip=self.trip).exists())
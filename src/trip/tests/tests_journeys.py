@@ -0,0 +1,174 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.models import Train, CarriageType, Station, Trip, Route
+
+JOURNEY_URL = reverse("trip:journey-list")
+
+
+def at(hour, minute=0, day=24):
+    return make_aware(datetime(2025, 3, day, hour, minute))
+
+
+class JourneyPlannerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        carriage = CarriageType.objects.create(category="test_class1", seats_in_car=10)
+        self.train = Train.objects.create(
+            name_number="001T", carriages_quantity=3, carriage_type=carriage
+        )
+        self.stations = {
+            name: Station.objects.create(name=name, latitude=10, longitude=11)
+            for name in ["A", "B", "C", "D"]
+        }
+        self.routes = {}
+
+    def trip(self, source, destination, departure, arrival):
+        route = self.routes.get((source, destination))
+        if route is None:
+            route = self.routes[source, destination] = Route.objects.create(
+                source=self.stations[source],
+                destination=self.stations[destination],
+                distance=100,
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            return Trip.objects.create(
+                route=route,
+                train=self.train,
+                departure_time=departure,
+                arrival_time=arrival,
+            )
+
+    def search(self, source="A", destination="D", date="2025-03-24", **params):
+        res = self.client.get(
+            JOURNEY_URL,
+            {
+                "from": self.stations[source].id,
+                "to": self.stations[destination].id,
+                "date": date,
+                **params,
+            },
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        return res.data
+
+    @staticmethod
+    def legs(journey):
+        return [leg["trip"] for leg in journey["legs"]]
+
+    def test_direct_and_faster_journey_with_transfer(self):
+        direct = self.trip("A", "D", at(8), at(18))
+        first = self.trip("A", "B", at(8), at(10))
+        second = self.trip("B", "D", at(10, 30), at(14))
+
+        journeys = self.search()
+
+        self.assertEqual(
+            [self.legs(journey) for journey in journeys],
+            [
+                [direct.id],
+                [first.id, second.id],
+            ],
+        )
+        self.assertEqual(journeys[1]["transfers"], 1)
+        self.assertEqual(journeys[1]["duration"], "06:00:00")
+        self.assertEqual(journeys[1]["legs"][0]["to_station_name"], "B")
+
+    def test_transfer_needs_minimum_connection_time(self):
+        first = self.trip("A", "B", at(8), at(10))
+        self.trip("B", "C", at(10, 5), at(11))
+        late = self.trip("B", "C", at(10, 30), at(12))
+        last = self.trip("C", "D", at(13), at(14))
+
+        journeys = self.search()
+        self.assertEqual(self.legs(journeys[0]), [first.id, late.id, last.id])
+
+        journeys = self.search(min_connection=60)
+        self.assertEqual(journeys, [])
+
+    def test_more_transfers_only_when_arriving_earlier(self):
+        self.trip("A", "B", at(8), at(9))
+        self.trip("B", "D", at(9, 30), at(15))
+        direct = self.trip("A", "D", at(9), at(14))
+
+        journeys = self.search()
+
+        self.assertEqual([self.legs(journey) for journey in journeys], [[direct.id]])
+
+    def test_max_transfers(self):
+        self.trip("A", "B", at(8), at(9))
+        self.trip("B", "C", at(10), at(11))
+        self.trip("C", "D", at(12), at(13))
+
+        self.assertEqual(len(self.search(max_transfers=2)), 1)
+        self.assertEqual(self.search(max_transfers=1), [])
+
+    def test_journey_continues_next_day_but_starts_on_the_date(self):
+        self.trip("A", "B", at(22), at(23))
+        night = self.trip("B", "D", at(1, day=25), at(6, day=25))
+        self.trip("A", "B", at(8, day=25), at(9, day=25))
+
+        journeys = self.search()
+
+        self.assertEqual(len(journeys), 1)
+        self.assertEqual(self.legs(journeys[0])[-1], night.id)
+        self.assertEqual(self.search(date="2025-03-25"), [])
+
+    def test_cached_timetable_is_updated_with_trip_changes(self):
+        first = self.trip("A", "B", at(8), at(10))
+        self.assertEqual(self.search(), [])
+
+        second = self.trip("B", "D", at(11), at(12))
+        self.assertEqual(self.legs(self.search()[0]), [first.id, second.id])
+
+        with self.assertNumQueries(0):
+            self.search()
+
+        second.departure_time = at(11, day=26)
+        second.arrival_time = at(12, day=26)
+        with self.captureOnCommitCallbacks(execute=True):
+            second.save()
+        self.assertEqual(self.search(), [])
+
+        second.departure_time = at(11)
+        second.arrival_time = at(12)
+        with self.captureOnCommitCallbacks(execute=True):
+            second.save()
+        self.assertEqual(len(self.search()), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.search(), [])
+
+    def test_station_rename_drops_cached_timetables(self):
+        self.trip("A", "D", at(8), at(18))
+        self.search()
+
+        self.stations["D"].name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stations["D"].save()
+
+        self.assertEqual(self.search()[0]["legs"][0]["to_station_name"], "Renamed")
+
+    def test_invalid_query(self):
+        for params in [
+            {},
+            {"from": 1, "to": 1, "date": "2025-03-24"},
+            {"from": 1, "to": 2, "date": "24.03.2025"},
+        ]:
+            res = self.client.get(JOURNEY_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, params)
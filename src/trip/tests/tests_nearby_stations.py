@@ -0,0 +1,150 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.geo import StationGrid, haversine_km
+from trip.models import Station
+
+NEARBY_URL = reverse("trip:station-nearby")
+
+
+class NearbyStationsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.kyiv = Station.objects.create(
+            name="Kyiv-Pas", latitude=50.4403, longitude=30.4888
+        )
+        self.darnytsia = Station.objects.create(
+            name="Darnytsia", latitude=50.4549, longitude=30.6234
+        )
+        self.fastiv = Station.objects.create(
+            name="Fastiv", latitude=50.0766, longitude=29.9177
+        )
+        self.kharkiv = Station.objects.create(
+            name="Kharkiv-Pas", latitude=49.9897, longitude=36.2055
+        )
+
+    def nearby(self, **params):
+        res = self.client.get(NEARBY_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        return res.data
+
+    def test_stations_within_radius_sorted_by_distance(self):
+        stations = self.nearby(lat=50.45, lon=30.52, radius=60)
+
+        self.assertEqual(
+            [station["name"] for station in stations],
+            ["Kyiv-Pas", "Darnytsia", "Fastiv"],
+        )
+        self.assertAlmostEqual(
+            stations[0]["distance"],
+            haversine_km(50.45, 30.52, 50.4403, 30.4888),
+            places=3,
+        )
+        self.assertEqual(stations[1]["latitude"], self.darnytsia.latitude)
+
+    def test_limit_and_default_radius(self):
+        stations = self.nearby(lat=50.45, lon=30.52, limit=1)
+        self.assertEqual([station["id"] for station in stations], [self.kyiv.id])
+
+        stations = self.nearby(lat=50.45, lon=30.52)
+        self.assertEqual(len(stations), 2)
+
+    def test_index_is_built_once_and_refreshed_with_station_changes(self):
+        self.nearby(lat=50.0, lon=36.2)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.nearby(lat=50.0, lon=36.2)), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            station = Station.objects.create(
+                name="Kharkiv-Lev", latitude=49.9777, longitude=36.2431
+            )
+        self.assertEqual(len(self.nearby(lat=50.0, lon=36.2)), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.kharkiv.delete()
+        stations = self.nearby(lat=50.0, lon=36.2)
+        self.assertEqual([station["id"] for station in stations], [station.id])
+
+    def test_index_rebuilt_after_timeout_without_version_change(self):
+        self.nearby(lat=50.0, lon=36.2)
+        # a change not seen through the cache version, as from another process
+        Station.objects.filter(id=self.kharkiv.id).update(latitude=10.0)
+
+        self.assertEqual(len(self.nearby(lat=50.0, lon=36.2)), 1)
+        with override_settings(STATION_INDEX_TIMEOUT=-1):
+            self.assertEqual(self.nearby(lat=50.0, lon=36.2), [])
+
+    def test_search_across_antimeridian_and_near_pole(self):
+        east = Station.objects.create(name="East", latitude=65.0, longitude=179.9)
+        west = Station.objects.create(name="West", latitude=65.0, longitude=-179.9)
+        pole = Station.objects.create(name="Pole", latitude=89.9, longitude=10.0)
+        other_side = Station.objects.create(
+            name="Other side", latitude=89.9, longitude=-170.0
+        )
+
+        stations = self.nearby(lat=65.0, lon=179.95, radius=20)
+        self.assertEqual({station["id"] for station in stations}, {east.id, west.id})
+
+        stations = self.nearby(lat=89.95, lon=100.0, radius=30)
+        self.assertEqual(
+            {station["id"] for station in stations}, {pole.id, other_side.id}
+        )
+
+    def test_grid_matches_full_scan(self):
+        generator = random.Random(7)
+        # sparse stations over the globe and a dense region
+        points = [
+            (generator.uniform(-90, 90), generator.uniform(-180, 180))
+            for _ in range(2000)
+        ] + [
+            (generator.uniform(44, 52), generator.uniform(22, 40)) for _ in range(3000)
+        ]
+        stations = [
+            (index, f"S{index}", lat, lon) for index, (lat, lon) in enumerate(points)
+        ]
+        grid = StationGrid(stations)
+
+        for _ in range(100):
+            lat, lon = generator.choice(
+                [
+                    (generator.uniform(-90, 90), generator.uniform(-180, 180)),
+                    (generator.uniform(44, 52), generator.uniform(22, 40)),
+                ]
+            )
+            radius = generator.choice([10, 50, 300, 1000, 5000, 20000])
+            expected = sorted(
+                (haversine_km(lat, lon, station_lat, station_lon), station_id)
+                for station_id, _, station_lat, station_lon in stations
+                if haversine_km(lat, lon, station_lat, station_lon) <= radius
+            )[:20]
+
+            found = grid.nearby(lat, lon, radius, 20)
+
+            self.assertEqual(
+                [station[1] for station in found],
+                [station_id for _, station_id in expected],
+            )
+
+    def test_invalid_query(self):
+        for params in [
+            {},
+            {"lat": 91, "lon": 0},
+            {"lat": 0, "lon": 0, "radius": -1},
+            {"lat": 0, "lon": 0, "limit": 0},
+            {"lat": "north", "lon": 0},
+        ]:
+            res = self.client.get(NEARBY_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, params)
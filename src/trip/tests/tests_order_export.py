@@ -0,0 +1,169 @@
+import csv
+import json
+import tempfile
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.export import in_thread
+from trip.models import (
+    Train,
+    CarriageType,
+    Station,
+    Trip,
+    Route,
+    Order,
+    Ticket,
+)
+
+EXPORT_URL = reverse("trip:order-export")
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            email="admin@test.com", password="test_password", is_staff=True
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+
+        carriage = CarriageType.objects.create(category="test_class1", seats_in_car=10)
+        self.trip = Trip.objects.create(
+            route=Route.objects.create(
+                source=Station.objects.create(name="St1", latitude=10, longitude=11),
+                destination=Station.objects.create(
+                    name="St2", latitude=20, longitude=21
+                ),
+                distance=150,
+            ),
+            train=Train.objects.create(
+                name_number="001T", carriages_quantity=3, carriage_type=carriage
+            ),
+            departure_time=make_aware(datetime(2025, 3, 24, 7, 12, 0)),
+            arrival_time=make_aware(datetime(2025, 3, 24, 15, 10, 0)),
+        )
+        self.orders = [
+            self.create_order(self.admin, datetime(2025, 3, 1, 10), (1, 1), (1, 2)),
+            self.create_order(self.user, datetime(2025, 3, 2, 10), (2, 1)),
+            self.create_order(self.user, datetime(2025, 3, 3, 10), (3, 1)),
+        ]
+
+    def create_order(self, user, created_at, *seats):
+        order = Order.objects.create(user=user)
+        Order.objects.filter(pk=order.pk).update(created_at=make_aware(created_at))
+        Ticket.objects.bulk_create(
+            Ticket(order=order, trip=self.trip, car_num=car_num, seat_num=seat_num)
+            for car_num, seat_num in seats
+        )
+        return order
+
+    def export(self, **params):
+        res = self.client.get(EXPORT_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(res, StreamingHttpResponse)
+        return b"".join(res.streaming_content).decode()
+
+    def test_ndjson_has_order_per_line(self):
+        orders = [json.loads(line) for line in self.export().splitlines()]
+
+        self.assertEqual([order["id"] for order in orders], [o.id for o in self.orders])
+        self.assertEqual(
+            orders[0],
+            {
+                "id": self.orders[0].id,
+                "created_at": "2025-03-01T10:00:00Z",
+                "created_by": "admin@test.com",
+                "tickets": [
+                    {
+                        "trip": self.trip.id,
+                        "from_station": "St1",
+                        "to_station": "St2",
+                        "departure_time": "2025-03-24T07:12:00Z",
+                        "arrival_time": "2025-03-24T15:10:00Z",
+                        "train": "001T",
+                        "car_num": car_num,
+                        "seat_num": seat_num,
+                    }
+                    for car_num, seat_num in ((1, 1), (1, 2))
+                ],
+            },
+        )
+
+    def test_csv_has_ticket_per_line(self):
+        res = self.client.get(EXPORT_URL, {"output": "csv"})
+        self.assertEqual(res["Content-Type"], "text/csv")
+        self.assertEqual(
+            res["Content-Disposition"], 'attachment; filename="orders.csv"'
+        )
+
+        rows = list(csv.DictReader(StringIO(b"".join(res.streaming_content).decode())))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[3]["order_id"], str(self.orders[2].id))
+        self.assertEqual(rows[3]["created_by"], "test@test.com")
+        self.assertEqual(rows[3]["car_num"], "3")
+
+    def test_filters(self):
+        def exported(**params):
+            return [
+                json.loads(line)["id"] for line in self.export(**params).splitlines()
+            ]
+
+        self.assertEqual(
+            exported(created_after="2025-03-02", created_before="2025-03-03"),
+            [self.orders[1].id],
+        )
+        self.assertEqual(exported(user="test@"), [self.orders[1].id, self.orders[2].id])
+
+    def test_invalid_params(self):
+        for params in ({"output": "xml"}, {"created_after": "yesterday"}):
+            res = self.client.get(EXPORT_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_is_for_admins(self):
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command_writes_export(self):
+        out = StringIO()
+        call_command("export_orders", "--user", "admin", stdout=out)
+        self.assertEqual(
+            [json.loads(line)["id"] for line in out.getvalue().splitlines()],
+            [self.orders[0].id],
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "orders.csv"
+            call_command(
+                "export_orders", "--output", "csv", "--chunk-size", "1", "--file", path
+            )
+            self.assertEqual(len(path.read_text().splitlines()), 5)
+
+        with self.assertRaises(CommandError):
+            call_command("export_orders", "--created-before", "never")
+
+    def test_in_thread_passes_items_and_errors(self):
+        def items():
+            yield from range(10)
+            raise ValueError("broken")
+
+        results = in_thread(items(), prefetch=2)
+
+        self.assertEqual([next(results) for _ in range(10)], list(range(10)))
+        with self.assertRaises(ValueError):
+            next(results)
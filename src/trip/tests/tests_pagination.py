@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.models import (
+    Train,
+    CarriageType,
+    Station,
+    Trip,
+    Route,
+    Order,
+)
+from trip.pagination import KeysetPagination
+
+TRIP_URL = reverse("trip:trip-list")
+ORDER_URL = reverse("trip:order-list")
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        carriage = CarriageType.objects.create(category="test_class1", seats_in_car=10)
+        train = Train.objects.create(
+            name_number="001T", carriages_quantity=3, carriage_type=carriage
+        )
+        station1 = Station.objects.create(
+            name="St1", latitude=10.0001, longitude=11.0002
+        )
+        station2 = Station.objects.create(
+            name="St2", latitude=20.0001, longitude=21.0002
+        )
+        route = Route.objects.create(
+            source=station1, destination=station2, distance=150
+        )
+        departure = make_aware(datetime(2025, 3, 24, 7, 12, 0))
+        # every departure time is shared by two trips
+        self.trips = [
+            Trip.objects.create(
+                route=route,
+                train=train,
+                departure_time=departure + timedelta(hours=index // 2),
+                arrival_time=departure + timedelta(hours=index // 2 + 5),
+            )
+            for index in reversed(range(25))
+        ]
+
+    def walk(self, url, link="next"):
+        """Follow the links from the url, return pages of ids"""
+        pages = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append([item["id"] for item in res.data["results"]])
+            url = res.data[link]
+        return pages
+
+    def test_trips_pages_follow_departure_time_and_id(self):
+        pages = self.walk(f"{TRIP_URL}?page_size=10")
+        expected = list(
+            Trip.objects.order_by("departure_time", "id").values_list("id", flat=True)
+        )
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_previous_links_return_same_pages(self):
+        forward = self.walk(f"{TRIP_URL}?page_size=10")
+        res = self.client.get(f"{TRIP_URL}?page_size=10")
+        self.assertIsNone(res.data["previous"])
+        last_page = self.client.get(self.client.get(res.data["next"]).data["next"])
+
+        backward = self.walk(last_page.data["previous"], link="previous")
+
+        self.assertEqual(backward, forward[-2::-1])
+
+    def test_page_size_is_limited(self):
+        with patch.object(KeysetPagination, "max_page_size", 7):
+            res = self.client.get(f"{TRIP_URL}?page_size=1000")
+
+        self.assertEqual(len(res.data["results"]), 7)
+
+    def test_deep_page_makes_same_queries_as_first_page(self):
+        url = f"{TRIP_URL}?page_size=2"
+        queries = []
+        while url:
+            with CaptureQueriesContext(connection) as captured:
+                res = self.client.get(url)
+            queries.append(len(captured))
+            url = res.data["next"]
+
+        self.assertEqual(len(queries), 13)
+        self.assertEqual(set(queries), {1})
+        self.assertNotIn("OFFSET", captured[0]["sql"])
+
+    def test_invalid_cursor(self):
+        for cursor in ["abc", "WzFd", "WyJ4IiwgMSwgZmFsc2Vd"]:
+            res = self.client.get(f"{TRIP_URL}?cursor={cursor}")
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND, cursor)
+
+    def test_without_cursor_list_is_not_paginated(self):
+        res = self.client.get(TRIP_URL)
+
+        self.assertEqual(len(res.data), 25)
+
+    def test_orders_pages_newest_first(self):
+        orders = [Order.objects.create(user=self.user) for _ in range(5)]
+        Order.objects.filter(id__in=[order.id for order in orders[:3]]).update(
+            created_at=orders[0].created_at
+        )
+        Order.objects.create(
+            user=get_user_model().objects.create_user(
+                email="other@test.com", password="test_password"
+            )
+        )
+
+        pages = self.walk(f"{ORDER_URL}?page_size=2")
+
+        self.assertEqual(
+            sum(pages, []),
+            list(
+                Order.objects.filter(user=self.user)
+                .order_by("-created_at", "-id")
+                .values_list("id", flat=True)
+            ),
+        )
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
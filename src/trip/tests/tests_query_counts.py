@@ -0,0 +1,510 @@
+import json
+import os
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.booking import hold_seats
+from trip.models import (
+    Train,
+    CarriageType,
+    Crew,
+    Station,
+    Route,
+    Trip,
+    Order,
+    SeatHold,
+)
+from trip.seat_map import build_seat_map
+
+# PERF_SCALE multiplies fixtures size, PERF_REPEAT - runs of every GET
+# (the fastest one is recorded), PERF_TIMINGS - file to write timings to,
+# PERF_BASELINE - timings file to compare with, PERF_TOLERANCE - allowed
+# slowdown against the baseline
+SCALE = int(os.environ.get("PERF_SCALE", 1))
+REPEAT = int(os.environ.get("PERF_REPEAT", 3))
+TOLERANCE = float(os.environ.get("PERF_TOLERANCE", 1.5))
+# timings under this difference are noise
+TOLERANCE_SLACK = 0.005
+PASSWORD = "test_password"
+
+
+def seed(seed_number):
+    call_command(
+        "seed_scale",
+        seed=seed_number,
+        stations=10 * SCALE,
+        routes=15 * SCALE,
+        trains=5 * SCALE,
+        crew=10 * SCALE,
+        users=5 * SCALE,
+        trips=20 * SCALE,
+        tickets=150 * SCALE,
+        start=timezone.localdate() + timedelta(days=1),
+        stdout=StringIO(),
+    )
+    user = get_user_model().objects.filter(email__startswith="seed-").first()
+    trips = Trip.objects.filter(inventory__seats_available__gte=2).order_by("-id")
+    for trip in trips.select_related("train__carriage_type")[: 5 * SCALE]:
+        hold = SeatHold.objects.create(
+            trip=trip, user=user, expires_at=timezone.now() + timedelta(minutes=10)
+        )
+        hold_seats(
+            hold,
+            [
+                {"car_num": car_num, "seat_num": seat_num}
+                for car_num, seat_num in build_seat_map(trip).allocate(2)
+            ],
+        )
+
+
+# responses are measured without the trips response cache
+@override_settings(TRIP_CACHE_TIMEOUT=0)
+class EndpointQueryCountTests(TestCase):
+    """
+    Every endpoint makes a fixed number of queries whatever the size of the
+    result, list endpoints are measured before and after the data is doubled
+    """
+
+    timings = {}
+    baseline = {}
+
+    # maximum queries per list action (reference data reads table versions
+    # for conditional GET first)
+    LIST_QUERIES = {
+        "trip:carriage-list": 2,
+        "trip:train-list": 2,
+        "trip:crew-list": 2,
+        "trip:station-list": 2,
+        "trip:route-list": 2,
+        "trip:trip-list": 1,
+        "trip:trip-cache-stats": 0,
+        "trip:hold-list": 2,
+    }
+    # maximum queries per detail action, measured for the first and the last
+    # object of the model
+    DETAIL_QUERIES = {
+        "trip:carriage-detail": (CarriageType, 2),
+        "trip:train-detail": (Train, 2),
+        "trip:crew-detail": (Crew, 2),
+        "trip:station-detail": (Station, 2),
+        "trip:route-detail": (Route, 2),
+        "trip:trip-detail": (Trip, 2),
+        "trip:trip-seats": (Trip, 2),
+        "trip:station-board": (Station, 3),
+        "trip:hold-detail": (SeatHold, 2),
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        baseline = os.environ.get("PERF_BASELINE")
+        if baseline:
+            with open(baseline) as baseline_file:
+                cls.baseline = json.load(baseline_file)
+
+    @classmethod
+    def tearDownClass(cls):
+        path = os.environ.get("PERF_TIMINGS")
+        if path:
+            with open(path, "w") as timings_file:
+                json.dump(cls.timings, timings_file, indent=2, sort_keys=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_user(
+            "admin@test.com", PASSWORD, is_staff=True
+        )
+        seed(1)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        cache.clear()
+        caches["throttle"].clear()
+
+    def request(
+        self, key, method, url, data=None, client=None, repeat=1, format="json"
+    ):
+        """
+        Make request counting queries of the first run, record the fastest
+        run time and check it against the baseline
+        """
+        client = client or self.client
+        elapsed = []
+        for attempt in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                res = getattr(client, method)(url, data, format=format)
+                if res.streaming:
+                    # streamed responses query while their content is read
+                    res.data = b"".join(res.streaming_content)
+                elapsed.append(time.perf_counter() - started)
+            if not attempt:
+                first_queries, first_res = len(queries), res
+
+        best = min(elapsed)
+        self.timings[key] = round(best, 6)
+        if key in self.baseline:
+            self.assertLessEqual(
+                best,
+                max(
+                    self.baseline[key] * TOLERANCE, self.baseline[key] + TOLERANCE_SLACK
+                ),
+                f"{key} is slower than baseline {self.baseline[key]:.6f}s",
+            )
+        return first_queries, first_res
+
+    def get(self, key, url, params=None, **kwargs):
+        queries, res = self.request(key, "get", url, params, repeat=REPEAT, **kwargs)
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        return queries
+
+    def assert_list_queries(self, max_queries):
+        """
+        Query count of list actions {url name: max queries} stays the same
+        when the data is doubled
+        """
+        small = {name: self.get(f"{name}@1x", reverse(name)) for name in max_queries}
+        seed(2)
+        large = {name: self.get(f"{name}@2x", reverse(name)) for name in max_queries}
+
+        for name, queries in small.items():
+            with self.subTest(name):
+                self.assertLessEqual(queries, max_queries[name])
+                self.assertEqual(
+                    large[name], queries, "query count depends on the result size"
+                )
+
+    def assert_detail_queries(self, name, first, last, max_queries):
+        queries = [
+            self.get(f"{name}@{label}", reverse(name, args=[obj.id]))
+            for label, obj in (("first", first), ("last", last))
+        ]
+
+        self.assertLessEqual(queries[0], max_queries)
+        self.assertEqual(queries[1], queries[0], "query count depends on the object")
+
+    def test_list_endpoints(self):
+        self.assert_list_queries(self.LIST_QUERIES)
+
+    def test_detail_endpoints(self):
+        for name, (model, max_queries) in self.DETAIL_QUERIES.items():
+            with self.subTest(name):
+                objects = model.objects.order_by("id")
+                self.assert_detail_queries(
+                    name, objects.first(), objects.last(), max_queries
+                )
+
+    def test_search_endpoints(self):
+        """
+        Query count of searches and exports with parameters stays the same
+        when the data is doubled (the caches they build are dropped)
+        """
+        station = Station.objects.order_by("id").first()
+        trip = Trip.objects.select_related("route").order_by("id").first()
+        searches = {
+            "trip:station-nearby": (
+                {"lat": station.latitude, "lon": station.longitude, "radius": 1000},
+                1,
+            ),
+            "trip:journey-list": (
+                {
+                    "from": trip.route.source_id,
+                    "to": trip.route.destination_id,
+                    "date": timezone.localdate(trip.departure_time),
+                },
+                2,
+            ),
+            "trip:order-export": ({"output": "ndjson"}, 1),
+        }
+
+        small = {
+            name: self.get(f"{name}@1x", reverse(name), params)
+            for name, (params, _) in searches.items()
+        }
+        seed(2)
+        cache.clear()
+        large = {
+            name: self.get(f"{name}@2x", reverse(name), params)
+            for name, (params, _) in searches.items()
+        }
+
+        for name, (_, max_queries) in searches.items():
+            with self.subTest(name):
+                self.assertLessEqual(small[name], max_queries)
+                self.assertEqual(
+                    large[name], small[name], "query count depends on the result size"
+                )
+
+    def test_trip_import(self):
+        trip = Trip.objects.order_by("id").first()
+        crew = " ".join(
+            str(crew_id) for crew_id in Crew.objects.values_list("id", flat=True)[:2]
+        )
+        queries = []
+        for rows in (1, 20):
+            departure = timezone.now() + timedelta(days=365 + rows)
+            lines = [
+                "route,train,departure_time,arrival_time,crew",
+                *(
+                    f"{trip.route_id},{trip.train_id},"
+                    f"{(departure + timedelta(hours=hour)).isoformat()},"
+                    f"{(departure + timedelta(hours=hour + 1)).isoformat()},{crew}"
+                    for hour in range(rows)
+                ),
+            ]
+            count, res = self.request(
+                f"trip:trip-import@{rows}",
+                "post",
+                reverse("trip:trip-import"),
+                {"file": SimpleUploadedFile("trips.csv", "\n".join(lines).encode())},
+                format="multipart",
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+            self.assertEqual(res.data["created"], rows, res.data)
+            queries.append(count)
+
+        self.assertLessEqual(queries[0], 10)
+        self.assertEqual(queries[1], queries[0], "query count depends on the rows")
+
+    def test_order_list(self):
+        self.assert_list_queries({"trip:order-list": 2})
+
+    def test_order_detail(self):
+        orders = Order.objects.annotate(tickets_count=Count("tickets")).order_by(
+            "tickets_count", "id"
+        )
+        self.assert_detail_queries(
+            "trip:order-detail", orders.first(), orders.last(), 4
+        )
+
+    def assert_write_queries(self, key, method, url, data, max_queries, status_code):
+        queries, res = self.request(key, method, url, data)
+
+        self.assertEqual(res.status_code, status_code, res.data)
+        self.assertLessEqual(queries, max_queries, key)
+        return res
+
+    def assert_crud_queries(self, basename, payload, update, max_queries):
+        """Create, partially update and delete the object of the viewset"""
+        create, partial_update, destroy = max_queries
+        res = self.assert_write_queries(
+            f"trip:{basename}-create",
+            "post",
+            reverse(f"trip:{basename}-list"),
+            payload,
+            create,
+            status.HTTP_201_CREATED,
+        )
+        url = reverse(f"trip:{basename}-detail", args=[res.data["id"]])
+        self.assert_write_queries(
+            f"trip:{basename}-partial-update",
+            "patch",
+            url,
+            update,
+            partial_update,
+            status.HTTP_200_OK,
+        )
+        self.assert_write_queries(
+            f"trip:{basename}-destroy",
+            "delete",
+            url,
+            None,
+            destroy,
+            status.HTTP_204_NO_CONTENT,
+        )
+
+    def test_write_endpoints(self):
+        carriage_type = CarriageType.objects.first()
+        source, destination = Station.objects.all()[:2]
+        route = Route.objects.first()
+        train = Train.objects.first()
+        crew = list(Crew.objects.values_list("id", flat=True)[:3])
+        departure = timezone.now() + timedelta(days=3)
+
+        cases = [
+            (
+                "carriage",
+                {"category": "test", "seats_in_car": 20},
+                {"seats_in_car": 30},
+                (2, 3, 4),
+            ),
+            (
+                "train",
+                {
+                    "name_number": "T1",
+                    "carriages_quantity": 3,
+                    "carriage_type": carriage_type.id,
+                },
+                {"carriages_quantity": 4},
+                (4, 5, 5),
+            ),
+            (
+                "crew",
+                {"first_name": "Test", "last_name": "Crew"},
+                {"last_name": "Other"},
+                (2, 3, 5),
+            ),
+            (
+                "station",
+                {"name": "Test", "latitude": 50, "longitude": 30},
+                {"name": "Other"},
+                (2, 5, 6),
+            ),
+            (
+                "route",
+                {"source": source.id, "destination": destination.id, "distance": 100},
+                {"distance": 120},
+                (4, 5, 5),
+            ),
+            (
+                "trip",
+                {
+                    "route": route.id,
+                    "train": train.id,
+                    "crew": crew,
+                    "departure_time": departure,
+                    "arrival_time": departure + timedelta(hours=5),
+                },
+                {
+                    "departure_time": departure,
+                    "arrival_time": departure + timedelta(hours=6),
+                },
+                (15, 12, 8),
+            ),
+        ]
+        for basename, payload, update, max_queries in cases:
+            with self.subTest(basename):
+                self.assert_crud_queries(basename, payload, update, max_queries)
+
+    def test_booking_endpoints(self):
+        trip = (
+            Trip.objects.filter(inventory__seats_available__gte=10)
+            .select_related("train__carriage_type")
+            .first()
+        )
+        free_seats = build_seat_map(trip).allocate(6)
+        order_url = reverse("trip:order-list")
+        hold_url = reverse("trip:hold-list")
+
+        for size in (1, 3):
+            seats, free_seats = free_seats[:size], free_seats[size:]
+            res = self.assert_write_queries(
+                f"trip:order-create@{size}",
+                "post",
+                order_url,
+                {
+                    "tickets": [
+                        {"trip": trip.id, "car_num": car_num, "seat_num": seat_num}
+                        for car_num, seat_num in seats
+                    ]
+                },
+                11,
+                status.HTTP_201_CREATED,
+            )
+        self.assert_write_queries(
+            "trip:order-destroy",
+            "delete",
+            reverse("trip:order-detail", args=[res.data["id"]]),
+            None,
+            14,
+            status.HTTP_204_NO_CONTENT,
+        )
+        self.assert_write_queries(
+            "trip:order-create-auto",
+            "post",
+            order_url,
+            {"trip": trip.id, "quantity": 3},
+            10,
+            status.HTTP_201_CREATED,
+        )
+
+        res = self.assert_write_queries(
+            "trip:hold-create",
+            "post",
+            hold_url,
+            {
+                "trip": trip.id,
+                "seats": [
+                    {"car_num": car_num, "seat_num": seat_num}
+                    for car_num, seat_num in free_seats
+                ],
+            },
+            11,
+            status.HTTP_201_CREATED,
+        )
+        self.assert_write_queries(
+            "trip:hold-confirm",
+            "post",
+            reverse("trip:hold-confirm", args=[res.data["id"]]),
+            None,
+            22,
+            status.HTTP_201_CREATED,
+        )
+        hold = SeatHold.objects.first()
+        self.assert_write_queries(
+            "trip:hold-destroy",
+            "delete",
+            reverse("trip:hold-detail", args=[hold.id]),
+            None,
+            14,
+            status.HTTP_204_NO_CONTENT,
+        )
+
+    def test_user_endpoints(self):
+        anonymous = APIClient()
+        self.assert_write_queries(
+            "user:create",
+            "post",
+            reverse("user:create"),
+            {"email": "new@test.com", "password": PASSWORD},
+            2,
+            status.HTTP_201_CREATED,
+        )
+        queries, res = self.request(
+            "user:token_obtain_pair",
+            "post",
+            reverse("user:token_obtain_pair"),
+            {"email": self.admin.email, "password": PASSWORD},
+            client=anonymous,
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(queries, 1)
+        tokens = res.data
+
+        for name, data in (
+            ("user:token_refresh", {"refresh": tokens["refresh"]}),
+            ("user:token_verify", {"token": tokens["access"]}),
+        ):
+            with self.subTest(name):
+                queries, res = self.request(
+                    name, "post", reverse(name), data, client=anonymous
+                )
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertEqual(queries, 0)
+
+        # the user is loaded from the database, request.user has token claims
+        self.assertLessEqual(self.get("user:manage", reverse("user:manage")), 1)
+        self.assert_write_queries(
+            "user:manage-partial-update",
+            "patch",
+            reverse("user:manage"),
+            {"email": "admin2@test.com"},
+            3,
+            status.HTTP_200_OK,
+        )
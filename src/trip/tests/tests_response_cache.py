@@ -0,0 +1,178 @@
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.models import (
+    Train,
+    CarriageType,
+    Station,
+    Trip,
+    TripInventory,
+    Route,
+)
+from trip.response_cache import get_stats
+
+TRIP_URL = reverse("trip:trip-list")
+ORDER_URL = reverse("trip:order-list")
+CACHE_STATS_URL = reverse("trip:trip-cache-stats")
+
+
+def detail_url(trip_id):
+    return reverse("trip:trip-detail", args=[trip_id])
+
+
+class TripResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        carriage = CarriageType.objects.create(category="test_class1", seats_in_car=50)
+        self.train = Train.objects.create(
+            name_number="001T", carriages_quantity=4, carriage_type=carriage
+        )
+        self.station1 = Station.objects.create(
+            name="St1", latitude=10.0001, longitude=11.0002
+        )
+        station2 = Station.objects.create(
+            name="St2", latitude=20.0001, longitude=21.0002
+        )
+        route = Route.objects.create(
+            source=self.station1, destination=station2, distance=150
+        )
+        self.trips = [
+            Trip.objects.create(
+                route=route,
+                train=self.train,
+                departure_time=make_aware(datetime(2025, 3, day, 7, 12, 0)),
+                arrival_time=make_aware(datetime(2025, 3, day, 15, 10, 0)),
+            )
+            for day in (24, 25)
+        ]
+
+    def get(self, url, data=None, cache_status="HIT"):
+        res = self.client.get(url, data)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["X-Cache"], cache_status, url)
+        return res
+
+    def book(self, trip, seat_num=1):
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"trip": trip.id, "car_num": 1, "seat_num": seat_num}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res
+
+    def test_repeated_list_is_served_from_cache(self):
+        first = self.get(TRIP_URL, {"source": "St1"}, "MISS")
+
+        with self.assertNumQueries(0):
+            second = self.get(TRIP_URL, {"source": "St1"})
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(len(second.data), 2)
+
+    def test_key_is_normalized_filter_parameters(self):
+        self.get(TRIP_URL, {"source": "St1", "destination": "St2"}, "MISS")
+
+        self.get(TRIP_URL + "?destination=St2&source=St1&unknown=1")
+        self.get(TRIP_URL, {"source": "St2"}, "MISS")
+        self.get(TRIP_URL, {"source": "St1", "limit": 1}, "MISS")
+
+    def test_booking_drops_details_of_its_trip_only(self):
+        self.get(TRIP_URL, {"date": "2025-03-24"}, "MISS")
+        for trip in self.trips:
+            self.get(detail_url(trip.id), cache_status="MISS")
+
+        self.book(self.trips[0])
+
+        res = self.get(detail_url(self.trips[0].id), cache_status="MISS")
+        self.assertEqual(res.data["seats_booked"], 1)
+        self.get(detail_url(self.trips[1].id))
+        # lists are refreshed by the timeout
+        res = self.get(TRIP_URL, {"date": "2025-03-24"})
+        self.assertEqual(res.data[0]["seats_available"], 200)
+        expired = time.time() + settings.TRIP_CACHE_TIMEOUT + 1
+        with patch("time.time", return_value=expired):
+            res = self.get(TRIP_URL, {"date": "2025-03-24"}, "MISS")
+        self.assertEqual(res.data[0]["seats_available"], 199)
+
+    def test_cancel_order_drops_cached_seats(self):
+        url = detail_url(self.trips[0].id)
+        order = self.book(self.trips[0])
+        self.assertEqual(self.get(url, cache_status="MISS").data["seats_booked"], 1)
+
+        self.client.delete(reverse("trip:order-detail", args=[order.data["id"]]))
+
+        self.assertEqual(self.get(url, cache_status="MISS").data["seats_booked"], 0)
+
+    def test_schedule_changes_drop_all_responses(self):
+        self.get(TRIP_URL, cache_status="MISS")
+        self.get(detail_url(self.trips[0].id), cache_status="MISS")
+
+        for instance, field, value in [
+            (self.station1, "name", "Renamed"),
+            (self.train, "name_number", "002T"),
+            (self.trips[1], "departure_time", make_aware(datetime(2025, 3, 25, 8))),
+        ]:
+            self.get(TRIP_URL)
+            self.get(detail_url(self.trips[0].id))
+
+            setattr(instance, field, value)
+            instance.save()
+
+            self.get(TRIP_URL, cache_status="MISS")
+            self.get(detail_url(self.trips[0].id), cache_status="MISS")
+
+    def test_changes_bypassing_signals_are_stale_within_timeout(self):
+        self.get(TRIP_URL, cache_status="MISS")
+        TripInventory.objects.update(seats_available=0)
+
+        self.assertEqual(self.get(TRIP_URL).data[0]["seats_available"], 200)
+        expired = time.time() + settings.TRIP_CACHE_TIMEOUT + 1
+        with patch("time.time", return_value=expired):
+            res = self.get(TRIP_URL, cache_status="MISS")
+        self.assertEqual(res.data[0]["seats_available"], 0)
+
+    def test_not_found_is_not_cached(self):
+        url = detail_url(self.trips[-1].id + 1)
+        for _ in range(2):
+            res = self.client.get(url)
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(get_stats(["retrieve"])["retrieve"]["misses"], 2)
+
+    def test_cache_stats(self):
+        self.get(TRIP_URL, cache_status="MISS")
+        self.get(TRIP_URL)
+        self.get(TRIP_URL)
+        self.get(detail_url(self.trips[0].id), cache_status="MISS")
+
+        res = self.client.get(CACHE_STATS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(
+            res.data,
+            {
+                "list": {"hits": 2, "misses": 1, "hit_ratio": 0.6667},
+                "retrieve": {"hits": 0, "misses": 1, "hit_ratio": 0.0},
+            },
+        )
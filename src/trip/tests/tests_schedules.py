@@ -0,0 +1,174 @@
+from datetime import date, datetime, timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase
+from django.utils.timezone import make_aware
+
+from trip.journeys import get_timetable
+from trip.models import (
+    Train,
+    CarriageType,
+    Crew,
+    Station,
+    Trip,
+    TripInventory,
+    Route,
+    ScheduleSkip,
+    ScheduleTemplate,
+)
+from trip.schedules import materialize_trips
+
+# Monday
+START = date(2025, 3, 24)
+
+
+class MaterializeSchedulesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        carriage = CarriageType.objects.create(category="test_class1", seats_in_car=10)
+        self.train = Train.objects.create(
+            name_number="001T", carriages_quantity=3, carriage_type=carriage
+        )
+        self.route = Route.objects.create(
+            source=Station.objects.create(name="St1", latitude=10, longitude=11),
+            destination=Station.objects.create(name="St2", latitude=20, longitude=21),
+            distance=150,
+        )
+        self.crew = Crew.objects.create(first_name="Ivan", last_name="Crew")
+
+    def template(self, **kwargs):
+        data = {
+            "route": self.route,
+            "train": self.train,
+            "departure_offset": timedelta(hours=7, minutes=30),
+            "arrival_offset": timedelta(hours=9),
+            "valid_from": START,
+        }
+        data.update(kwargs)
+        template = ScheduleTemplate.objects.create(**data)
+        template.crew.add(self.crew)
+        return template
+
+    def departures(self, template):
+        return list(
+            template.trips.order_by("departure_time").values_list(
+                "departure_time", flat=True
+            )
+        )
+
+    def test_trips_of_days_of_week_and_validity(self):
+        weekdays = self.template(days_of_week="12345", valid_until=date(2025, 4, 4))
+        daily = self.template(
+            departure_offset=timedelta(hours=22),
+            arrival_offset=timedelta(days=1, hours=6),
+            valid_from=START + timedelta(days=1),
+        )
+
+        self.assertEqual(materialize_trips(START, 14), 23)
+
+        self.assertEqual(
+            [departure.date() for departure in self.departures(weekdays)],
+            [START + timedelta(days=day) for day in (0, 1, 2, 3, 4, 7, 8, 9, 10, 11)],
+        )
+        trip = daily.trips.order_by("departure_time").first()
+        self.assertEqual(trip.departure_time, make_aware(datetime(2025, 3, 25, 22)))
+        self.assertEqual(trip.arrival_time, make_aware(datetime(2025, 3, 26, 6)))
+        self.assertEqual(trip.route, self.route)
+        self.assertEqual(list(trip.crew.all()), [self.crew])
+        self.assertEqual(trip.inventory.seats_available, 30)
+
+    def test_materializing_again_creates_only_missing_trips(self):
+        template = self.template()
+        materialize_trips(START, 3)
+
+        # templates, crew, skips and existing trips of every day in a transaction
+        with self.assertNumQueries(8):
+            self.assertEqual(materialize_trips(START, 3), 0)
+        # next day of the rolling horizon
+        self.assertEqual(materialize_trips(START + timedelta(days=1), 3), 1)
+
+        # changed times apply to the days without trips
+        template.departure_offset = timedelta(hours=8)
+        template.save()
+        self.assertEqual(materialize_trips(START, 5), 1)
+        self.assertEqual(Trip.objects.count(), 5)
+        self.assertEqual(self.departures(template)[-1].hour, 8)
+
+    def test_deleted_trips_are_not_created_again(self):
+        template = self.template()
+        materialize_trips(START, 3)
+        template.trips.order_by("departure_time")[1].delete()
+
+        self.assertEqual(materialize_trips(START, 3), 0)
+        self.assertEqual(
+            [departure.date() for departure in self.departures(template)],
+            [START, START + timedelta(days=2)],
+        )
+
+        # the day runs again once its skip is removed
+        ScheduleSkip.objects.filter(template=template).delete()
+        self.assertEqual(materialize_trips(START, 3), 1)
+
+    def test_route_deletion_removes_templates_with_skips(self):
+        self.template()
+        materialize_trips(START, 2)
+
+        self.route.delete()
+
+        self.assertFalse(ScheduleTemplate.objects.exists())
+        self.assertFalse(ScheduleSkip.objects.exists())
+
+    def test_queries_do_not_depend_on_trips_count(self):
+        for hour in range(10):
+            self.template(departure_offset=timedelta(hours=hour))
+
+        # transaction, templates, crew, skips, existing trips of every day and
+        # one batch of trips, inventories, crew and board entries in a savepoint
+        with self.assertNumQueries(5 + 2 + 7):
+            self.assertEqual(materialize_trips(START, 2), 20)
+        self.assertEqual(TripInventory.objects.count(), 20)
+
+    def test_template_makes_one_trip_per_departure(self):
+        template = self.template()
+        materialize_trips(START)
+        trip = template.trips.get()
+
+        with self.assertRaises(IntegrityError):
+            Trip.objects.create(
+                route=self.route,
+                train=self.train,
+                departure_time=trip.departure_time,
+                arrival_time=trip.arrival_time,
+                template=template,
+            )
+
+    def test_materialized_trips_reach_timetables(self):
+        self.template()
+        self.assertEqual(get_timetable(START)["connections"], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            materialize_trips(START)
+
+        self.assertEqual(len(get_timetable(START)["connections"]), 1)
+
+    def test_command_materializes_horizon(self):
+        self.template(days_of_week="67")
+        out, err = StringIO(), StringIO()
+
+        call_command(
+            "materialize_schedules",
+            "--start",
+            "2025-03-24",
+            "--days",
+            "7",
+            stdout=out,
+            stderr=err,
+        )
+
+        self.assertEqual(Trip.objects.count(), 2)
+        self.assertIn("Created 2 trips from 2025-03-24 for 7 days", out.getvalue())
+        # tests run without Redis
+        self.assertIn("REDIS_URL is not set", err.getvalue())
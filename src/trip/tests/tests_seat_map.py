@@ -0,0 +1,137 @@
+import base64
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.models import Train, CarriageType, Station, Trip, Route
+from trip.seat_map import SeatMap
+
+ORDER_URL = reverse("trip:order-list")
+
+
+def seats_url(trip_id):
+    return reverse("trip:trip-seats", args=[trip_id])
+
+
+class SeatMapTests(TestCase):
+    def test_seat_bits_layout(self):
+        seat_map = SeatMap(carriages=2, seats_in_car=10)
+        seat_map.take(1, 1)
+        seat_map.take(1, 10)
+        seat_map.take(2, 8)
+
+        self.assertEqual(seat_map.car(1), bytes([0b10000000, 0b01000000]))
+        self.assertEqual(seat_map.car(2), bytes([0b00000001, 0b00000000]))
+        self.assertTrue(seat_map.is_taken(2, 8))
+        self.assertFalse(seat_map.is_taken(2, 9))
+        self.assertEqual(seat_map.free_seats(1), [2, 3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(seat_map.seats_taken, 3)
+
+    def test_seat_out_of_train_rejected(self):
+        seat_map = SeatMap(carriages=2, seats_in_car=10)
+
+        with self.assertRaises(IndexError):
+            seat_map.take(3, 1)
+
+    def test_thousand_seats_train_is_compact(self):
+        seat_map = SeatMap(carriages=20, seats_in_car=50)
+
+        self.assertLessEqual(len(seat_map.bits), 140)
+        self.assertLessEqual(sum(len(car) for car in seat_map.cars), 240)
+
+
+class SeatMapApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.carriage = CarriageType.objects.create(
+            category="test_class1", seats_in_car=12
+        )
+        self.train = Train.objects.create(
+            name_number="001T", carriages_quantity=3, carriage_type=self.carriage
+        )
+        self.station1 = Station.objects.create(
+            name="St1", latitude=10.0001, longitude=11.0002
+        )
+        self.station2 = Station.objects.create(
+            name="St2", latitude=20.0001, longitude=21.0002
+        )
+        self.route = Route.objects.create(
+            source=self.station1, destination=self.station2, distance=150
+        )
+        self.trip = Trip.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=make_aware(datetime(2025, 3, 24, 7, 12, 0)),
+            arrival_time=make_aware(datetime(2025, 3, 24, 15, 10, 0)),
+        )
+
+    def book(self, *seats):
+        order_data = {
+            "tickets": [
+                {"car_num": car_num, "seat_num": seat_num, "trip": self.trip.id}
+                for car_num, seat_num in seats
+            ]
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(ORDER_URL, order_data, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def decode(self, data):
+        seat_map = SeatMap(data["carriages"], data["seats_in_car"])
+        seat_map.bits = bytearray(
+            b"".join(base64.b64decode(car) for car in data["cars"])
+        )
+        return seat_map
+
+    def test_seat_map_of_empty_trip(self):
+        res = self.client.get(seats_url(self.trip.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["carriages"], 3)
+        self.assertEqual(res.data["seats_in_car"], 12)
+        self.assertEqual(res.data["seats_taken"], 0)
+        self.assertEqual(len(res.data["cars"]), 3)
+
+    def test_seat_map_shows_booked_seats(self):
+        self.book((1, 1), (3, 12))
+
+        res = self.client.get(seats_url(self.trip.id))
+
+        seat_map = self.decode(res.data)
+        self.assertEqual(res.data["seats_taken"], 2)
+        self.assertTrue(seat_map.is_taken(1, 1))
+        self.assertTrue(seat_map.is_taken(3, 12))
+        self.assertFalse(seat_map.is_taken(2, 1))
+
+    def test_seat_map_cached_and_invalidated_on_booking(self):
+        self.client.get(seats_url(self.trip.id))
+        with self.assertNumQueries(1):
+            self.client.get(seats_url(self.trip.id))
+
+        self.book((2, 5))
+
+        res = self.client.get(seats_url(self.trip.id))
+        self.assertTrue(self.decode(res.data).is_taken(2, 5))
+
+    def test_seat_map_invalidated_on_order_cancel(self):
+        self.book((2, 5))
+        order_id = self.client.get(ORDER_URL).data[0]["id"]
+        self.client.get(seats_url(self.trip.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(ORDER_URL + f"{order_id}/")
+
+        res = self.client.get(seats_url(self.trip.id))
+        self.assertEqual(res.data["seats_taken"], 0)
@@ -0,0 +1,86 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from trip.models import (
+    CarriageType,
+    Crew,
+    Station,
+    Trip,
+    TripInventory,
+    Route,
+    Order,
+    Ticket,
+)
+
+SEED_OPTIONS = {
+    "stations": 20,
+    "routes": 30,
+    "trains": 10,
+    "crew": 15,
+    "users": 10,
+    "trips": 60,
+    "tickets": 3000,
+    "start": "2030-01-01",
+    "copy_size": 500,
+}
+
+
+def seed(**options):
+    call_command(
+        "seed_scale",
+        *[f"--{name.replace('_', '-')}={value}" for name, value in options.items()],
+        stdout=StringIO(),
+    )
+
+
+class SeedScaleTests(TestCase):
+    def test_seed_creates_consistent_dataset(self):
+        seed(**SEED_OPTIONS)
+
+        self.assertEqual(Station.objects.count(), 20)
+        self.assertEqual(Route.objects.count(), 30)
+        self.assertEqual(Trip.objects.count(), 60)
+        self.assertEqual(Trip.crew.through.objects.count(), 180)
+        self.assertAlmostEqual(Ticket.objects.count(), 3000, delta=150)
+        self.assertFalse(
+            Ticket.objects.values("trip", "car_num", "seat_num")
+            .annotate(copies=Count("id"))
+            .filter(copies__gt=1)
+            .exists()
+        )
+        call_command("rebuild_inventory", check=True, stdout=StringIO())
+
+    def test_seed_leaves_sequences_after_explicit_ids(self):
+        seed(**SEED_OPTIONS)
+        order = Order.objects.create(user_id=Order.objects.first().user_id)
+
+        self.assertGreater(order.id, Order.objects.exclude(id=order.id).latest("id").id)
+
+    def test_same_seed_generates_same_data(self):
+        def snapshot():
+            return (
+                list(Station.objects.order_by("id").values_list("name", "latitude")),
+                list(
+                    Trip.objects.order_by("id").values_list(
+                        "route__source__name", "departure_time", "arrival_time"
+                    )
+                ),
+                list(
+                    TripInventory.objects.order_by("trip_id").values_list(
+                        "seats_booked", flat=True
+                    )
+                ),
+            )
+
+        seed(**SEED_OPTIONS)
+        first = snapshot()
+        Order.objects.all().delete()
+        Station.objects.all().delete()
+        CarriageType.objects.all().delete()
+        Crew.objects.all().delete()
+        seed(**SEED_OPTIONS)
+
+        self.assertEqual(snapshot(), first)
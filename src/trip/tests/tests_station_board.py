@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.models import (
+    BoardEntry,
+    Train,
+    CarriageType,
+    Station,
+    Trip,
+    TripInventory,
+    Route,
+)
+
+ORDER_URL = reverse("trip:order-list")
+AFTER = "2025-03-01T00:00:00Z"
+
+
+def board_url(station_id):
+    return reverse("trip:station-board", args=[station_id])
+
+
+class StationBoardTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        carriage = CarriageType.objects.create(category="test_class1", seats_in_car=10)
+        self.train = Train.objects.create(
+            name_number="001T", carriages_quantity=2, carriage_type=carriage
+        )
+        self.stations = [
+            Station.objects.create(name=f"St{number}", latitude=10, longitude=11)
+            for number in range(3)
+        ]
+        self.route = Route.objects.create(
+            source=self.stations[0], destination=self.stations[1], distance=150
+        )
+        self.trips = [self.trip(self.route, day) for day in (26, 24, 25)] + [
+            self.trip(
+                Route.objects.create(
+                    source=self.stations[2], destination=self.stations[0], distance=50
+                ),
+                24,
+            )
+        ]
+
+    def trip(self, route, day):
+        return Trip.objects.create(
+            route=route,
+            train=self.train,
+            departure_time=make_aware(datetime(2025, 3, day, 7, 0, 0)),
+            arrival_time=make_aware(datetime(2025, 3, day, 15, 0, 0)),
+        )
+
+    def board(self, station, **params):
+        params.setdefault("after", AFTER)
+        res = self.client.get(board_url(station.id), params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_board_lists_next_departures_and_arrivals(self):
+        board = self.board(self.stations[0], limit=2)
+
+        self.assertEqual(
+            [departure["trip"] for departure in board["departures"]],
+            [self.trips[1].id, self.trips[2].id],
+        )
+        self.assertEqual(
+            board["departures"][0],
+            {
+                "trip": self.trips[1].id,
+                "departure_time": "2025-03-24T07:00:00Z",
+                "to_station": "St1",
+                "train": "001T",
+                "seats_available": 20,
+            },
+        )
+        self.assertEqual(
+            board["arrivals"],
+            [
+                {
+                    "trip": self.trips[3].id,
+                    "arrival_time": "2025-03-24T15:00:00Z",
+                    "from_station": "St2",
+                    "train": "001T",
+                    "seats_available": 20,
+                }
+            ],
+        )
+
+        board = self.board(self.stations[0], after="2025-03-25T07:00:00Z")
+        self.assertEqual(
+            [departure["trip"] for departure in board["departures"]],
+            [self.trips[2].id, self.trips[0].id],
+        )
+        self.assertEqual(board["arrivals"], [])
+
+    def test_board_starts_now_by_default(self):
+        self.trips[0].departure_time = timezone.now() + timedelta(hours=1)
+        self.trips[0].arrival_time = timezone.now() + timedelta(hours=2)
+        self.trips[0].save()
+
+        board = self.client.get(board_url(self.stations[0].id)).data
+
+        self.assertEqual(
+            [departure["trip"] for departure in board["departures"]],
+            [self.trips[0].id],
+        )
+
+    def test_board_is_read_without_joins(self):
+        with self.assertNumQueries(3):
+            self.board(self.stations[0])
+
+        res = self.client.get(board_url(0))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_seats_follow_bookings(self):
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"trip": self.trips[1].id, "car_num": 1, "seat_num": 1}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        board = self.board(self.stations[1])
+        self.assertEqual(board["arrivals"][0]["seats_available"], 19)
+
+        self.client.delete(reverse("trip:order-detail", args=[res.data["id"]]))
+        board = self.board(self.stations[0])
+        self.assertEqual(board["departures"][0]["seats_available"], 20)
+
+    def test_entries_follow_schedule_changes(self):
+        self.trips[1].departure_time = make_aware(datetime(2025, 3, 27, 7, 0, 0))
+        self.trips[1].arrival_time = make_aware(datetime(2025, 3, 27, 15, 0, 0))
+        self.trips[1].save()
+        self.trips[2].delete()
+        self.stations[1].name = "Renamed"
+        self.stations[1].save()
+        self.train.carriages_quantity = 3
+        self.train.name_number = "002T"
+        self.train.save()
+
+        board = self.board(self.stations[0])
+        self.assertEqual(
+            [departure["trip"] for departure in board["departures"]],
+            [self.trips[0].id, self.trips[1].id],
+        )
+        self.assertEqual(
+            {
+                (
+                    departure["to_station"],
+                    departure["train"],
+                    departure["seats_available"],
+                )
+                for departure in board["departures"]
+            },
+            {("Renamed", "002T", 30)},
+        )
+
+        self.route.destination = self.stations[2]
+        self.route.save()
+        self.assertEqual(self.board(self.stations[1])["arrivals"], [])
+        self.assertEqual(len(self.board(self.stations[2])["arrivals"]), 2)
+
+    def test_entries_match_trips_after_changes(self):
+        TripInventory.book({self.trips[0].id: 3})
+        TripInventory.recount(Trip.objects.all())
+        self.stations[0].name = "Renamed"
+        self.stations[0].save()
+
+        fields = ("station_id", "trip_id", "kind", "time", "other_station", "train")
+        expected = {
+            tuple(getattr(entry, name) for name in fields + ("seats_available",))
+            for entry in BoardEntry.for_trips(Trip.objects.all())
+        }
+        self.assertEqual(
+            set(BoardEntry.objects.values_list(*fields, "seats_available")), expected
+        )
+        self.assertEqual(len(expected), 2 * len(self.trips))
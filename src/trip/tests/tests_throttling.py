@@ -0,0 +1,99 @@
+import tempfile
+from unittest.mock import Mock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.throttling import AnonRateThrottle, UserRateThrottle
+
+STATION_URL = reverse("trip:station-list")
+TRIP_URL = reverse("trip:trip-list")
+REGISTER_URL = reverse("user:create")
+# the start of a rate window of a minute
+NOW = 60 * 1000000.0
+
+
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self):
+        # file based cache stands in for the cache shared by workers
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        cache_settings = override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "throttle": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": self.cache_dir.name,
+                },
+            }
+        )
+        cache_settings.enable()
+        self.addCleanup(cache_settings.disable)
+
+        self.now = NOW
+        for throttle in (UserRateThrottle, AnonRateThrottle):
+            for name, value in (
+                ("THROTTLE_RATES", {"user": "10/min", "anon": "2/min"}),
+                ("timer", Mock(side_effect=lambda: self.now)),
+            ):
+                patcher = patch.object(throttle, name, value)
+                patcher.start()
+                self.addCleanup(patcher.stop)
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def get(self, url, expected=status.HTTP_200_OK):
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, expected, url)
+        return res
+
+    def test_costs_use_quota(self):
+        for _ in range(3):
+            self.get(TRIP_URL)
+
+        res = self.get(TRIP_URL, status.HTTP_429_TOO_MANY_REQUESTS)
+        # 9 of 10 used at the start of the window: 2 have to slide out of it
+        self.assertEqual(res["Retry-After"], "74")
+        # rejected requests do not use quota
+        self.get(STATION_URL)
+        self.get(STATION_URL, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_counter_is_shared(self):
+        self.get(TRIP_URL)
+        self.get(STATION_URL)
+
+        # other workers read the same counter
+        worker_cache = FileBasedCache(self.cache_dir.name, {})
+        key = f"throttle_user_{self.user.pk}:{int(NOW // 60)}"
+        self.assertEqual(worker_cache.get(key), 4)
+
+    def test_previous_window_slides_out(self):
+        for _ in range(10):
+            self.get(STATION_URL)
+
+        # half of the previous window is still counted
+        self.now = NOW + 90
+        for _ in range(5):
+            self.get(STATION_URL)
+        res = self.get(STATION_URL, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "6")
+
+        self.now = NOW + 97
+        self.get(STATION_URL)
+
+    def test_anonymous_rate(self):
+        client = APIClient()
+        for expected in (
+            status.HTTP_400_BAD_REQUEST,
+            status.HTTP_400_BAD_REQUEST,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        ):
+            self.assertEqual(client.post(REGISTER_URL).status_code, expected)
@@ -0,0 +1,244 @@
+import json
+import tempfile
+from datetime import date, datetime
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.journeys import get_timetable
+from trip.models import (
+    BoardEntry,
+    Train,
+    CarriageType,
+    Crew,
+    Station,
+    Trip,
+    TripInventory,
+    Route,
+)
+
+TRIP_URL = reverse("trip:trip-list")
+IMPORT_URL = reverse("trip:trip-import")
+CSV_HEADER = "route,from_station,to_station,train,departure_time,arrival_time,crew"
+
+
+class TripImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            email="admin@test.com", password="test_password", is_staff=True
+        )
+        self.client.force_authenticate(user=self.admin)
+
+        carriage = CarriageType.objects.create(category="test_class1", seats_in_car=10)
+        self.train = Train.objects.create(
+            name_number="001T", carriages_quantity=3, carriage_type=carriage
+        )
+        station1 = Station.objects.create(name="St1", latitude=10, longitude=11)
+        station2 = Station.objects.create(name="St2", latitude=20, longitude=21)
+        self.route = Route.objects.create(
+            source=station1, destination=station2, distance=150
+        )
+        self.crew = [
+            Crew.objects.create(first_name="Ivan", last_name=f"Crew{number}")
+            for number in range(2)
+        ]
+
+    def csv_rows(self, count, day=24):
+        return [
+            f"{self.route.id},,,{self.train.id},2025-03-{day}T{hour:02d}:00:00Z,"
+            f"2025-03-{day}T{hour + 1:02d}:00:00Z,{self.crew[0].id} {self.crew[1].id}"
+            for hour in range(count)
+        ]
+
+    def upload(self, lines, name="trips.csv", **data):
+        content = ("\n".join(lines) + "\n").encode()
+        data["file"] = SimpleUploadedFile(name, content)
+        return self.client.post(IMPORT_URL, data, format="multipart")
+
+    def test_csv_import_creates_trips_with_crew_and_seats(self):
+        res = self.upload([CSV_HEADER] + self.csv_rows(3))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"created": 3, "failed": 0, "errors": []})
+        trips = Trip.objects.order_by("departure_time")
+        self.assertEqual(trips.count(), 3)
+        self.assertEqual(
+            trips[0].departure_time, make_aware(datetime(2025, 3, 24, 0, 0))
+        )
+        self.assertEqual(
+            set(trips[2].crew.values_list("id", flat=True)),
+            {member.id for member in self.crew},
+        )
+        self.assertEqual(
+            set(TripInventory.objects.values_list("seats_available", flat=True)),
+            {30},
+        )
+        # departure and arrival of every trip on station boards
+        self.assertEqual(BoardEntry.objects.filter(trip__in=trips).count(), 6)
+
+    def test_ndjson_import_resolves_route_by_station_names(self):
+        row = {
+            "from_station": "St1",
+            "to_station": "St2",
+            "train": self.train.id,
+            "departure_time": "2025-03-24T07:00:00Z",
+            "arrival_time": "2025-03-24T09:00:00Z",
+        }
+
+        res = self.upload([json.dumps(row)], name="trips.ndjson")
+
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(Trip.objects.get().route, self.route)
+        self.assertFalse(Trip.objects.get().crew.exists())
+
+    def test_file_format_overrides_extension(self):
+        res = self.upload(
+            [CSV_HEADER] + self.csv_rows(2), name="trips.txt", file_format="csv"
+        )
+
+        self.assertEqual(res.data["created"], 2)
+
+    def test_rows_before_not_utf8_text_are_imported(self):
+        # text is decoded in chunks, the first ones are imported
+        lines = [CSV_HEADER] + self.csv_rows(20) * 30
+        lines.append(f",Stación,St2,{self.train.id},2025-03-24,2025-03-24,")
+        content = ("\n".join(lines) + "\n").encode("latin-1")
+
+        res = self.client.post(
+            IMPORT_URL,
+            {"file": SimpleUploadedFile("trips.csv", content)},
+            format="multipart",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertGreater(res.data["created"], 0)
+        self.assertEqual(Trip.objects.count(), res.data["created"])
+        self.assertEqual(res.data["failed"], 1)
+        self.assertEqual(
+            res.data["errors"][0],
+            {
+                "line": res.data["created"] + 2,
+                "errors": {
+                    "file": ["File is not UTF-8 text, the rest of it is not imported."]
+                },
+            },
+        )
+
+    def test_out_of_range_ids_are_row_errors(self):
+        res = self.upload(
+            [
+                CSV_HEADER,
+                f"{2**63},,,{self.train.id},2025-03-24T07:00Z,2025-03-24T09:00Z,",
+                f"{self.route.id},,,{2**64},2025-03-24T07:00Z,2025-03-24T09:00Z,"
+                f"{2**63}",
+            ]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        errors = {error["line"]: error["errors"] for error in res.data["errors"]}
+        self.assertEqual(set(errors[2]), {"route"})
+        self.assertEqual(set(errors[3]), {"train", "crew"})
+
+    def test_invalid_rows_are_reported(self):
+        lines = [CSV_HEADER] + self.csv_rows(2)
+        lines.insert(2, f",St2,St1,{self.train.id},2025-03-24,2025-03-25,")
+        lines.append(
+            f"{self.route.id},,,{self.train.id},2025-03-25T10:00Z,2025-03-25T09:00Z,"
+        )
+        lines.append(
+            f"0,,,999,2025-03-25T10:00Z,2025-03-25T12:00Z,{self.crew[0].id} 999"
+        )
+        lines.append(f",,,{self.train.id},yesterday,2025-03-25T12:00Z,")
+
+        res = self.upload(lines)
+
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(res.data["failed"], 4)
+        errors = {error["line"]: error["errors"] for error in res.data["errors"]}
+        self.assertEqual(list(errors), [3, 5, 6, 7])
+        self.assertEqual(errors[3], {"route": ["No route from St2 to St1."]})
+        self.assertIn("non_field_errors", errors[5])
+        self.assertEqual(set(errors[6]), {"route"})
+        self.assertEqual(set(errors[7]), {"departure_time"})
+        self.assertEqual(Trip.objects.count(), 2)
+
+    def test_reference_errors_of_existing_fields(self):
+        res = self.upload(
+            [
+                CSV_HEADER,
+                f"999,,,999,2025-03-25T10:00Z,2025-03-25T12:00Z,{self.crew[0].id};999",
+            ]
+        )
+
+        self.assertEqual(
+            res.data["errors"][0]["errors"],
+            {
+                "route": ['Invalid pk "999" - object does not exist.'],
+                "train": ['Invalid pk "999" - object does not exist.'],
+                "crew": ['Invalid pk "999" - object does not exist.'],
+            },
+        )
+
+    def test_queries_do_not_depend_on_rows_count(self):
+        with self.assertNumQueries(10):
+            self.upload([CSV_HEADER] + self.csv_rows(2))
+        with self.assertNumQueries(10):
+            self.upload([CSV_HEADER] + self.csv_rows(20, day=25))
+
+    def test_import_drops_cached_trips_and_timetables(self):
+        self.assertEqual(self.client.get(TRIP_URL).data, [])
+        self.assertEqual(get_timetable(date(2025, 3, 24))["connections"], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload([CSV_HEADER] + self.csv_rows(2))
+
+        self.assertEqual(len(self.client.get(TRIP_URL).data), 2)
+        self.assertEqual(len(get_timetable(date(2025, 3, 24))["connections"]), 2)
+
+    def test_import_is_for_admins(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@test.com", password="test_password"
+            )
+        )
+
+        res = self.upload([CSV_HEADER] + self.csv_rows(1))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Trip.objects.exists())
+
+    def test_command_imports_file(self):
+        out, err = StringIO(), StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "trips.txt"
+            path.write_text(
+                "\n".join(
+                    [CSV_HEADER] + self.csv_rows(3) + [",,,1,2025-03-24,2025-03-24,"]
+                )
+            )
+            call_command(
+                "import_trips",
+                path,
+                "--file-format",
+                "csv",
+                "--batch-size",
+                "2",
+                stdout=out,
+                stderr=err,
+            )
+
+        self.assertEqual(Trip.objects.count(), 3)
+        self.assertIn("line 5: ", out.getvalue())
+        self.assertIn("Created 3 trips, 1 rows failed", out.getvalue())
+        self.assertIn("REDIS_URL is not set", err.getvalue())
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_init
+from django.test import TestCase, override_settings
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from trip.models import (
+    Train,
+    CarriageType,
+    Crew,
+    Station,
+    Trip,
+    TripInventory,
+    Route,
+)
+from trip.views import RouteViewSet, StationViewSet, TrainViewSet, TripViewSet
+
+TRIP_URL = reverse("trip:trip-list")
+ROUTE_URL = reverse("trip:route-list")
+STATION_URL = reverse("trip:station-list")
+TRAIN_URL = reverse("trip:train-list")
+
+
+# responses are compared without the trips response cache
+@override_settings(TRIP_CACHE_TIMEOUT=0)
+class ValuesListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test_password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        carriage = CarriageType.objects.create(category="купе", seats_in_car=36)
+        trains = [
+            Train.objects.create(
+                name_number=f"{number:03}K",
+                carriages_quantity=number,
+                carriage_type=carriage,
+            )
+            for number in range(1, 4)
+        ]
+        stations = [
+            Station.objects.create(name=name, latitude=latitude, longitude=longitude)
+            for name, latitude, longitude in [
+                ("Київ-Пас", 50.4403, 30.4888),
+                ("Lviv", 49.839683, 24.029717),
+                ('Odesa "Holovna"', 46.4684, 30.741),
+            ]
+        ]
+        routes = [
+            Route.objects.create(source=source, destination=destination, distance=500)
+            for source in stations
+            for destination in stations
+            if source != destination
+        ]
+        crew = Crew.objects.create(first_name="Ivan", last_name="Franko")
+        departure = make_aware(datetime(2025, 3, 24, 7, 12, 0, 123456))
+        for index in range(12):
+            trip = Trip.objects.create(
+                route=routes[index % len(routes)],
+                train=trains[index % len(trains)],
+                departure_time=departure + timedelta(hours=index * 5),
+                arrival_time=departure + timedelta(hours=index * 5 + 3, seconds=7),
+            )
+            trip.crew.add(crew)
+        # trip without inventory renders null seats
+        TripInventory.objects.filter(trip=trip).delete()
+
+    def get(self, url):
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.content
+
+    def assert_same_content(self, viewset, url):
+        fast = self.get(url)
+        with patch.object(viewset, "list_values", None):
+            expected = self.get(url)
+
+        self.assertEqual(fast, expected, url)
+        return fast
+
+    def test_lists_are_byte_identical(self):
+        for viewset, urls in [
+            (
+                TripViewSet,
+                [
+                    TRIP_URL,
+                    f"{TRIP_URL}?source=Lviv",
+                    f"{TRIP_URL}?date_from=2025-03-25&date_to=2025-03-25",
+                    f"{TRIP_URL}?limit=5&offset=3",
+                ],
+            ),
+            (RouteViewSet, [ROUTE_URL, f"{ROUTE_URL}?source=Lviv"]),
+            (StationViewSet, [STATION_URL, f"{STATION_URL}?search=49.8"]),
+            (TrainViewSet, [TRAIN_URL, f"{TRAIN_URL}?search=2K"]),
+        ]:
+            for url in urls:
+                with self.subTest(url):
+                    self.assertNotEqual(self.assert_same_content(viewset, url), b"[]")
+
+    def test_cursor_pages_are_byte_identical(self):
+        url = f"{TRIP_URL}?page_size=5"
+        while url:
+            content = self.assert_same_content(TripViewSet, url)
+            url = self.client.get(url).data["next"]
+
+        self.assertIn(b'"seats_available":null', content)
+
+    def test_no_model_instances_are_built(self):
+        created = []
+
+        def count(sender, **kwargs):
+            created.append(sender)
+
+        post_init.connect(count)
+        try:
+            # reference data reads its table versions first
+            for url, queries in [
+                (TRIP_URL, 1),
+                (ROUTE_URL, 2),
+                (STATION_URL, 2),
+                (TRAIN_URL, 2),
+            ]:
+                with self.assertNumQueries(queries):
+                    self.get(url)
+        finally:
+            post_init.disconnect(count)
+
+        self.assertEqual(created, [])
@@ -0,0 +1,82 @@
+import math
+
+from django.core.cache import caches
+from rest_framework import throttling
+
+THROTTLE_CACHE = "throttle"
+
+
+class SlidingWindowMixin:
+    """
+    Rate throttle counting request costs in two fixed windows: the current
+    one and the previous one weighted by its part still inside the sliding
+    window. A request makes three O(1) operations of the shared "throttle"
+    cache instead of rewriting the history list of DRF throttles.
+    Viewsets set `throttle_costs` ({action: cost}, 1 by default), so
+    expensive endpoints use more of the rate
+    """
+
+    @property
+    def cache(self):
+        return caches[THROTTLE_CACHE]
+
+    @staticmethod
+    def get_cost(request, view):
+        return getattr(view, "throttle_costs", {}).get(getattr(view, "action", None), 1)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        cost = self.get_cost(request, view)
+        position = self.timer() / self.duration
+        window = math.floor(position)
+        current_key = f"{self.key}:{window}"
+        # the previous window is needed during the next one
+        self.cache.add(current_key, 0, self.duration * 2)
+        try:
+            current = self.cache.incr(current_key, cost)
+        except ValueError:
+            # expired right after add
+            self.cache.add(current_key, cost, self.duration * 2)
+            current = cost
+        previous = self.cache.get(f"{self.key}:{window - 1}", 0)
+
+        passed = position - window
+        if previous * (1 - passed) + current <= self.num_requests:
+            return True
+
+        try:
+            self.cache.decr(current_key, cost)
+        except ValueError:
+            pass
+        self.wait_seconds = self.get_wait(previous, current - cost, cost, passed)
+        return False
+
+    def get_wait(self, previous, current, cost, passed):
+        """Seconds until the request of the cost fits into the rate"""
+        allowed = self.num_requests - cost
+        if allowed < 0:
+            return None
+        # weight of the previous window shrinking during the current one
+        if previous and current <= allowed:
+            weight = (allowed - current) / previous
+            return max(0.0, (1 - passed - weight) * self.duration)
+        # the current window becomes the previous one
+        weight = allowed / current if current else 1
+        return (1 - passed + max(0.0, 1 - weight)) * self.duration
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonRateThrottle(SlidingWindowMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(SlidingWindowMixin, throttling.UserRateThrottle):
+    pass
@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django.db import transaction
+from rest_framework import serializers
+
+from trip.journeys import invalidate_timetables
+from trip.models import BoardEntry, Crew, Route, Train, Trip, TripInventory
+from trip.response_cache import invalidate_schedule
+
+IMPORT_FORMATS = ("ndjson", "csv")
+IMPORT_BATCH_SIZE = 1000
+# failed rows listed in the report, the rest are only counted
+IMPORT_MAX_ERRORS = 100
+# largest id of the referenced models (bigint primary keys)
+MAX_ID = 2**63 - 1
+
+NOT_UTF8_MESSAGE = "File is not UTF-8 text, the rest of it is not imported."
+
+DOES_NOT_EXIST = serializers.PrimaryKeyRelatedField.default_error_messages[
+    "does_not_exist"
+]
+
+
+def read_rows(file, file_format):
+    """
+    Yield (line number, row) of the binary file: CSV with a header or NDJSON.
+    Empty CSV values are left out, crew ids are separated by spaces or ";".
+    UnicodeDecodeError is raised where the text is not UTF-8
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            row = {
+                name: value.strip()
+                for name, value in row.items()
+                if name and value and value.strip()
+            }
+            if "crew" in row:
+                row["crew"] = row["crew"].replace(";", " ").split()
+            yield reader.line_num, row
+    else:
+        for line_num, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_num, json.loads(line)
+            except ValueError:
+                # reported as invalid data by the validation
+                yield line_num, line
+
+
+def resolve_references(rows):
+    """
+    Check routes, trains and crew of the validated rows with one query per
+    model. Return list of (line, trip, crew ids, total seats) of the rows
+    with existing references and list of (line, errors) of the others
+    """
+    route_ids = {row["route"] for _, row in rows if "route" in row}
+    station_pairs = {
+        (row["from_station"], row["to_station"])
+        for _, row in rows
+        if "route" not in row
+    }
+    train_ids = {row["train"] for _, row in rows}
+    crew_ids = {crew_id for _, row in rows for crew_id in row.get("crew", [])}
+
+    routes = set(Route.objects.filter(id__in=route_ids).values_list("id", flat=True))
+    routes_by_stations = {}
+    if station_pairs:
+        sources, destinations = zip(*station_pairs)
+        # the first route of the stations if there are several
+        for source, destination, route_id in (
+            Route.objects.filter(
+                source__name__in=sources, destination__name__in=destinations
+            )
+            .order_by("-id")
+            .values_list("source__name", "destination__name", "id")
+        ):
+            routes_by_stations[(source, destination)] = route_id
+    trains = dict(
+        Train.objects.filter(id__in=train_ids).values_list("id", "total_seats")
+    )
+    crew = set(Crew.objects.filter(id__in=crew_ids).values_list("id", flat=True))
+
+    valid = []
+    failed = []
+    for line, row in rows:
+        errors = {}
+        if "route" in row:
+            route_id = row["route"]
+            if route_id not in routes:
+                errors["route"] = [DOES_NOT_EXIST.format(pk_value=route_id)]
+        else:
+            route_id = routes_by_stations.get((row["from_station"], row["to_station"]))
+            if route_id is None:
+                errors["route"] = [
+                    f"No route from {row['from_station']} to {row['to_station']}."
+                ]
+        if row["train"] not in trains:
+            errors["train"] = [DOES_NOT_EXIST.format(pk_value=row["train"])]
+        missing_crew = [
+            crew_id for crew_id in row.get("crew", []) if crew_id not in crew
+        ]
+        if missing_crew:
+            errors["crew"] = [
+                DOES_NOT_EXIST.format(pk_value=crew_id) for crew_id in missing_crew
+            ]
+
+        if errors:
+            failed.append((line, errors))
+            continue
+        trip = Trip(
+            route_id=route_id,
+            train_id=row["train"],
+            departure_time=row["departure_time"],
+            arrival_time=row["arrival_time"],
+        )
+        valid.append((line, trip, set(row.get("crew", [])), trains[row["train"]]))
+    return valid, failed
+
+
+def create_trips(rows):
+    """
+    Insert trips of (trip, crew ids, train total seats) with their seat
+    counters and crew, return created trips
+    """
+    with transaction.atomic():
+        trips = Trip.objects.bulk_create([trip for trip, _, _ in rows])
+        TripInventory.objects.bulk_create(
+            TripInventory(trip_id=trip.id, seats_available=total_seats or 0)
+            for trip, _, total_seats in rows
+        )
+        Trip.crew.through.objects.bulk_create(
+            Trip.crew.through(trip_id=trip.id, crew_id=crew_id)
+            for trip, crew_ids, _ in rows
+            for crew_id in sorted(crew_ids)
+        )
+        BoardEntry.create_for_trips(
+            Trip.objects.filter(id__in=[trip.id for trip in trips])
+        )
+    return trips
+
+
+def import_trips(rows, batch_size=IMPORT_BATCH_SIZE, max_errors=IMPORT_MAX_ERRORS):
+    """
+    Create trips of (line, validated row, errors) in batches: references of
+    a batch are resolved together and its valid rows are inserted with
+    bulk_create, failed rows are reported without stopping the import.
+    Return {"created", "failed", "errors": [{"line", "errors"}]}, errors of
+    the first `max_errors` failed rows (all of them for None)
+    """
+    report = {"created": 0, "failed": 0, "errors": []}
+
+    def fail(line, errors):
+        report["failed"] += 1
+        if max_errors is None or len(report["errors"]) < max_errors:
+            report["errors"].append({"line": line, "errors": errors})
+
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        validated = [(line, row) for line, row, errors in batch if not errors]
+        valid, failed = resolve_references(validated)
+        failed += [(line, errors) for line, _, errors in batch if errors]
+        for line, errors in sorted(failed, key=lambda failure: failure[0]):
+            fail(line, errors)
+        if valid:
+            report["created"] += len(create_trips([row[1:] for row in valid]))
+
+    if report["created"]:
+        # bulk_create sends no signals of the saved trips
+        invalidate_schedule()
+        invalidate_timetables()
+    return report
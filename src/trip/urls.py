@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from trip import async_views
 from trip.views import (
     TrainViewSet,
     CarriageTypeViewSet,
@@ -9,6 +10,8 @@ from trip.views import (
     RouteViewSet,
     TripViewSet,
     OrderViewSet,
+    SeatHoldViewSet,
+    JourneyViewSet,
 )
 
 router = routers.DefaultRouter()
@@ -19,7 +22,19 @@ router.register("stations", StationViewSet, basename="station")
 router.register("routes", RouteViewSet, basename="route")
 router.register("trips", TripViewSet, basename="trip")
 router.register("orders", OrderViewSet, basename="order")
+router.register("holds", SeatHoldViewSet, basename="hold")
+router.register("journeys", JourneyViewSet, basename="journey")
 
-urlpatterns = [path("", include(router.urls))]
+# async read views for ASGI servers, same responses as the trips endpoints
+async_urlpatterns = [
+    path("trips/", async_views.trip_list, name="async-trip-list"),
+    path("trips/<int:pk>/", async_views.trip_detail, name="async-trip-detail"),
+    path("trips/<int:pk>/seats/", async_views.trip_seats, name="async-trip-seats"),
+]
+
+urlpatterns = [
+    path("", include(router.urls)),
+    path("async/", include(async_urlpatterns)),
+]
 
 app_name = "trip"
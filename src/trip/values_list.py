@@ -0,0 +1,61 @@
+from rest_framework import serializers
+from rest_framework.response import Response
+
+# fields rendering database values as they are
+PLAIN_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.FloatField,
+    serializers.BooleanField,
+    serializers.RelatedField,
+)
+
+
+class ValuesListMixin:
+    """
+    Opt-in fast path of the list action: a viewset setting `list_values`
+    ({serializer field: ORM lookup}) reads only these columns with values()
+    and builds response rows without model instances and serializer
+    machinery. Rows are the same as the list serializer output (its fields
+    give the order and formatting of values), the serializer still
+    describes the schema
+    """
+
+    list_values = None
+
+    def get_list_columns(self):
+        """Return (field name, lookup, converter or None) in serializer order"""
+        columns = []
+        for field in self.get_serializer()._readable_fields:
+            converter = None
+            if not isinstance(field, PLAIN_FIELDS):
+                converter = field.to_representation
+            columns.append(
+                (field.field_name, self.list_values[field.field_name], converter)
+            )
+        return columns
+
+    def build_rows(self, values):
+        columns = self.get_list_columns()
+        rows = []
+        for row in values:
+            item = {}
+            for name, lookup, converter in columns:
+                value = row[lookup]
+                if converter is not None and value is not None:
+                    value = converter(value)
+                item[name] = value
+            rows.append(item)
+        return rows
+
+    def list(self, request, *args, **kwargs):
+        if not self.list_values:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *dict.fromkeys(self.list_values.values())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.build_rows(page))
+        return Response(self.build_rows(queryset))
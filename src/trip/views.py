@@ -1,23 +1,71 @@
-from django.db.models import Count, F, Prefetch
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
+from rest_framework import mixins, status
+from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
+
+from trip.booking import cancel_order, confirm_hold, release_holds
+from trip.conditional import ConditionalGetMixin
+from trip.export import export_orders
 
 from trip.filters.filters import RouteFilter, TripFilter
-from trip.models import Train, CarriageType, Crew, Station, Route, Trip, Order, Ticket
+from trip.geo import find_nearby_stations
+from trip.journeys import find_journeys
+from trip.models import (
+    BoardEntry,
+    Train,
+    CarriageType,
+    Crew,
+    Station,
+    Route,
+    Trip,
+    Order,
+    Ticket,
+    SeatHold,
+)
+from trip.pagination import TripPagination, OrderPagination
+from trip.response_cache import cached_response, get_stats
 from trip.schemas.carriage_type_schema_decorators import carriage_filter_schema
 from trip.schemas.crew_schema_decorators import crew_filter_schema
-from trip.schemas.order_schema_decorators import order_filter_schema
+from trip.schemas.hold_schema_decorators import hold_confirm_schema
+from trip.schemas.journey_schema_decorators import journey_search_schema
+from trip.schemas.order_schema_decorators import (
+    order_filter_schema,
+    order_create_schema,
+    order_export_schema,
+)
 
-from trip.schemas.station_schema_decorators import station_filter_schema
+from trip.schemas.station_schema_decorators import (
+    station_filter_schema,
+    station_nearby_schema,
+    station_board_schema,
+)
 from trip.schemas.train_schema_decorators import train_filter_schema
+from trip.schemas.trip_schema_decorators import (
+    seat_map_schema,
+    trip_cache_stats_schema,
+    trip_import_schema,
+)
+from trip.seat_map import get_seat_map
 from trip.serializers import (
     TrainSerializer,
     CarriageTypeSerializer,
     CrewSerializer,
     StationSerializer,
+    NearbyStationQuerySerializer,
+    StationBoardQuerySerializer,
+    StationBoardSerializer,
+    NearbyStationSerializer,
     RouteSerializer,
     TripSerializer,
     TripListSerializer,
@@ -28,11 +76,20 @@ from trip.serializers import (
     TripDetailSerializer,
     RouteDetailSerializer,
     OrderDetailSerializer,
+    OrderAutoSeatSerializer,
+    SeatMapSerializer,
+    SeatHoldSerializer,
+    JourneyQuerySerializer,
+    JourneySerializer,
+    OrderExportQuerySerializer,
+    TripImportSerializer,
+    TripImportReportSerializer,
 )
+from trip.values_list import ValuesListMixin
 
 
 @extend_schema(tags=["carriages"])
-class CarriageTypeViewSet(ModelViewSet):
+class CarriageTypeViewSet(ConditionalGetMixin, ModelViewSet):
     queryset = CarriageType.objects.all()
     serializer_class = CarriageTypeSerializer
     filter_backends = [SearchFilter]
@@ -40,6 +97,7 @@ class CarriageTypeViewSet(ModelViewSet):
         "category",
         "seats_in_car",
     ]
+    version_models = (CarriageType,)
 
     @carriage_filter_schema()
     def list(self, request, *args, **kwargs):
@@ -50,11 +108,19 @@ class CarriageTypeViewSet(ModelViewSet):
 
 
 @extend_schema(tags=["trains"])
-class TrainViewSet(ModelViewSet):
+class TrainViewSet(ConditionalGetMixin, ValuesListMixin, ModelViewSet):
     queryset = Train.objects.select_related("carriage_type")
     serializer_class = TrainSerializer
     filter_backends = [SearchFilter]
     search_fields = ["name_number"]
+    version_models = (Train, CarriageType)
+    list_values = {
+        "id": "id",
+        "name_number": "name_number",
+        "carriage_type": "carriage_type__category",
+        "carriages_quantity": "carriages_quantity",
+        "total_seats": "total_seats",
+    }
 
     def get_serializer_class(self):
         serializer = self.serializer_class
@@ -72,11 +138,12 @@ class TrainViewSet(ModelViewSet):
 
 
 @extend_schema(tags=["crews"])
-class CrewViewSet(ModelViewSet):
+class CrewViewSet(ConditionalGetMixin, ModelViewSet):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
     filter_backends = [SearchFilter]
     search_fields = ["first_name", "last_name"]
+    version_models = (Crew,)
 
     @crew_filter_schema()
     def list(self, request, *args, **kwargs):
@@ -87,11 +154,19 @@ class CrewViewSet(ModelViewSet):
 
 
 @extend_schema(tags=["stations"])
-class StationViewSet(ModelViewSet):
+class StationViewSet(ConditionalGetMixin, ValuesListMixin, ModelViewSet):
     queryset = Station.objects.all()
     serializer_class = StationSerializer
     filter_backends = [SearchFilter]
     search_fields = ["name", "latitude", "longitude"]
+    version_models = (Station,)
+    throttle_costs = {"nearby": 2}
+    list_values = {
+        "id": "id",
+        "name": "name",
+        "latitude": "latitude",
+        "longitude": "longitude",
+    }
 
     @station_filter_schema()
     def list(self, request, *args, **kwargs):
@@ -100,13 +175,50 @@ class StationViewSet(ModelViewSet):
         """
         return super().list(request, *args, **kwargs)
 
+    @station_nearby_schema()
+    @action(detail=False, serializer_class=NearbyStationSerializer)
+    def nearby(self, request):
+        """Return stations closest to the point"""
+        query = NearbyStationQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        stations = find_nearby_stations(
+            params["lat"], params["lon"], params["radius"], params["limit"]
+        )
+        return Response(self.get_serializer(stations, many=True).data)
+
+    @station_board_schema()
+    @action(detail=True, pagination_class=None, filter_backends=[])
+    def board(self, request, pk=None):
+        """Return the next departures and arrivals of the station"""
+        query = StationBoardQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        station = self.get_object()
+
+        entries = BoardEntry.objects.filter(
+            station=station, time__gte=params.get("after") or timezone.now()
+        ).order_by("time", "trip_id")
+        board = {
+            "departures": entries.filter(kind=BoardEntry.DEPARTURE)[: params["limit"]],
+            "arrivals": entries.filter(kind=BoardEntry.ARRIVAL)[: params["limit"]],
+        }
+        return Response(StationBoardSerializer(board).data)
+
 
 @extend_schema(tags=["routes"])
-class RouteViewSet(ModelViewSet):
+class RouteViewSet(ConditionalGetMixin, ValuesListMixin, ModelViewSet):
     queryset = Route.objects.select_related("source", "destination")
     serializer_class = RouteSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = RouteFilter
+    version_models = (Route, Station)
+    list_values = {
+        "id": "id",
+        "source": "source__name",
+        "destination": "destination__name",
+        "distance": "distance",
+    }
 
     def get_serializer_class(self):
         serializer = self.serializer_class
@@ -119,33 +231,35 @@ class RouteViewSet(ModelViewSet):
 
 
 @extend_schema(tags=["trips"])
-class TripViewSet(ModelViewSet):
+class TripViewSet(ValuesListMixin, ModelViewSet):
     queryset = Trip.objects.all()
     serializer_class = TripSerializer
+    pagination_class = TripPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = TripFilter
+    throttle_costs = {"list": 3, "seats": 2, "bulk_import": 10}
+    list_values = {
+        "id": "id",
+        "from_station": "route__source__name",
+        "departure_time": "departure_time",
+        "to_station": "route__destination__name",
+        "arrival_time": "arrival_time",
+        "train": "train__name_number",
+        "seats_available": "inventory__seats_available",
+    }
 
     def get_queryset(self):
         queryset = self.queryset
         if self.action == "list":
-            queryset = (
-                queryset.select_related(
-                    "route__source", "route__destination", "train"
-                )
-                .prefetch_related("crew", "tickets")
-                .annotate(
-                    seats_available=F("train__total_seats") - Count("tickets"),
-                )
+            queryset = queryset.select_related(
+                "route__source", "route__destination", "train", "inventory"
             )
         elif self.action == "retrieve":
-            queryset = (
-                queryset.select_related("route", "train")
-                .prefetch_related("crew", "tickets")
-                .annotate(
-                    seats_booked=Count("tickets"),
-                    seats_available=F("train__total_seats") - Count("tickets"),
-                )
-            )
+            queryset = queryset.select_related(
+                "route__source", "route__destination", "train", "inventory"
+            ).prefetch_related("crew")
+        elif self.action == "seats":
+            queryset = queryset.select_related("train__carriage_type")
         return queryset
 
     def get_serializer_class(self):
@@ -153,21 +267,96 @@ class TripViewSet(ModelViewSet):
             return TripListSerializer
         elif self.action == "retrieve":
             return TripDetailSerializer
+        elif self.action == "seats":
+            return SeatMapSerializer
         return TripSerializer
 
+    @cached_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cached_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @seat_map_schema()
+    @action(detail=True, methods=["get"])
+    def seats(self, request, pk=None):
+        """Return compact map of taken seats for the trip"""
+        seat_map = get_seat_map(self.get_object())
+        return Response(self.get_serializer(seat_map).data)
+
+    @trip_cache_stats_schema()
+    @action(
+        detail=False,
+        url_path="cache-stats",
+        permission_classes=[IsAdminUser],
+        pagination_class=None,
+        filter_backends=[],
+    )
+    def cache_stats(self, request):
+        """Return hits and misses of cached trips list and details"""
+        return Response(get_stats(["list", "retrieve"]))
+
+    @trip_import_schema()
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        permission_classes=[IsAdminUser],
+        parser_classes=[MultiPartParser],
+        pagination_class=None,
+        filter_backends=[],
+    )
+    def bulk_import(self, request):
+        """Create trips of the uploaded CSV or NDJSON file in bulk"""
+        serializer = TripImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report = serializer.save()
+        return Response(TripImportReportSerializer(report).data)
+
 
 @extend_schema(tags=["orders"])
 class OrderViewSet(ModelViewSet):
     serializer_class = OrderSerializer
+    pagination_class = OrderPagination
     permission_classes = [IsAuthenticated]
     filter_backends = [SearchFilter]
     search_fields = ["created_at"]
+    throttle_costs = {"create": 5, "export": 10}
 
     def get_queryset(self):
-        if self.action in ["list", "retrieve"]:
+        if self.action == "list":
+            # tickets with everything their trips show, one query per level
+            queryset = Order.objects.select_related("user").prefetch_related(
+                Prefetch(
+                    "tickets",
+                    queryset=Ticket.objects.select_related(
+                        "trip__route__source",
+                        "trip__route__destination",
+                        "trip__train",
+                        "trip__inventory",
+                    ),
+                )
+            )
+        elif self.action == "retrieve":
+            # every trip of the tickets is loaded once (tickets of one trip
+            # share it) with its route, train, seat counters and crew
             queryset = Order.objects.select_related("user").prefetch_related(
                 Prefetch(
-                    "tickets", queryset=Ticket.objects.select_related("trip__route")
+                    "tickets",
+                    queryset=Ticket.objects.prefetch_related(
+                        Prefetch(
+                            "trip",
+                            queryset=Trip.objects.select_related(
+                                "route__source",
+                                "route__destination",
+                                "train",
+                                "inventory",
+                            ).prefetch_related("crew"),
+                        )
+                    ),
                 )
             )
         else:
@@ -185,6 +374,9 @@ class OrderViewSet(ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        cancel_order(instance)
+
     def get_serializer_class(self):
         serializer = self.serializer_class
 
@@ -192,6 +384,8 @@ class OrderViewSet(ModelViewSet):
             return OrderListSerializer
         elif self.action == "retrieve":
             return OrderDetailSerializer
+        elif self.action == "create" and "quantity" in self.request.data:
+            return OrderAutoSeatSerializer
         return serializer
 
     @order_filter_schema()
@@ -200,3 +394,86 @@ class OrderViewSet(ModelViewSet):
         Return filtered list if query parameters exists, else - full list of items
         """
         return super().list(request, *args, **kwargs)
+
+    @order_create_schema()
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @order_export_schema()
+    @action(
+        detail=False,
+        permission_classes=[IsAdminUser],
+        pagination_class=None,
+        filter_backends=[],
+    )
+    def export(self, request):
+        """Stream orders with their tickets as NDJSON or CSV"""
+        query = OrderExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = dict(query.validated_data)
+        output = params.pop("output")
+
+        response = StreamingHttpResponse(
+            export_orders(output, **params),
+            content_type="text/csv" if output == "csv" else "application/x-ndjson",
+        )
+        response["Content-Disposition"] = f'attachment; filename="orders.{output}"'
+        return response
+
+
+@extend_schema(tags=["holds"])
+class SeatHoldViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet,
+):
+    serializer_class = SeatHoldSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_costs = {"create": 3, "confirm": 5}
+
+    def get_queryset(self):
+        queryset = SeatHold.objects.prefetch_related("seats")
+
+        if not self.request.user.is_staff:
+            return queryset.filter(user=self.request.user)
+        return queryset
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        release_holds(SeatHold.objects.filter(pk=instance.pk))
+
+    @hold_confirm_schema()
+    @action(detail=True, methods=["post"])
+    def confirm(self, request, pk=None):
+        """Turn the hold into an order of its seats"""
+        order = confirm_hold(self.get_object())
+        return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(tags=["journeys"])
+class JourneyViewSet(GenericViewSet):
+    serializer_class = JourneySerializer
+    throttle_costs = {"list": 5}
+
+    @journey_search_schema()
+    def list(self, request, *args, **kwargs):
+        """Return journeys from one station to another with transfers"""
+        query = JourneyQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        min_connection = settings.JOURNEY_MIN_CONNECTION
+        if "min_connection" in params:
+            min_connection = timedelta(minutes=params["min_connection"])
+        journeys = find_journeys(
+            params["from"],
+            params["to"],
+            params["date"],
+            params["max_transfers"],
+            min_connection,
+        )
+        return Response(self.get_serializer(journeys, many=True).data)
@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# user fields put into access tokens, enough for permissions and ownership
+USER_CLAIMS = ("email", "is_staff", "is_active")
+
+
+def user_cache_key(user_id):
+    return f"jwt-user:{user_id}"
+
+
+def cache_user_claims(user):
+    claims = {name: getattr(user, name) for name in USER_CLAIMS}
+    cache.set(
+        user_cache_key(getattr(user, api_settings.USER_ID_FIELD)),
+        claims,
+        settings.JWT_USER_CACHE_TIMEOUT,
+    )
+    return claims
+
+
+def get_user_claims(user_id):
+    """Return claims of the user from cache or database, None for no user"""
+    claims = cache.get(user_cache_key(user_id))
+    if claims is None:
+        user = (
+            get_user_model()
+            .objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .only(*USER_CLAIMS)
+            .first()
+        )
+        if user is None:
+            return None
+        claims = cache_user_claims(user)
+    return claims
+
+
+def invalidate_user(user_id):
+    """User changed: drop cached claims now and once more after commit"""
+
+    def drop():
+        cache.delete(user_cache_key(user_id))
+
+    drop()
+    transaction.on_commit(drop)
+
+
+class UserRefreshToken(RefreshToken):
+    """
+    Refresh token issuing access tokens with current user claims
+    (`USER_CLAIMS`), the refresh token itself carries only the user id,
+    so changes of the user reach the next access token
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        cache_user_claims(user)
+        return super().for_user(user)
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        claims = get_user_claims(self[api_settings.USER_ID_CLAIM])
+        if claims is None:
+            raise TokenError(_("User not found"))
+        if not claims["is_active"]:
+            raise TokenError(_("User is inactive"))
+        for name, value in claims.items():
+            access[name] = value
+        return access
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without database query: the user is built from
+    claims of the access token. Tokens issued without the claims get them
+    from cache (JWT_USER_CACHE_TIMEOUT seconds) or the database. The user
+    is not loaded from the database, it has only the id and `USER_CLAIMS`
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if all(name in validated_token for name in USER_CLAIMS):
+            claims = {name: validated_token[name] for name in USER_CLAIMS}
+        else:
+            claims = get_user_claims(user_id)
+            if claims is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not claims["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return get_user_model()(**{api_settings.USER_ID_FIELD: user_id}, **claims)
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    """Document ClaimsJWTAuthentication as the usual bearer JWT"""
+
+    target_class = ClaimsJWTAuthentication
@@ -1,5 +1,9 @@
 from django.contrib.auth import get_user_model, authenticate
+from drf_spectacular.contrib import rest_framework_simplejwt as jwt_schema
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+
+from user.authentication import UserRefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -22,3 +26,20 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = UserRefreshToken
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = UserRefreshToken
+
+
+# token endpoints are documented as with simplejwt serializers
+class TokenObtainPairSerializerExtension(jwt_schema.TokenObtainPairSerializerExtension):
+    target_class = TokenObtainPairSerializer
+
+
+class TokenRefreshSerializerExtension(jwt_schema.TokenRefreshSerializerExtension):
+    target_class = TokenRefreshSerializer
@@ -0,0 +1,153 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import make_aware
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from trip.models import Train, CarriageType, Station, Trip, Route
+from user.authentication import user_cache_key
+
+PASSWORD = "test_password"
+TOKEN_URL = reverse("user:token_obtain_pair")
+REFRESH_URL = reverse("user:token_refresh")
+MANAGE_URL = reverse("user:manage")
+TRIP_URL = reverse("trip:trip-list")
+ORDER_URL = reverse("trip:order-list")
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # token requests are anonymous and throttled per address
+        caches["throttle"].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password=PASSWORD
+        )
+
+    def obtain_tokens(self):
+        res = self.client.post(
+            TOKEN_URL, {"email": self.user.email, "password": PASSWORD}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def refresh(self, tokens):
+        return self.client.post(REFRESH_URL, {"refresh": tokens["refresh"]})
+
+    def user_queries(self, url, token, method="get", data=None):
+        """Return response and number of queries of the user table"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        with CaptureQueriesContext(connection) as queries:
+            res = getattr(self.client, method)(url, data, format="json")
+        user_table = get_user_model()._meta.db_table
+        return res, sum(user_table in query["sql"] for query in queries)
+
+    def test_access_token_has_user_claims(self):
+        token = AccessToken(self.obtain_tokens()["access"])
+
+        self.assertEqual(token["email"], "test@test.com")
+        self.assertFalse(token["is_staff"])
+        self.assertTrue(token["is_active"])
+
+    def test_user_is_not_loaded_from_database(self):
+        access = self.obtain_tokens()["access"]
+        cache.clear()
+
+        res, queries = self.user_queries(TRIP_URL, access)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, 0)
+
+    def test_order_of_claims_user(self):
+        carriage = CarriageType.objects.create(category="test_class1", seats_in_car=10)
+        station1 = Station.objects.create(name="St1", latitude=10, longitude=11)
+        station2 = Station.objects.create(name="St2", latitude=20, longitude=21)
+        trip = Trip.objects.create(
+            route=Route.objects.create(
+                source=station1, destination=station2, distance=150
+            ),
+            train=Train.objects.create(
+                name_number="001T", carriages_quantity=1, carriage_type=carriage
+            ),
+            departure_time=make_aware(datetime(2025, 3, 24, 7, 12, 0)),
+            arrival_time=make_aware(datetime(2025, 3, 24, 15, 10, 0)),
+        )
+        access = self.obtain_tokens()["access"]
+
+        res, queries = self.user_queries(
+            ORDER_URL,
+            access,
+            "post",
+            {"tickets": [{"trip": trip.id, "car_num": 1, "seat_num": 1}]},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["created_by"], "test@test.com")
+        self.assertEqual(queries, 0)
+        self.assertEqual(self.user.orders.count(), 1)
+
+    def test_token_without_claims_uses_cache(self):
+        access = str(AccessToken.for_user(self.user))
+
+        self.assertEqual(self.user_queries(TRIP_URL, access)[1], 1)
+        self.assertEqual(self.user_queries(TRIP_URL, access)[1], 0)
+
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+        cache.delete(user_cache_key(self.user.pk))
+
+        res, _ = self.user_queries(TRIP_URL, access)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_issues_current_claims(self):
+        tokens = self.obtain_tokens()
+        get_user_model().objects.filter(pk=self.user.pk).update(is_staff=True)
+
+        # claims stay cached until the timeout or invalidation
+        access = AccessToken(self.refresh(tokens).data["access"])
+        self.assertFalse(access["is_staff"])
+
+        cache.delete(user_cache_key(self.user.pk))
+        access = AccessToken(self.refresh(tokens).data["access"])
+        self.assertTrue(access["is_staff"])
+
+    def test_refresh_of_inactive_or_deleted_user_fails(self):
+        tokens = self.obtain_tokens()
+
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+        cache.delete(user_cache_key(self.user.pk))
+        self.assertEqual(self.refresh(tokens).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.delete()
+        cache.delete(user_cache_key(self.user.pk))
+        self.assertEqual(self.refresh(tokens).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_manage_user_loads_user_and_invalidates_cache(self):
+        # users can be changed by admins only
+        self.user.is_staff = True
+        self.user.save()
+        tokens = self.obtain_tokens()
+
+        res, _ = self.user_queries(MANAGE_URL, tokens["access"])
+        self.assertEqual(res.data["email"], "test@test.com")
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res, _ = self.user_queries(
+                MANAGE_URL, tokens["access"], "patch", {"email": "new@test.com"}
+            )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "new@test.com")
+        self.assertTrue(self.user.check_password(PASSWORD))
+        access = AccessToken(self.refresh(tokens).data["access"])
+        self.assertEqual(access["email"], "new@test.com")
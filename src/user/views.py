@@ -1,8 +1,10 @@
+from django.contrib.auth import get_user_model
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
+from user.authentication import invalidate_user
 from user.serializers import UserSerializer
 
 
@@ -15,4 +17,9 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
 
     def get_object(self):
-        return self.request.user
+        # request.user is built from token claims, not the user row
+        return get_user_model().objects.get(pk=self.request.user.pk)
+
+    def perform_update(self, serializer):
+        user = serializer.save()
+        invalidate_user(user.pk)